@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import zlib
+import threading
+import numpy as np
+import speech_recognition as sr
+from segmentacao import TIPOS_AMOSTRA
+
+class Backend:
+    """
+    Mecanismo de reconhecimento usado por process_single_chunk.
+
+    reconhecer(audio_data, recognizer, idioma) devolve o texto, ou levanta
+    sr.UnknownValueError (sem fala reconhecível) ou sr.RequestError (falha do
+    serviço ou da instalação), como os métodos recognize_* do sr.Recognizer.
+
+    concorrente indica se chamadas simultâneas de várias threads são seguras;
+    se não forem, transcribe_audio usa um só worker e transcrever serializa
+    as chamadas (por exemplo quando o backend é usado como fallback). remoto
+    indica um serviço com cota, que passa pelo limitador de taxa.
+
+    O tempo das chamadas e o de carga de modelos (registrar_carga) são
+    acumulados separadamente para o relatório (resumo).
+    """
+    nome = ""
+    concorrente = True
+    remoto = False
+
+    def __init__(self, config):
+        self.config = config
+        self.chamadas = 0
+        self.tempo_chamadas = 0.0
+        self.cargas = 0
+        self.tempo_carga = 0.0
+        self._lock = threading.Lock()
+        self._lock_estatisticas = threading.Lock()
+
+    def reconhecer(self, audio_data, recognizer, idioma):
+        raise NotImplementedError
+
+    def transcrever(self, audio_data, recognizer, idioma="pt-BR"):
+        inicio = time.perf_counter()
+        try:
+            if self.concorrente:
+                return self.reconhecer(audio_data, recognizer, idioma)
+            with self._lock:
+                return self.reconhecer(audio_data, recognizer, idioma)
+        finally:
+            with self._lock_estatisticas:
+                self.chamadas += 1
+                self.tempo_chamadas += time.perf_counter() - inicio
+
+    def registrar_carga(self, segundos):
+        """Contabiliza a carga de um modelo, descontada do tempo de reconhecimento no resumo"""
+        with self._lock_estatisticas:
+            self.cargas += 1
+            self.tempo_carga += segundos
+
+    def resumo(self):
+        """Linha de relatório com os tempos acumulados no processo, ou None se nunca foi chamado"""
+        if not self.chamadas:
+            return None
+        reconhecimento = self.tempo_chamadas - self.tempo_carga
+        linha = (f"{self.nome}: {self.chamadas} chamadas, {reconhecimento:.1f}s reconhecendo "
+                 f"({reconhecimento / self.chamadas:.2f}s por chunk)")
+        if self.cargas:
+            linha += f", modelo carregado {self.cargas}x em {self.tempo_carga:.1f}s"
+        return linha
+
+class BackendGoogle(Backend):
+    """Google Web Speech API (online, sujeita a cota)"""
+    nome = "google"
+    remoto = True
+
+    def reconhecer(self, audio_data, recognizer, idioma):
+        return recognizer.recognize_google(audio_data, language=idioma)
+
+class BackendSphinx(Backend):
+    """
+    CMU PocketSphinx (offline), com os mesmos arquivos de modelo de
+    recognizer.recognize_sphinx.
+
+    recognize_sphinx localiza os arquivos e monta um decodificador novo a
+    cada chamada. Aqui os decodificadores carregados ficam em uma reserva do
+    processo: cada chamada pega um livre (ou carrega um, se todos estiverem
+    em uso) e o devolve no fim. Assim há no máximo um por worker simultâneo,
+    reaproveitado entre chunks e arquivos, e chamadas simultâneas são seguras.
+    """
+    nome = "sphinx"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._livres = {}
+
+    def _carregar_decodificador(self, idioma):
+        try:
+            from pocketsphinx import pocketsphinx
+        except ImportError:
+            raise sr.RequestError("missing PocketSphinx module: ensure that PocketSphinx is set up correctly.")
+
+        pasta_idioma = os.path.join(os.path.dirname(os.path.realpath(sr.__file__)), "pocketsphinx-data", idioma)
+        arquivos = {
+            '-hmm': os.path.join(pasta_idioma, "acoustic-model"),
+            '-lm': os.path.join(pasta_idioma, "language-model.lm.bin"),
+            '-dict': os.path.join(pasta_idioma, "pronounciation-dictionary.dict"),
+        }
+        for caminho in arquivos.values():
+            if not os.path.exists(caminho):
+                raise sr.RequestError(f"missing PocketSphinx language data: \"{caminho}\"")
+
+        inicio = time.perf_counter()
+        configuracao = pocketsphinx.Config()
+        for opcao, caminho in arquivos.items():
+            configuracao.set_string(opcao, caminho)
+        configuracao.set_string("-logfn", os.devnull)
+        decodificador = pocketsphinx.Decoder(configuracao)
+        self.registrar_carga(time.perf_counter() - inicio)
+        return decodificador
+
+    def reconhecer(self, audio_data, recognizer, idioma):
+        with self._lock:
+            livres = self._livres.setdefault(idioma, [])
+            decodificador = livres.pop() if livres else None
+        if decodificador is None:
+            decodificador = self._carregar_decodificador(idioma)
+        # Os modelos incluídos esperam PCM 16-bit mono a 16 kHz
+        decodificador.start_utt()
+        decodificador.process_raw(audio_data.get_raw_data(convert_rate=16000, convert_width=2), False, True)
+        decodificador.end_utt()
+        hipotese = decodificador.hyp()
+        # Só volta para a reserva se a decodificação terminou; após um erro o estado é incerto
+        with self._lock:
+            self._livres[idioma].append(decodificador)
+        if hipotese is None:
+            raise sr.UnknownValueError()
+        return hipotese.hypstr
+
+class BackendVosk(Backend):
+    """
+    Vosk/Kaldi local (offline), com o modelo em config['modelo_vosk'].
+
+    O modelo é carregado uma vez e compartilhado; cada chamada usa o seu
+    próprio KaldiRecognizer, então chamadas simultâneas são seguras.
+    """
+    nome = "vosk"
+    TAXA_MODELO = 16000
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._modelo = None
+
+    def _carregar_modelo(self):
+        with self._lock:
+            if self._modelo is None:
+                try:
+                    from vosk import Model, SetLogLevel
+                except ImportError:
+                    raise sr.RequestError("módulo vosk não encontrado: instale com 'pip install vosk'")
+                SetLogLevel(-1)
+                caminho = self.config.get('modelo_vosk', 'model')
+                inicio = time.perf_counter()
+                try:
+                    self._modelo = Model(caminho)
+                except Exception as e:
+                    raise sr.RequestError(f"não foi possível carregar o modelo Vosk em '{caminho}': {e}")
+                self.registrar_carga(time.perf_counter() - inicio)
+            return self._modelo
+
+    def reconhecer(self, audio_data, recognizer, idioma):
+        # Primeiro o modelo: sem o módulo vosk ele levanta sr.RequestError, que leva ao fallback
+        modelo = self._carregar_modelo()
+        from vosk import KaldiRecognizer
+        reconhecedor = KaldiRecognizer(modelo, self.TAXA_MODELO)
+        reconhecedor.AcceptWaveform(audio_data.get_raw_data(convert_rate=self.TAXA_MODELO, convert_width=2))
+        texto = json.loads(reconhecedor.FinalResult()).get('text', '')
+        if not texto:
+            raise sr.UnknownValueError()
+        return texto
+
+class BackendFake(Backend):
+    """
+    Backend determinístico e offline para testes e benchmarks do pipeline.
+
+    O "texto" identifica o áudio recebido (duração em ms e CRC32 das
+    amostras), então o mesmo chunk sempre gera o mesmo resultado. Áudio sem
+    energia levanta sr.UnknownValueError. config['latencia_fake'] simula o
+    tempo de resposta de um serviço, em segundos.
+    """
+    nome = "fake"
+
+    def reconhecer(self, audio_data, recognizer, idioma):
+        latencia = self.config.get('latencia_fake', 0)
+        if latencia:
+            time.sleep(latencia)
+        dados = audio_data.frame_data
+        amostras = np.frombuffer(dados, dtype=TIPOS_AMOSTRA.get(audio_data.sample_width, np.int16))
+        if not amostras.any():
+            raise sr.UnknownValueError()
+        duracao_ms = len(dados) * 1000 // (audio_data.sample_rate * audio_data.sample_width)
+        return f"fala {duracao_ms}ms {zlib.crc32(dados):08x}"
+
+BACKENDS = {
+    'google': BackendGoogle,
+    'sphinx': BackendSphinx,
+    'vosk': BackendVosk,
+    'fake': BackendFake,
+}
+
+# Nome usado em config['backend_fallback'] para desativar o fallback
+SEM_FALLBACK = "nenhum"
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def obter_backend(nome, config):
+    """Backend compartilhado do processo (o lock dos não concorrentes vale para todos os arquivos)"""
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend de reconhecimento desconhecido: {nome}")
+    with _backends_lock:
+        backend = _backends.get(nome)
+        if backend is None:
+            backend = _backends[nome] = BACKENDS[nome](config)
+        backend.config = config
+        return backend
+
+def obter_fallback(config):
+    """Backend de fallback configurado, ou None se desativado ou igual ao principal"""
+    nome = config.get('backend_fallback', 'sphinx')
+    if not nome or nome == SEM_FALLBACK or nome == config.get('backend', 'google'):
+        return None
+    return obter_backend(nome, config)
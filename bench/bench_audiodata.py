@@ -0,0 +1,98 @@
+"""
+Custo por chunk de entregar o áudio ao reconhecedor, sem o reconhecimento:
+WAV temporário lido com sr.AudioFile (caminho antigo de process_single_chunk)
+contra sr.AudioData montado direto das amostras.
+
+    python bench/bench_audiodata.py [--chunks 8] [--duracao 8] [--repeticoes 25] [--calibrar 0.3] [--pasta DIR]
+
+--pasta escolhe onde ficam os WAVs temporários (o padrão do sistema costuma
+ser tmpfs; num disco de verdade a diferença é maior).
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+import speech_recognition as sr
+from pydub import AudioSegment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcriber import ajustar_ruido_ambiente
+
+TAXA = 16000
+
+def gerar_chunks(quantidade, duracao_s):
+    """Chunks mono de 16 bits com tom e ruído, diferentes entre si"""
+    gerador = np.random.default_rng(0)
+    t = np.arange(int(TAXA * duracao_s)) / TAXA
+    chunks = []
+    for i in range(quantidade):
+        amostras = 6000 * np.sin(2 * np.pi * (200 + 30 * i) * t) + gerador.normal(0, 300, len(t))
+        chunks.append(AudioSegment(data=amostras.astype(np.int16).tobytes(), sample_width=2,
+                                   frame_rate=TAXA, channels=1))
+    return chunks
+
+def via_arquivo(chunk, recognizer, pasta, calibrar):
+    caminho = os.path.join(pasta, "chunk.wav")
+    chunk.export(caminho, format="wav")
+    try:
+        with sr.AudioFile(caminho) as source:
+            if calibrar:
+                recognizer.adjust_for_ambient_noise(source, duration=calibrar)
+            return recognizer.record(source)
+    finally:
+        os.remove(caminho)
+
+def em_memoria(chunk, recognizer, pasta, calibrar):
+    if calibrar:
+        return ajustar_ruido_ambiente(recognizer, chunk, duracao=calibrar)
+    return sr.AudioData(chunk.raw_data, chunk.frame_rate, chunk.sample_width)
+
+def medir(funcao, chunks, repeticoes, pasta, calibrar):
+    """Mediana, em ms por chunk, de repeticoes passadas por todos os chunks"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for chunk in chunks:
+            funcao(chunk, sr.Recognizer(), pasta, calibrar)
+        tempos.append((time.perf_counter() - inicio) * 1000 / len(chunks))
+    return statistics.median(tempos)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WAV temporário x AudioData em memória por chunk")
+    parser.add_argument('--chunks', type=int, default=8)
+    parser.add_argument('--duracao', type=float, default=8.0, help="segundos por chunk")
+    parser.add_argument('--repeticoes', type=int, default=25)
+    parser.add_argument('--calibrar', type=float, default=0.0,
+                        help="segundos de adjust_for_ambient_noise (0 = sem calibração, o padrão)")
+    parser.add_argument('--pasta', help="pasta dos WAVs temporários (padrão: a do sistema)")
+    args = parser.parse_args(argv)
+
+    chunks = gerar_chunks(args.chunks, args.duracao)
+    with tempfile.TemporaryDirectory(dir=args.pasta) as pasta:
+        # Os dois caminhos precisam entregar exatamente o mesmo áudio e o mesmo limiar
+        for chunk in chunks:
+            reconhecedores = sr.Recognizer(), sr.Recognizer()
+            arquivo = via_arquivo(chunk, reconhecedores[0], pasta, args.calibrar)
+            memoria = em_memoria(chunk, reconhecedores[1], pasta, args.calibrar)
+            if (arquivo.frame_data, arquivo.sample_rate, arquivo.sample_width) != \
+                    (memoria.frame_data, memoria.sample_rate, memoria.sample_width) or \
+                    reconhecedores[0].energy_threshold != reconhecedores[1].energy_threshold:
+                print("Os dois caminhos divergem", file=sys.stderr)
+                return 1
+
+        tempo_arquivo = medir(via_arquivo, chunks, args.repeticoes, pasta, args.calibrar)
+        tempo_memoria = medir(em_memoria, chunks, args.repeticoes, pasta, args.calibrar)
+
+    print(f"{args.chunks} chunks de {args.duracao:g} s a {TAXA} Hz, mediana de {args.repeticoes} execuções"
+          f"{f', calibração de {args.calibrar:g} s' if args.calibrar else ''}")
+    print(f"  WAV temporário + AudioFile: {tempo_arquivo:.3f} ms/chunk")
+    print(f"  AudioData em memória:       {tempo_memoria:.3f} ms/chunk")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Tempo de inicialização da interface: importar interface (lote,
+cache_transcricao e backends ficam para a primeira transcrição) contra
+importar também esses módulos logo no início, como antes.
+
+    python bench/bench_importacao.py [--repeticoes 5]
+
+Cada medida roda num interpretador novo, sem módulos em cache na memória;
+a mediana desconta a primeira leitura dos arquivos do disco.
+"""
+import os
+import sys
+import argparse
+import subprocess
+import statistics
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CENARIOS = {
+    'preguiçoso (interface)': "import interface",
+    'ansioso (interface + lote, cache_transcricao, backends)':
+        "import interface, lote, cache_transcricao, backends",
+}
+
+def medir(codigo):
+    """Segundos para executar codigo num interpretador novo, medidos dentro dele"""
+    script = f"import time; inicio = time.perf_counter(); {codigo}; print(time.perf_counter() - inicio)"
+    resultado = subprocess.run([sys.executable, "-c", script], cwd=RAIZ, capture_output=True, text=True, check=True)
+    return float(resultado.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de importação da interface")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for nome, codigo in CENARIOS.items():
+        medir(codigo)  # aquece o cache de disco e os .pyc
+        tempos = [medir(codigo) * 1000 for _ in range(args.repeticoes)]
+        print(f"{nome}: mediana {statistics.median(tempos):.1f} ms (mín. {min(tempos):.1f}, máx. {max(tempos):.1f})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Calibração de ruído por chunk (adjust_for_ambient_noise, comportamento
+antigo) contra a estimativa única por arquivo, com e sem pular os chunks sem
+fala acima do ruído (config['pular_chunks_de_ruido']), pelo transcribe_audio
+com o backend fake: tempo, chamadas ao backend e diferenças no texto.
+
+    python bench/bench_ruido.py [--falas 12] [--rajadas 3] [--repeticoes 5] [--latencia 0.05]
+
+O texto do backend fake identifica o áudio recebido (duração e CRC32), então
+um texto diferente significa que o reconhecedor recebeu outro áudio: na
+calibração por chunk, o início de cada chunk é consumido pelo ajuste.
+--latencia simula o tempo de resposta de um serviço, em segundos por chamada.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import numpy as np
+from pydub import AudioSegment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backends
+from transcriber import transcribe_audio
+from configuracao import CONFIG_PADRAO
+
+TAXA = 16000
+
+# RMS do ruído de fundo e das rajadas; o dBFS do arquivo é ajustado para o limiar de silêncio ficar entre os dois
+RUIDO, RAJADA, LIMIAR = 360, 495, 460
+
+def gerar_audio(falas, rajadas):
+    """Ruído de fundo com tons (falas) e rajadas de ruído pouco acima do limiar de silêncio"""
+    gerador = np.random.default_rng(0)
+    duracao_s = 4 * (falas + rajadas) + 2
+    amostras = gerador.normal(0, RUIDO, TAXA * duracao_s)
+    t = np.arange(TAXA * 2) / TAXA
+    # Amplitude dos tons para o RMS do arquivo ser LIMIAR / 10 ** (-12 / 20) (silence_thresh_offset padrão)
+    rms_total = LIMIAR / 10 ** (CONFIG_PADRAO['silence_thresh_offset'] / 20)
+    fracao_falas, fracao_rajadas = 2 * falas / duracao_s, 2 * rajadas / duracao_s
+    energia_falas = rms_total ** 2 - RUIDO ** 2 * (1 - fracao_falas - fracao_rajadas) - RAJADA ** 2 * fracao_rajadas
+    amplitude = np.sqrt(2 * max(energia_falas - RUIDO ** 2 * fracao_falas, 0) / fracao_falas)
+    posicoes = list(range(falas + rajadas))
+    gerador.shuffle(posicoes)
+    for n, posicao in enumerate(posicoes):
+        inicio = TAXA * (2 + 4 * posicao)
+        if n < falas:
+            amostras[inicio:inicio + len(t)] += amplitude * np.sin(2 * np.pi * (200 + 30 * n) * t)
+        else:
+            amostras[inicio:inicio + len(t)] = gerador.normal(0, RAJADA, len(t))
+    return AudioSegment(data=np.clip(amostras, -32768, 32767).astype(np.int16).tobytes(),
+                        sample_width=2, frame_rate=TAXA, channels=1)
+
+def transcrever(audio, config):
+    """(segundos, chamadas ao backend, resultados)"""
+    chamadas = [0]
+    reconhecer = backends.BackendFake.reconhecer
+
+    def contar(self, *args):
+        chamadas[0] += 1
+        return reconhecer(self, *args)
+
+    backends.BackendFake.reconhecer = contar
+    try:
+        inicio = time.perf_counter()
+        resultados = list(transcribe_audio(audio, ".", config=config))
+        return time.perf_counter() - inicio, chamadas[0], resultados
+    finally:
+        backends.BackendFake.reconhecer = reconhecer
+
+def milissegundos_reconhecidos(resultados):
+    """Áudio entregue ao backend, somado do texto do fake ("fala <ms>ms <crc>")"""
+    return sum(int(resultado['texto'].split()[1][:-2]) for resultado in resultados
+               if resultado['texto'].startswith("fala "))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibração de ruído por chunk x estimativa por arquivo")
+    parser.add_argument('--falas', type=int, default=12)
+    parser.add_argument('--rajadas', type=int, default=3, help="trechos só de ruído, pouco acima do limiar")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--latencia', type=float, default=0.05, help="segundos por chamada ao backend fake")
+    args = parser.parse_args(argv)
+
+    audio = gerar_audio(args.falas, args.rajadas)
+    base = dict(CONFIG_PADRAO, backend='fake', backend_fallback='nenhum', metadados_chunk=True,
+                cache_tamanho_max_mb=0, latencia_fake=args.latencia)
+    caminhos = {
+        'por chunk': dict(base, calibrar_ruido_por_chunk=True),
+        'por arquivo': dict(base, calibrar_ruido_por_chunk=False),
+        'pulando ruído': dict(base, calibrar_ruido_por_chunk=False, pular_chunks_de_ruido=True),
+    }
+
+    medidas = {}
+    for nome, config in caminhos.items():
+        execucoes = [transcrever(audio, config) for _ in range(args.repeticoes)]
+        medidas[nome] = (statistics.median(tempo for tempo, _, _ in execucoes),) + execucoes[0][1:]
+
+    print(f"{len(audio) / 1000:g} s de áudio com {args.falas} falas e {args.rajadas} rajadas de ruído, "
+          f"latência de {args.latencia:g} s, mediana de {args.repeticoes} execuções")
+    for nome, (tempo, chamadas, resultados) in medidas.items():
+        inaudiveis = sum(1 for resultado in resultados if not resultado['texto'].startswith("fala "))
+        print(f"  {nome:<13} {tempo:.3f} s, {chamadas} chamadas ao backend, {len(resultados)} chunks "
+              f"({inaudiveis} sem texto), {milissegundos_reconhecidos(resultados)} ms reconhecidos")
+
+    # Mesmo chunk (pelo início) com texto diferente: o backend recebeu outro áudio
+    por_chunk = {resultado['inicio_ms']: resultado['texto'] for resultado in medidas['por chunk'][2]}
+    por_arquivo = {resultado['inicio_ms']: resultado['texto'] for resultado in medidas['por arquivo'][2]}
+    diferentes = [inicio for inicio in por_arquivo if por_chunk.get(inicio) != por_arquivo[inicio]]
+    print(f"  Chunks com texto diferente: {len(diferentes)} de {len(por_arquivo)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
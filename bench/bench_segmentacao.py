@@ -0,0 +1,90 @@
+"""
+Divisão por silêncio: detectar_segmentos (NumPy, só as fronteiras) contra
+pydub.silence.split_on_silence e detect_silence, com os parâmetros padrão
+de transcribe_audio, em áudio sintético de falas (tons) e pausas com ruído.
+
+    python bench/bench_segmentacao.py [--duracao 60] [--repeticoes 3] [--sem-pydub]
+
+O pydub avalia cada janela com audioop, milissegundo a milissegundo, e
+leva minutos em áudios longos: --sem-pydub mede só a versão vetorizada.
+Antes de medir, as fronteiras das duas versões são comparadas.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.silence import split_on_silence, detect_silence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from segmentacao import detectar_segmentos, detectar_silencio
+from configuracao import CONFIG_PADRAO
+
+TAXA = 16000
+
+def gerar_audio(duracao_s):
+    """Falas de 1 a 6 s separadas por pausas de 0,3 a 2 s, com ruído de fundo"""
+    gerador = np.random.default_rng(0)
+    total = int(TAXA * duracao_s)
+    amostras = gerador.normal(0, 150, total)
+    posicao = 0
+    while posicao < total:
+        fala = int(TAXA * gerador.uniform(1, 6))
+        t = np.arange(min(fala, total - posicao)) / TAXA
+        amostras[posicao:posicao + len(t)] += 6000 * np.sin(2 * np.pi * gerador.uniform(150, 400) * t)
+        posicao += fala + int(TAXA * gerador.uniform(0.3, 2))
+    return AudioSegment(data=amostras.astype(np.int16).tobytes(), sample_width=2, frame_rate=TAXA, channels=1)
+
+def medir(funcao, repeticoes):
+    """Mediana, em segundos, de repeticoes chamadas"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="detectar_segmentos x split_on_silence/detect_silence")
+    parser.add_argument('--duracao', type=float, default=60.0, help="segundos de áudio")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--sem-pydub', action='store_true', help="não medir as versões do pydub")
+    args = parser.parse_args(argv)
+
+    audio = gerar_audio(args.duracao)
+    min_silence_len = CONFIG_PADRAO['min_silence_len']
+    offset = CONFIG_PADRAO['silence_thresh_offset']
+    keep_silence = CONFIG_PADRAO['keep_silence']
+    limiar = audio.dBFS + offset
+
+    casos = {
+        'detectar_segmentos': lambda: detectar_segmentos(audio, min_silence_len, offset, keep_silence),
+        'detectar_silencio': lambda: detectar_silencio(audio, min_silence_len, limiar),
+    }
+    if not args.sem_pydub:
+        casos['split_on_silence (pydub)'] = lambda: split_on_silence(
+            audio, min_silence_len=min_silence_len, silence_thresh=limiar, keep_silence=keep_silence)
+        casos['detect_silence (pydub)'] = lambda: detect_silence(
+            audio, min_silence_len=min_silence_len, silence_thresh=limiar)
+
+        # As duas versões precisam encontrar os mesmos chunks
+        segmentos = detectar_segmentos(audio, min_silence_len, offset, keep_silence)
+        chunks = split_on_silence(audio, min_silence_len=min_silence_len, silence_thresh=limiar,
+                                  keep_silence=keep_silence)
+        if len(segmentos) != len(chunks) or any(audio[inicio:fim].raw_data != chunk.raw_data
+                                                for (inicio, fim), chunk in zip(segmentos, chunks)):
+            print("As duas versões divergem", file=sys.stderr)
+            return 1
+
+    print(f"{len(audio) / 1000:g} s a {TAXA} Hz, min_silence_len {min_silence_len} ms, "
+          f"mediana de {args.repeticoes} execuções")
+    for nome, funcao in casos.items():
+        print(f"  {nome:<26} {medir(funcao, args.repeticoes) * 1000:10.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import os
+import json
+import hashlib
+import threading
+
+# Versão do formato da chave: mudar invalida as entradas antigas sem precisar apagar a pasta
+VERSAO_CHAVE = 1
+
+# Configurações que mudam o áudio enviado ao reconhecedor ou o texto devolvido
+PARAMETROS_CACHE = ('sample_rate', 'filtro_freq_baixa', 'filtro_freq_alta', 'normalizar_por_chunk', 'calibrar_ruido_por_chunk', 'pular_chunks_de_ruido')
+
+def pasta_cache_padrao():
+    return os.path.join(os.path.expanduser("~"), ".transcricao_cache")
+
+class CacheTranscricao:
+    """
+    Cache persistente de transcrições de chunks, endereçado pelo SHA-256 do
+    PCM do chunk e das configurações relevantes.
+
+    Cada entrada é um pequeno JSON em pasta/<2 primeiros hex>/<hash>.json. O
+    horário de modificação marca o último acesso, e as entradas mais antigas
+    são removidas quando o total passa de tamanho_maximo_mb (LRU por tamanho).
+    """
+
+    def __init__(self, pasta, tamanho_maximo_mb):
+        self.pasta = pasta
+        self.tamanho_maximo = int(tamanho_maximo_mb * 1024 * 1024)
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+        os.makedirs(pasta, exist_ok=True)
+        self._tamanho_atual = sum(tamanho for _, _, tamanho in self._entradas())
+
+    def chave(self, dados_pcm, config, servico="google", idioma="pt-BR"):
+        """Hash do áudio do chunk mais as configurações que influenciam o resultado"""
+        parametros = {nome: config.get(nome) for nome in PARAMETROS_CACHE}
+        parametros.update(versao=VERSAO_CHAVE, servico=servico, idioma=idioma)
+        h = hashlib.sha256(dados_pcm)
+        h.update(json.dumps(parametros, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave[:2], chave + ".json")
+
+    def obter_registro(self, chave):
+        """Retorna a entrada ({'texto', 'backend'}) ou None, contabilizando acerto/falha"""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                registro = json.load(f)
+            registro['texto']
+            # Marcar como usado recentemente
+            os.utime(caminho, None)
+        except (OSError, ValueError, KeyError, TypeError):
+            with self._lock:
+                self.falhas += 1
+            return None
+        with self._lock:
+            self.acertos += 1
+        return registro
+
+    def obter(self, chave):
+        """Retorna o texto em cache ou None, contabilizando acerto/falha"""
+        registro = self.obter_registro(chave)
+        return registro['texto'] if registro else None
+
+    def guardar(self, chave, texto, backend=None):
+        """Grava o texto e o backend que o gerou (entradas antigas não têm 'backend')"""
+        caminho = self._caminho(chave)
+        registro = {'texto': texto}
+        if backend:
+            registro['backend'] = backend
+        conteudo = json.dumps(registro, ensure_ascii=False).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            # Escrita atômica: outro processo nunca lê uma entrada pela metade
+            temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporario, 'wb') as f:
+                f.write(conteudo)
+            # Sobrescrever uma entrada não soma o tamanho dela de novo
+            try:
+                tamanho_anterior = os.path.getsize(caminho)
+            except OSError:
+                tamanho_anterior = 0
+            os.replace(temporario, caminho)
+        except OSError:
+            return
+        with self._lock:
+            self._tamanho_atual += len(conteudo) - tamanho_anterior
+            if self._tamanho_atual > self.tamanho_maximo:
+                self._remover_antigas()
+
+    def _entradas(self):
+        for subpasta in os.scandir(self.pasta):
+            if not subpasta.is_dir():
+                continue
+            for entrada in os.scandir(subpasta.path):
+                if entrada.name.endswith(".json"):
+                    try:
+                        info = entrada.stat()
+                    except OSError:
+                        continue
+                    yield entrada.path, info.st_mtime, info.st_size
+
+    def _remover_antigas(self):
+        # Remove as menos usadas até ficar em 90% do limite, para não varrer a pasta a cada escrita
+        entradas = sorted(self._entradas(), key=lambda entrada: entrada[1])
+        total = sum(tamanho for _, _, tamanho in entradas)
+        alvo = self.tamanho_maximo * 0.9
+        for caminho, _, tamanho in entradas:
+            if total <= alvo:
+                break
+            try:
+                os.remove(caminho)
+                total -= tamanho
+            except OSError:
+                pass
+        self._tamanho_atual = total
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def obter_cache(config):
+    """Cache compartilhado do processo para a pasta configurada, ou None se desativado (tamanho 0)"""
+    tamanho_mb = config.get('cache_tamanho_max_mb', 0)
+    if not tamanho_mb or tamanho_mb <= 0:
+        return None
+    pasta = config.get('pasta_cache') or pasta_cache_padrao()
+    with _caches_lock:
+        cache = _caches.get(pasta)
+        if cache is None:
+            cache = _caches[pasta] = CacheTranscricao(pasta, tamanho_mb)
+        cache.tamanho_maximo = int(tamanho_mb * 1024 * 1024)
+        return cache
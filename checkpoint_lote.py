@@ -0,0 +1,151 @@
+import os
+import json
+import hashlib
+import threading
+
+# Versão do formato do checkpoint: mudar invalida os diários antigos
+# (2: resultados gravados com os metadados do chunk, config['metadados_chunk'])
+VERSAO_CHECKPOINT = 2
+
+# Configurações que mudam a divisão em chunks ou o texto gravado: com outro valor o diário não vale mais
+PARAMETROS_CHECKPOINT = (
+    'min_silence_len', 'silence_thresh_offset', 'keep_silence', 'chunk_length',
+    'max_chunk_size', 'sub_chunk_length', 'sample_rate', 'filtro_freq_baixa',
+    'filtro_freq_alta', 'normalizar_por_chunk', 'calibrar_ruido_por_chunk', 'pular_chunks_de_ruido', 'modo_streaming', 'janela_streaming_ms',
+    'bloco_streaming_ms', 'incluir_timestamp', 'timestamp_completo', 'backend', 'backend_fallback', 'formatos_saida'
+)
+
+def caminho_checkpoint(nome_saida):
+    """Diário gravado ao lado do arquivo de transcrição"""
+    return nome_saida + ".checkpoint.jsonl"
+
+def assinatura_checkpoint(arquivo, config):
+    """Hash das configurações relevantes e do tamanho/data do arquivo de entrada"""
+    info = os.stat(arquivo)
+    dados = {nome: config.get(nome) for nome in PARAMETROS_CHECKPOINT}
+    dados.update(versao=VERSAO_CHECKPOINT, tamanho=info.st_size, modificado=int(info.st_mtime))
+    return hashlib.sha256(json.dumps(dados, sort_keys=True).encode("utf-8")).hexdigest()
+
+class CheckpointTranscricao:
+    """
+    Diário de um arquivo em transcrição, em JSON Lines: um cabeçalho com a
+    assinatura da configuração, uma linha por chunk transcrito (índice e
+    resultado) e uma linha final quando o arquivo de saída foi gravado.
+
+    Com retomar=False (ou se a assinatura mudou) o diário anterior é ignorado
+    e reescrito do zero. Cada linha é gravada com fsync, então uma queda perde
+    no máximo o chunk em andamento. Na conclusão o diário fica só com o
+    cabeçalho e a linha final, que checkpoint_concluido usa para pular o
+    arquivo mesmo sem o manifesto.
+    """
+
+    def __init__(self, caminho, arquivo, config, retomar=True):
+        self.caminho = caminho
+        self.assinatura = assinatura_checkpoint(arquivo, config)
+        self.resultados = {}
+        self.concluido = None
+        self._valido_ate = None
+        self._arquivo = None
+        self._lock = threading.Lock()
+        if retomar:
+            self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'rb') as f:
+                conteudo = f.read()
+        except OSError:
+            return
+
+        posicao = 0
+        cabecalho_ok = False
+        # Só linhas completas contam: a última pode ter sido cortada por uma queda
+        while True:
+            fim_linha = conteudo.find(b"\n", posicao)
+            if fim_linha < 0:
+                break
+            try:
+                registro = json.loads(conteudo[posicao:fim_linha])
+            except ValueError:
+                break
+            if not cabecalho_ok:
+                if registro.get('assinatura') != self.assinatura:
+                    return
+                cabecalho_ok = True
+            elif 'concluido' in registro:
+                self.concluido = registro
+            elif 'indice' in registro:
+                self.resultados[registro['indice']] = registro['resultado']
+            posicao = fim_linha + 1
+
+        if cabecalho_ok:
+            self._valido_ate = posicao
+
+    def abrir(self):
+        """Prepara o diário para gravação, continuando o anterior se ele foi aproveitado"""
+        if self._valido_ate is not None:
+            self._arquivo = open(self.caminho, 'r+b')
+            # Descartar uma linha incompleta deixada por uma queda
+            self._arquivo.truncate(self._valido_ate)
+            self._arquivo.seek(self._valido_ate)
+        else:
+            self.resultados = {}
+            self.concluido = None
+            self._arquivo = open(self.caminho, 'wb')
+            self._gravar(self._cabecalho())
+        return self
+
+    def _cabecalho(self):
+        return {'assinatura': self.assinatura, 'versao': VERSAO_CHECKPOINT}
+
+    def _gravar(self, registro):
+        with self._lock:
+            self._arquivo.write(_linha(registro))
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+
+    def registrar(self, indice, resultado):
+        """Grava o resultado de um chunk, se ainda não estiver no diário"""
+        if indice in self.resultados:
+            return
+        self.resultados[indice] = resultado
+        self._gravar({'indice': indice, 'resultado': resultado})
+
+    def concluir(self, chunks, chunks_com_erro):
+        """
+        Marca o arquivo como concluído, depois de gravada a transcrição (só sem
+        chunks com erro). O texto dos chunks já está na transcrição: o diário é
+        substituído por um com apenas o cabeçalho e a conclusão.
+        """
+        self.concluido = {'concluido': True, 'chunks': chunks, 'chunks_com_erro': chunks_com_erro}
+        self.fechar()
+        temporario = self.caminho + ".tmp"
+        with open(temporario, 'wb') as f:
+            f.write(_linha(self._cabecalho()) + _linha(self.concluido))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+
+    def fechar(self):
+        if self._arquivo:
+            self._arquivo.close()
+            self._arquivo = None
+
+def _linha(registro):
+    return json.dumps(registro, ensure_ascii=False).encode("utf-8") + b"\n"
+
+def checkpoint_concluido(arquivo, nome_saida, config):
+    """
+    Retorna o registro de conclusão se o arquivo já foi transcrito com a mesma
+    configuração e sem chunks com erro, senão None
+    """
+    if not os.path.exists(nome_saida):
+        return None
+    try:
+        checkpoint = CheckpointTranscricao(caminho_checkpoint(nome_saida), arquivo, config)
+    except OSError:
+        return None
+    if checkpoint.concluido is None or checkpoint.concluido.get('chunks_com_erro', 0):
+        # Diários antigos podem ter conclusão com erros: retomar refaz os chunks que falharam
+        return None
+    return checkpoint.concluido
@@ -0,0 +1,212 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from lote import executar_lote, nome_arquivo_saida
+from configuracao import CONFIG_LOTE_PADRAO
+from cache_transcricao import obter_cache
+from backends import BACKENDS, SEM_FALLBACK
+from saida import formatos_configurados
+from varredura import extensoes_configuradas, arquivo_de_audio, varrer_pasta
+
+def expandir_entradas(entradas, extensoes, recursivo=True):
+    """
+    Converte arquivos, pastas e padrões glob na lista de arquivos com uma das
+    extensoes, na ordem dada e sem repetições. Retorna (arquivos, entradas_sem_arquivos).
+    """
+    arquivos = []
+    vistos = set()
+    sem_arquivos = []
+
+    def adicionar(caminho):
+        # Conta como encontrado mesmo se já veio de outra entrada
+        if not arquivo_de_audio(os.path.basename(caminho), extensoes):
+            return False
+        chave = os.path.normcase(os.path.abspath(caminho))
+        if chave not in vistos:
+            vistos.add(chave)
+            arquivos.append(caminho)
+        return True
+
+    def adicionar_pasta(pasta):
+        return sum(adicionar(caminho) for caminho in varrer_pasta(pasta, extensoes, recursivo))
+
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            adicionados = adicionar_pasta(entrada)
+        elif os.path.isfile(entrada):
+            adicionados = adicionar(entrada)
+        else:
+            adicionados = 0
+            for caminho in sorted(glob.glob(entrada, recursive=True)):
+                adicionados += adicionar_pasta(caminho) if os.path.isdir(caminho) else adicionar(caminho)
+        if not adicionados:
+            sem_arquivos.append(entrada)
+
+    return arquivos, sem_arquivos
+
+def carregar_config(caminho):
+    """Configurações padrão do lote com as do arquivo JSON (o mesmo salvo pela interface) por cima"""
+    config = dict(CONFIG_LOTE_PADRAO)
+    if caminho:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            config.update(json.load(f))
+    return config
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="transcricao",
+        description="Transcreve arquivos de áudio/vídeo sem interface gráfica. O progresso vai para a "
+                    "saída de erro e um resumo em JSON para a saída padrão.")
+    parser.add_argument('entradas', nargs='+', metavar='ENTRADA',
+                        help="arquivo, pasta ou padrão glob (ex.: 'gravacoes/**/*.mp3')")
+    parser.add_argument('-c', '--config', metavar='ARQUIVO',
+                        help="JSON de configurações (ex.: config_transcricao.json), aplicado sobre os padrões")
+    parser.add_argument('-o', '--pasta-saida', metavar='PASTA',
+                        help="pasta das transcrições (padrão: ao lado de cada arquivo)")
+    parser.add_argument('-w', '--workers', type=int, metavar='N',
+                        help="threads de reconhecimento por arquivo (max_workers)")
+    parser.add_argument('--arquivos-simultaneos', type=int, metavar='N',
+                        help="arquivos em reconhecimento ao mesmo tempo")
+    parser.add_argument('--processos', type=int, metavar='N',
+                        help="processos de conversão (0 ou 1 convertem na thread de reconhecimento)")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), help="backend de reconhecimento")
+    parser.add_argument('-f', '--formatos', metavar='LISTA',
+                        help="formatos além do texto, separados por vírgula: srt, vtt, jsonl")
+    parser.add_argument('--timestamp', action='store_true', help="incluir timestamps na transcrição")
+    parser.add_argument('--reprocessar', action='store_true',
+                        help="ignorar checkpoints e transcrever de novo arquivos já concluídos")
+    parser.add_argument('--manifesto', metavar='ARQUIVO',
+                        help="manifesto SQLite dos arquivos já transcritos (padrão: ~/.transcricao_manifesto.sqlite3)")
+    parser.add_argument('--sem-manifesto', action='store_true',
+                        help="não consultar nem atualizar o manifesto")
+    parser.add_argument('--extensoes', metavar='LISTA',
+                        help="extensões procuradas em pastas e padrões, separadas por vírgula "
+                             "(padrão: mp3,mp4,wav,m4a,ogg,flac,mkv,webm)")
+    parser.add_argument('--perfil', metavar='ARQUIVO',
+                        help="gravar o tempo de cada etapa em ARQUIVO (JSON) e em Chrome trace (.trace.json)")
+    parser.add_argument('--sem-subpastas', action='store_true', help="não procurar arquivos em subpastas")
+    parser.add_argument('-q', '--silencioso', action='store_true', help="não mostrar o progresso")
+    return parser
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando. Retorna o código de saída: 0 se
+    todos os arquivos foram transcritos; 1 se algum falhou, terminou com
+    chunks com erro, ficou sem processar (interrupção) ou alguma entrada não
+    tinha arquivos, inclusive quando nenhuma tinha; 2 para erros de uso ou de
+    configuração e conflitos de nome na pasta de saída.
+    """
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        config = carregar_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao ler as configurações: {e}", file=sys.stderr)
+        return 2
+
+    if args.workers is not None:
+        config['max_workers'] = args.workers
+    if args.arquivos_simultaneos is not None:
+        config['arquivos_simultaneos'] = args.arquivos_simultaneos
+    if args.processos is not None:
+        config['processos_conversao'] = args.processos
+    if args.backend:
+        config['backend'] = args.backend
+    if args.pasta_saida:
+        config['pasta_saida'] = args.pasta_saida
+    if args.timestamp:
+        config['incluir_timestamp'] = True
+    if args.formatos:
+        config['formatos_saida'] = args.formatos
+    if args.reprocessar:
+        config['retomar_lote'] = False
+    if args.manifesto:
+        config['arquivo_manifesto'] = args.manifesto
+    if args.sem_manifesto:
+        config['usar_manifesto'] = False
+    if args.extensoes:
+        config['extensoes_audio'] = args.extensoes
+    if args.perfil:
+        config['arquivo_perfil'] = args.perfil
+    if config['max_workers'] < 1 or config['arquivos_simultaneos'] < 1 or config['processos_conversao'] < 0:
+        parser.error("workers e arquivos simultâneos devem ser ≥ 1, e processos ≥ 0")
+    if config['backend'] not in BACKENDS or (config['backend_fallback'] or SEM_FALLBACK) not in list(BACKENDS) + [SEM_FALLBACK]:
+        parser.error(f"backend desconhecido na configuração: {config['backend']} / {config['backend_fallback']}")
+    try:
+        formatos_configurados(config)
+    except ValueError as e:
+        parser.error(str(e))
+
+    def callback_progresso(mensagem):
+        if not args.silencioso:
+            print(mensagem, file=sys.stderr, flush=True)
+
+    extensoes = extensoes_configuradas(config)
+    arquivos, sem_arquivos = expandir_entradas(args.entradas, extensoes, recursivo=not args.sem_subpastas)
+    for entrada in sem_arquivos:
+        callback_progresso(f"⚠️ Nenhum arquivo {', '.join(extensoes)} em: {entrada}")
+    if not arquivos:
+        print("Nenhum arquivo para transcrever", file=sys.stderr)
+        return 1
+
+    # Com pasta de saída, arquivos de mesmo nome em pastas diferentes se sobrescreveriam
+    saidas = {}
+    for arquivo in arquivos:
+        saida = os.path.normcase(os.path.abspath(nome_arquivo_saida(arquivo, config)))
+        if saida in saidas:
+            print(f"Conflito de saída: {saidas[saida]} e {arquivo} gerariam {nome_arquivo_saida(arquivo, config)}",
+                  file=sys.stderr)
+            return 2
+        saidas[saida] = arquivo
+
+    cache = obter_cache(config)
+    inicio = time.perf_counter()
+    resultados = []
+    try:
+        for resultado in executar_lote(arquivos, config, callback_progresso):
+            if resultado['erro']:
+                callback_progresso(f"✗ ERRO no arquivo {os.path.basename(resultado['arquivo'])}: {resultado['erro']}")
+            resultados.append(resultado)
+    except KeyboardInterrupt:
+        # Os checkpoints permitem retomar; o resumo mostra o que foi concluído
+        callback_progresso("Interrompido")
+    resultados.sort(key=lambda resultado: resultado['indice'])
+
+    resumo = {
+        'arquivos': [{
+            'arquivo': resultado['arquivo'],
+            'saida': resultado.get('saida'),
+            'saidas': resultado.get('saidas'),
+            'tempo': round(resultado['tempo'], 3),
+            'chunks': resultado.get('chunks', 0),
+            'chunks_com_erro': resultado.get('chunks_com_erro', 0),
+            'pulado': resultado['pulado'],
+            'erro': resultado['erro'],
+        } for resultado in resultados],
+        'total_arquivos': len(arquivos),
+        'transcritos': sum(1 for resultado in resultados if not resultado['erro'] and not resultado['pulado']),
+        'pulados': sum(1 for resultado in resultados if resultado['pulado']),
+        'com_erro': sum(1 for resultado in resultados if resultado['erro']),
+        'nao_processados': len(arquivos) - len(resultados),
+        'entradas_sem_arquivos': sem_arquivos,
+        'chunks': sum(resultado.get('chunks', 0) for resultado in resultados),
+        'chunks_com_erro': sum(resultado.get('chunks_com_erro', 0) for resultado in resultados),
+        'tempo_total': round(time.perf_counter() - inicio, 3),
+        'backend': config['backend'],
+    }
+    if cache:
+        resumo['cache'] = {'acertos': cache.acertos, 'falhas': cache.falhas}
+    json.dump(resumo, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+    # Chunks com erro deixam a transcrição incompleta: a próxima execução os refaz
+    if resumo['com_erro'] or resumo['chunks_com_erro'] or resumo['nao_processados'] or sem_arquivos:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
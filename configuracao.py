@@ -0,0 +1,50 @@
+# Valores padrão das configurações, num módulo leve: a linha de comando e a
+# interface partem deles sem importar transcriber/lote (e a pilha de áudio)
+from varredura import EXTENSOES_PADRAO
+
+# Configurações padrão de transcribe_audio (a interface e a linha de comando partem destes valores)
+CONFIG_PADRAO = {
+    'energy_threshold': 300,
+    'pause_threshold': 0.6,
+    'operation_timeout': 30,
+    'phrase_threshold': 0.3,
+    'non_speaking_duration': 0.6,
+    'min_silence_len': 700,
+    'silence_thresh_offset': -12,
+    'keep_silence': 400,
+    'chunk_length': 10000,
+    'max_chunk_size': 15000,
+    'sub_chunk_length': 8000,
+    'max_tentativas': 2,
+    'timeout_tentativa': 15,
+    'pausa_entre_tentativas': 0.8,
+    'sample_rate': 16000,
+    'filtro_freq_baixa': 80,
+    'filtro_freq_alta': 8000,
+    'max_workers': 1,
+    'modo_streaming': False,
+    'janela_streaming_ms': 60000,
+    'cache_tamanho_max_mb': 500,
+    'requisicoes_por_segundo': 5,
+    'backend': 'google',
+    'backend_fallback': 'sphinx',
+    'normalizar_por_chunk': False,
+    'calibrar_ruido_por_chunk': False,
+    'pular_chunks_de_ruido': False,
+    'incluir_timestamp': False,
+    'timestamp_completo': False
+}
+
+# Configurações padrão do lote: as de transcribe_audio mais as da conversão e da saída
+CONFIG_LOTE_PADRAO = dict(CONFIG_PADRAO,
+    processos_conversao=1,
+    arquivos_simultaneos=1,
+    salvar_wav=False,
+    retomar_lote=True,
+    pasta_saida='',
+    formatos_saida='txt',
+    usar_manifesto=True,
+    arquivo_manifesto='',
+    extensoes_audio=EXTENSOES_PADRAO,
+    arquivo_perfil='',
+)
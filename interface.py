@@ -1,45 +1,40 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-from transcriber import transcribe_audio, converter_para_wav, limpar_arquivo_temp
 import threading
+import queue
+import time
 import os
-import glob
-import json
-import hashlib
 import json
 from datetime import datetime
+from saida import formatos_configurados
+from configuracao import CONFIG_LOTE_PADRAO
+from varredura import extensoes_configuradas, varrer_em_lotes
+from verificacao import verificar_arquivos, RelatorioConsistencia
+from lista_virtual import ListaArquivosVirtual
+
+# lote (transcriber, speech_recognition, pydub, NumPy) e backends são importados só
+# quando usados: a janela abre sem carregar a pilha de áudio nem procurar o ffmpeg
 
 # Lista global para armazenar arquivos selecionados
 arquivos_selecionados = []
 
-# Configurações padrão
-config_transcricao = {
-    # Reconhecimento
-    'energy_threshold': 300,
-    'pause_threshold': 0.6,
-    'operation_timeout': 30,
-    'phrase_threshold': 0.3,
-    'non_speaking_duration': 0.6,
-    
-    # Divisão de áudio
-    'min_silence_len': 700,
-    'silence_thresh_offset': -12,
-    'keep_silence': 400,
-    'chunk_length': 10000,
-    'max_chunk_size': 15000,
-    'sub_chunk_length': 8000,
-    
-    # Processamento
-    'max_tentativas': 2,
-    'timeout_tentativa': 15,
-    'pausa_entre_tentativas': 0.8,
-    'sample_rate': 16000,
-    'filtro_freq_baixa': 80,
-    'filtro_freq_alta': 8000,
-    
-    # Timestamp
-    'incluir_timestamp': False
-}
+# Mensagens e chamadas vindas da thread do lote; só a thread da interface mexe nos widgets
+fila_interface = queue.Queue()
+
+# Intervalo entre as leituras da fila pela interface (ms)
+INTERVALO_FILA_MS = 100
+
+# Linhas mantidas no log de progresso; as mais antigas são descartadas
+MAX_LINHAS_LOG = 5000
+
+# Configurações padrão: as do lote mais as dos backends, que só a interface expõe
+CONFIG_INTERFACE_PADRAO = dict(CONFIG_LOTE_PADRAO,
+    pasta_cache='',
+    modelo_vosk='model',
+    latencia_fake=0,
+)
+
+config_transcricao = dict(CONFIG_INTERFACE_PADRAO)
 
 def salvar_configuracoes():
     try:
@@ -59,6 +54,8 @@ def carregar_configuracoes():
         messagebox.showwarning("Aviso", f"Erro ao carregar configurações: {str(e)}\nUsando configurações padrão.")
 
 def abrir_configuracoes():
+    from backends import BACKENDS, SEM_FALLBACK
+    
     # Janela de configurações
     janela_config = tk.Toplevel(janela)
     janela_config.title("Configurações de Transcrição")
@@ -85,6 +82,24 @@ def abrir_configuracoes():
         vars_config[key] = (var, tipo)
         return var
     
+    # Função para criar campo de texto
+    def criar_campo_texto(parent, label, key, row=0):
+        tk.Label(parent, text=label).grid(row=row, column=0, sticky="w", padx=5, pady=2)
+        var = tk.StringVar(value=str(config_transcricao[key]))
+        entry = tk.Entry(parent, textvariable=var, width=30)
+        entry.grid(row=row, column=1, padx=5, pady=2, sticky="w")
+        vars_config[key] = (var, str)
+        return var
+    
+    # Função para criar campo de seleção
+    def criar_campo_opcoes(parent, label, key, opcoes, row=0):
+        tk.Label(parent, text=label).grid(row=row, column=0, sticky="w", padx=5, pady=2)
+        var = tk.StringVar(value=str(config_transcricao[key]))
+        combo = ttk.Combobox(parent, textvariable=var, values=opcoes, state="readonly", width=12)
+        combo.grid(row=row, column=1, padx=5, pady=2)
+        vars_config[key] = (var, str)
+        return var
+    
     # Campos de Reconhecimento
     tk.Label(frame_reconhecimento, text="Configurações do Reconhecedor:", font=("Arial", 10, "bold")).grid(row=0, column=0, columnspan=2, sticky="w", padx=5, pady=(10,5))
     
@@ -94,6 +109,13 @@ def abrir_configuracoes():
     criar_campo_numerico(frame_reconhecimento, "Limite de Frase (s):", 'phrase_threshold', float, 4)
     criar_campo_numerico(frame_reconhecimento, "Duração Não-Fala (s):", 'non_speaking_duration', float, 5)
     
+    tk.Label(frame_reconhecimento, text="Backend de Reconhecimento:", font=("Arial", 10, "bold")).grid(row=6, column=0, columnspan=2, sticky="w", padx=5, pady=(10,5))
+    
+    criar_campo_opcoes(frame_reconhecimento, "Backend Principal:", 'backend', list(BACKENDS), 7)
+    criar_campo_opcoes(frame_reconhecimento, "Backend de Fallback:", 'backend_fallback', list(BACKENDS) + [SEM_FALLBACK], 8)
+    criar_campo_texto(frame_reconhecimento, "Pasta do Modelo Vosk:", 'modelo_vosk', 9)
+    criar_campo_numerico(frame_reconhecimento, "Latência do Backend Fake (s):", 'latencia_fake', float, 10)
+    
     # Aba 2: Divisão de Áudio
     frame_divisao = ttk.Frame(notebook)
     notebook.add(frame_divisao, text="Divisão de Áudio")
@@ -106,6 +128,7 @@ def abrir_configuracoes():
     criar_campo_numerico(frame_divisao, "Tamanho Chunk Forçado (ms):", 'chunk_length', int, 4)
     criar_campo_numerico(frame_divisao, "Tamanho Máximo Chunk (ms):", 'max_chunk_size', int, 5)
     criar_campo_numerico(frame_divisao, "Tamanho Sub-chunk (ms):", 'sub_chunk_length', int, 6)
+    criar_campo_numerico(frame_divisao, "Janela do Modo Streaming (ms):", 'janela_streaming_ms', int, 7)
     
     # Aba 3: Processamento
     frame_processamento = ttk.Frame(notebook)
@@ -115,10 +138,18 @@ def abrir_configuracoes():
     
     criar_campo_numerico(frame_processamento, "Máximo de Tentativas:", 'max_tentativas', int, 1)
     criar_campo_numerico(frame_processamento, "Timeout por Tentativa (s):", 'timeout_tentativa', int, 2)
-    criar_campo_numerico(frame_processamento, "Pausa entre Tentativas (s):", 'pausa_entre_tentativas', float, 3)
+    criar_campo_numerico(frame_processamento, "Pausa Base entre Tentativas (s):", 'pausa_entre_tentativas', float, 3)
     criar_campo_numerico(frame_processamento, "Taxa de Amostragem (Hz):", 'sample_rate', int, 4)
     criar_campo_numerico(frame_processamento, "Filtro Freq. Baixa (Hz):", 'filtro_freq_baixa', int, 5)
     criar_campo_numerico(frame_processamento, "Filtro Freq. Alta (Hz):", 'filtro_freq_alta', int, 6)
+    criar_campo_numerico(frame_processamento, "Reconhecimentos Simultâneos:", 'max_workers', int, 7)
+    criar_campo_numerico(frame_processamento, "Processos de Conversão (0-1 = sem pool):", 'processos_conversao', int, 8)
+    criar_campo_numerico(frame_processamento, "Arquivos Simultâneos:", 'arquivos_simultaneos', int, 9)
+    criar_campo_numerico(frame_processamento, "Cache de Transcrição (MB, 0 = desativado):", 'cache_tamanho_max_mb', int, 10)
+    criar_campo_numerico(frame_processamento, "Máximo de Requisições por Segundo:", 'requisicoes_por_segundo', float, 11)
+    criar_campo_texto(frame_processamento, "Formatos de Saída (txt, srt, vtt, jsonl):", 'formatos_saida', 12)
+    criar_campo_texto(frame_processamento, "Extensões Procuradas nas Pastas:", 'extensoes_audio', 13)
+    criar_campo_texto(frame_processamento, "Arquivo de Perfil (JSON, vazio = desativado):", 'arquivo_perfil', 14)
     
     # Frame para botões
     frame_botoes_config = tk.Frame(janela_config)
@@ -136,6 +167,8 @@ def abrir_configuracoes():
                     config_transcricao[key] = int(valor)
                 elif tipo == float:
                     config_transcricao[key] = float(valor)
+                else:
+                    config_transcricao[key] = valor
             
             # Validações específicas
             if config_transcricao['energy_threshold'] < 0:
@@ -146,6 +179,23 @@ def abrir_configuracoes():
                 raise ValueError("Silêncio mínimo deve ser pelo menos 100ms")
             if config_transcricao['max_tentativas'] < 1:
                 raise ValueError("Deve haver pelo menos 1 tentativa")
+            if config_transcricao['max_workers'] < 1:
+                raise ValueError("Deve haver pelo menos 1 reconhecimento simultâneo")
+            if config_transcricao['processos_conversao'] < 0:
+                raise ValueError("Processos de conversão não pode ser negativo")
+            if config_transcricao['arquivos_simultaneos'] < 1:
+                raise ValueError("Deve haver pelo menos 1 arquivo simultâneo")
+            if config_transcricao['cache_tamanho_max_mb'] < 0:
+                raise ValueError("Tamanho do cache não pode ser negativo")
+            if config_transcricao['latencia_fake'] < 0:
+                raise ValueError("Latência do backend fake não pode ser negativa")
+            if config_transcricao['requisicoes_por_segundo'] <= 0:
+                raise ValueError("Requisições por segundo deve ser maior que zero")
+            if config_transcricao['janela_streaming_ms'] < config_transcricao['chunk_length']:
+                raise ValueError("A janela do modo streaming deve ser maior que o tamanho do chunk forçado")
+            formatos_configurados(config_transcricao)
+            if not extensoes_configuradas(config_transcricao):
+                raise ValueError("Informe pelo menos uma extensão de arquivo")
             
             messagebox.showinfo("Sucesso", "Configurações aplicadas com sucesso!")
             janela_config.destroy()
@@ -157,32 +207,13 @@ def abrir_configuracoes():
     
     def resetar_configuracoes():
         if messagebox.askyesno("Confirmar", "Resetar todas as configurações para os valores padrão?"):
-            # Resetar para valores padrão
-            config_padrao = {
-                'energy_threshold': 300,
-                'pause_threshold': 0.6,
-                'operation_timeout': 30,
-                'phrase_threshold': 0.3,
-                'non_speaking_duration': 0.6,
-                'min_silence_len': 700,
-                'silence_thresh_offset': -12,
-                'keep_silence': 400,
-                'chunk_length': 10000,
-                'max_chunk_size': 15000,
-                'sub_chunk_length': 8000,
-                'max_tentativas': 2,
-                'timeout_tentativa': 15,
-                'pausa_entre_tentativas': 0.8,
-                'sample_rate': 16000,
-                'filtro_freq_baixa': 80,
-                'filtro_freq_alta': 8000
-            }
-            
-            config_transcricao.update(config_padrao)
+            config_transcricao.update(CONFIG_INTERFACE_PADRAO)
             
             # Atualizar campos na interface
             for key, (var, tipo) in vars_config.items():
                 var.set(str(config_transcricao[key]))
+            modo_streaming.set(config_transcricao['modo_streaming'])
+            retomar_lote.set(config_transcricao['retomar_lote'])
     
     # Botões
     tk.Button(frame_botoes_config, text="Aplicar", command=aplicar_configuracoes, bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
@@ -190,7 +221,47 @@ def abrir_configuracoes():
     tk.Button(frame_botoes_config, text="Resetar", command=resetar_configuracoes, bg="#FF9800", fg="white").pack(side=tk.LEFT, padx=5)
     tk.Button(frame_botoes_config, text="Cancelar", command=janela_config.destroy, bg="#f44336", fg="white").pack(side=tk.RIGHT, padx=5)
 
-def iniciar_transcricao():
+def registrar_log(mensagem):
+    """Envia uma linha para o log de progresso (pode ser chamada de qualquer thread)"""
+    fila_interface.put((None, mensagem))
+
+def na_interface(funcao, *argumentos):
+    """Agenda funcao(*argumentos) na thread da interface, na ordem das mensagens de log"""
+    fila_interface.put((funcao, argumentos))
+
+def inserir_linhas_log(linhas):
+    """Insere várias linhas de uma vez e descarta as mais antigas acima de MAX_LINHAS_LOG"""
+    txt_saida.insert(tk.END, "\n".join(linhas) + "\n")
+    total_linhas = int(txt_saida.index("end-1c").split(".")[0]) - 1
+    if total_linhas > MAX_LINHAS_LOG:
+        txt_saida.delete("1.0", f"{total_linhas - MAX_LINHAS_LOG + 1}.0")
+    txt_saida.see(tk.END)
+
+def processar_fila_interface():
+    """Esvazia a fila da thread do lote a cada INTERVALO_FILA_MS, juntando as linhas de log em um só insert"""
+    linhas = []
+    try:
+        while True:
+            try:
+                funcao, argumentos = fila_interface.get_nowait()
+            except queue.Empty:
+                break
+            if funcao is None:
+                linhas.append(argumentos)
+                continue
+            if linhas:
+                inserir_linhas_log(linhas)
+                linhas = []
+            funcao(*argumentos)
+        if linhas:
+            inserir_linhas_log(linhas)
+    finally:
+        janela.after(INTERVALO_FILA_MS, processar_fila_interface)
+
+def definir_progresso(valor):
+    progress_bar['value'] = valor
+
+def iniciar_transcricao(retomar=True):
     try:
         if not arquivos_selecionados:
             messagebox.showwarning("Atenção", "Selecione arquivos ou uma pasta para transcrever")
@@ -204,103 +275,70 @@ def iniciar_transcricao():
         btn_limpar.config(state=tk.DISABLED)
         txt_saida.delete(1.0, tk.END)
         
+        # Opções lidas aqui: variáveis do Tk só podem ser acessadas na thread da interface
+        config_atual = config_transcricao.copy()
+        config_atual['incluir_timestamp'] = incluir_timestamp.get()
+        config_atual['timestamp_completo'] = timestamp_completo.get()
+        config_atual['modo_streaming'] = modo_streaming.get()
+        # Reprocessamento ignora os checkpoints; o cache ainda evita reconhecer de novo os chunks bons
+        config_atual['retomar_lote'] = retomar and retomar_lote.get()
+        
         # Cria thread para evitar congelamento da UI
-        thread = threading.Thread(target=executar_transcricao_lote, args=(arquivos_selecionados.copy(),))
+        thread = threading.Thread(target=executar_transcricao_lote, args=(arquivos_selecionados.copy(), config_atual))
         thread.start()
     except Exception as e:
         messagebox.showerror("Erro", str(e))
         reativar_botoes()
 
-def executar_transcricao_lote(lista_arquivos):
+def criar_botao_abrir_pasta(pasta):
+    # Adiciona botão para abrir pasta apenas se não existir
+    if not hasattr(executar_transcricao_lote, 'btn_pasta_criado'):
+        btn_abrir_pasta = tk.Button(frame_botoes, text="Abrir Pasta dos Resultados", 
+                                  command=lambda: os.startfile(pasta))
+        btn_abrir_pasta.pack(side=tk.LEFT, padx=5)
+        executar_transcricao_lote.btn_pasta_criado = True
+
+def executar_transcricao_lote(lista_arquivos, config_atual):
+    """Roda na thread do lote: toda atualização da interface passa pela fila_interface"""
     try:
+        # Primeira transcrição: a pilha de áudio é carregada aqui, fora da thread da interface
+        from lote import executar_lote
+        from cache_transcricao import obter_cache
+        
         total_arquivos = len(lista_arquivos)
         arquivos_processados = 0
         arquivos_com_erro = 0
         
-        def callback_progresso(mensagem):
-            txt_saida.insert(tk.END, mensagem + '\n')
-            txt_saida.see(tk.END)
-            txt_saida.update()
+        callback_progresso = registrar_log
+        
+        def callback_estado(indice, arquivo, estado):
+            na_interface(marcar_estado_arquivo, indice, arquivo, estado)
         
         callback_progresso(f"=== INICIANDO PROCESSAMENTO EM LOTE ===")
         callback_progresso(f"Total de arquivos: {total_arquivos}")
-        callback_progresso(f"Configurações ativas: {len(config_transcricao)} parâmetros")
-        if incluir_timestamp.get():
+        callback_progresso(f"Configurações ativas: {len(config_atual)} parâmetros")
+        if config_atual['incluir_timestamp']:
             callback_progresso(f"✓ Timestamps habilitados")
+        callback_progresso(f"✓ Backend: {config_atual['backend']} (fallback: {config_atual['backend_fallback']})")
         callback_progresso(f"="*50)
         
-        for i, arquivo in enumerate(lista_arquivos, 1):
-            wav_file = None
-            try:
-                callback_progresso(f"\n[{i}/{total_arquivos}] Processando: {os.path.basename(arquivo)}")
-                
-                # Atualizar barra de progresso
-                progresso_geral = (i-1) / total_arquivos * 100
-                progress_bar['value'] = progresso_geral
-                progress_bar.update()
-                
-                wav_file = converter_para_wav(arquivo)
-                callback_progresso(f"✓ Arquivo convertido para WAV")
-                
-                resultado = ""
-                chunk_count = 0
-                chunks_com_erro = 0
-                
-                # Atualizar configuração com timestamp
-                config_atual = config_transcricao.copy()
-                config_atual['incluir_timestamp'] = incluir_timestamp.get()
-                
-                # Passar configurações para a função de transcrição
-                for chunk_data in transcribe_audio(wav_file, ".", callback_progresso, config=config_atual):
-                    if isinstance(chunk_data, dict) and 'texto' in chunk_data:
-                        # Formato com timestamp
-                        if chunk_data.get('timestamp'):
-                            resultado += f"[{chunk_data['timestamp']}] {chunk_data['texto']}\n"
-                        else:
-                            resultado += chunk_data['texto'] + " "
-                    else:
-                        # Formato antigo (só texto)
-                        resultado += str(chunk_data) + " "
-                    
-                    chunk_count += 1
-                    
-                    # Contar erros
-                    texto_chunk = chunk_data.get('texto', str(chunk_data)) if isinstance(chunk_data, dict) else str(chunk_data)
-                    if "[ERRO" in texto_chunk or "[Erro" in texto_chunk:
-                        chunks_com_erro += 1
-                    
-                    # Atualizar progresso do arquivo atual
-                    if chunk_count % 5 == 0:  # A cada 5 chunks
-                        callback_progresso(f"  → {chunk_count} chunks processados")
-                
-                # Salvar resultado
-                sufixo = "_transcrito_com_timestamp.txt" if incluir_timestamp.get() else "_transcrito.txt"
-                nome_saida = os.path.splitext(arquivo)[0] + sufixo
-                with open(nome_saida, 'w', encoding='utf-8') as f:
-                    f.write(resultado.strip())
-                    
-                callback_progresso(f"✓ Transcrição salva: {os.path.basename(nome_saida)}")
-                callback_progresso(f"  → Total de chunks: {chunk_count}, Chunks com erro: {chunks_com_erro}")
-                
-                if chunks_com_erro > 0:
-                    callback_progresso(f"  ⚠️ Atenção: {chunks_com_erro} chunks tiveram problemas")
-                
-                arquivos_processados += 1
-                
-            except Exception as e:
-                callback_progresso(f"✗ ERRO no arquivo {os.path.basename(arquivo)}: {str(e)}")
+        # Contadores do cache antes do lote, para relatar apenas o uso deste processamento
+        cache = obter_cache(config_atual)
+        acertos_iniciais = cache.acertos if cache else 0
+        falhas_iniciais = cache.falhas if cache else 0
+        
+        # Conversão em processos separados e reconhecimento em threads, sobrepondo arquivos
+        for resultado in executar_lote(lista_arquivos, config_atual, callback_progresso, callback_estado):
+            nome_arquivo = os.path.basename(resultado['arquivo'])
+            if resultado['erro']:
+                callback_progresso(f"✗ ERRO no arquivo {nome_arquivo}: {resultado['erro']}")
                 arquivos_com_erro += 1
+            else:
+                arquivos_processados += 1
             
-            finally:
-                # Limpar arquivo temporário WAV
-                if wav_file:
-                    limpar_arquivo_temp(wav_file)
-                    callback_progresso(f"  → Arquivos temporários removidos")
-            
-            # Atualizar barra de progresso final do arquivo
-            progresso_geral = i / total_arquivos * 100
-            progress_bar['value'] = progresso_geral
-            progress_bar.update()
+            # Atualizar barra de progresso pelos arquivos concluídos
+            progresso_geral = (arquivos_processados + arquivos_com_erro) / total_arquivos * 100
+            na_interface(definir_progresso, progresso_geral)
         
         # Relatório final
         callback_progresso(f"\n" + "="*50)
@@ -308,28 +346,26 @@ def executar_transcricao_lote(lista_arquivos):
         callback_progresso(f"Arquivos processados com sucesso: {arquivos_processados}")
         callback_progresso(f"Arquivos com erro: {arquivos_com_erro}")
         callback_progresso(f"Total: {total_arquivos}")
+        if cache:
+            callback_progresso(f"Cache de transcrição: {cache.acertos - acertos_iniciais} acertos, "
+                               f"{cache.falhas - falhas_iniciais} falhas")
         
         if arquivos_processados > 0:
-            # Adiciona botão para abrir pasta apenas se não existir
-            if not hasattr(executar_transcricao_lote, 'btn_pasta_criado'):
-                btn_abrir_pasta = tk.Button(frame_botoes, text="Abrir Pasta dos Resultados", 
-                                          command=lambda: os.startfile(os.path.dirname(lista_arquivos[0])))
-                btn_abrir_pasta.pack(side=tk.LEFT, padx=5)
-                executar_transcricao_lote.btn_pasta_criado = True
+            na_interface(criar_botao_abrir_pasta, config_atual['pasta_saida'] or os.path.dirname(lista_arquivos[0]))
         
         if arquivos_com_erro == 0:
-            messagebox.showinfo("Sucesso", f"Todos os {arquivos_processados} arquivos foram transcritos com sucesso!")
+            na_interface(messagebox.showinfo, "Sucesso", f"Todos os {arquivos_processados} arquivos foram transcritos com sucesso!")
         else:
-            messagebox.showwarning("Concluído com avisos", 
+            na_interface(messagebox.showwarning, "Concluído com avisos", 
                                  f"Processamento concluído:\n" +
                                  f"• Sucessos: {arquivos_processados}\n" +
                                  f"• Erros: {arquivos_com_erro}")
         
     except Exception as e:
-        messagebox.showerror("Erro", f"Erro geral no processamento: {str(e)}")
+        na_interface(messagebox.showerror, "Erro", f"Erro geral no processamento: {str(e)}")
     finally:
-        progress_bar['value'] = 100
-        reativar_botoes()
+        na_interface(definir_progresso, 100)
+        na_interface(reativar_botoes)
 
 def reativar_botoes():
     btn_iniciar.config(state=tk.NORMAL)
@@ -338,16 +374,18 @@ def reativar_botoes():
     btn_selecionar_pasta.config(state=tk.NORMAL)
     btn_limpar.config(state=tk.NORMAL)
 
+def tipos_arquivo_dialogo():
+    """Filtros dos diálogos de seleção: todas as extensões configuradas, cada uma e todos os arquivos"""
+    extensoes = extensoes_configuradas(config_transcricao)
+    tipos = [("Arquivos de Áudio/Vídeo", " ".join("*" + extensao for extensao in extensoes))]
+    tipos.extend((f"Arquivos {extensao[1:].upper()}", "*" + extensao) for extensao in extensoes)
+    tipos.append(("Todos os arquivos", "*.*"))
+    return tipos
+
 def selecionar_arquivo_unico():
     arquivo = filedialog.askopenfilename(
         title="Selecionar um arquivo",
-        filetypes=(
-            ("Arquivos de Áudio/Vídeo", "*.mp4 *.mp3 *.wav"),
-            ("Arquivos MP4", "*.mp4"), 
-            ("Arquivos MP3", "*.mp3"),
-            ("Arquivos WAV", "*.wav"),
-            ("Todos os arquivos", "*.*")
-        )
+        filetypes=tipos_arquivo_dialogo()
     )
     if arquivo:
         arquivos_selecionados.clear()
@@ -357,13 +395,7 @@ def selecionar_arquivo_unico():
 def selecionar_multiplos_arquivos():
     arquivos = filedialog.askopenfilenames(
         title="Selecionar múltiplos arquivos",
-        filetypes=(
-            ("Arquivos de Áudio/Vídeo", "*.mp4 *.mp3 *.wav"),
-            ("Arquivos MP4", "*.mp4"), 
-            ("Arquivos MP3", "*.mp3"),
-            ("Arquivos WAV", "*.wav"),
-            ("Todos os arquivos", "*.*")
-        )
+        filetypes=tipos_arquivo_dialogo()
     )
     if arquivos:
         arquivos_selecionados.clear()
@@ -372,141 +404,60 @@ def selecionar_multiplos_arquivos():
 
 def selecionar_pasta():
     pasta = filedialog.askdirectory(title="Selecionar pasta com arquivos de áudio/vídeo")
-    if pasta:
-        # Buscar todos os arquivos compatíveis na pasta
-        extensoes = ['*.mp3', '*.mp4', '*.wav']
-        arquivos_encontrados = []
-        
-        for extensao in extensoes:
-            arquivos_encontrados.extend(glob.glob(os.path.join(pasta, extensao)))
-            # Buscar também em subpastas (opcional)
-            arquivos_encontrados.extend(glob.glob(os.path.join(pasta, '**', extensao), recursive=True))
-        
-        if arquivos_encontrados:
-            arquivos_selecionados.clear()
-            arquivos_selecionados.extend(sorted(set(arquivos_encontrados)))  # Remove duplicatas e ordena
-            atualizar_lista_arquivos()
-            messagebox.showinfo("Pasta selecionada", 
-                              f"Encontrados {len(arquivos_selecionados)} arquivos compatíveis na pasta selecionada.")
-        else:
-            messagebox.showwarning("Nenhum arquivo encontrado", 
-                                 "Não foram encontrados arquivos MP3, MP4 ou WAV na pasta selecionada.")
+    if not pasta:
+        return
+
+    # A varredura roda em outra thread e a lista é preenchida a cada lote, sem travar a janela
+    arquivos_selecionados.clear()
+    atualizar_lista_arquivos()
+    btn_iniciar.config(state=tk.DISABLED)
+    btn_selecionar_arquivo.config(state=tk.DISABLED)
+    btn_selecionar_multiplos.config(state=tk.DISABLED)
+    btn_selecionar_pasta.config(state=tk.DISABLED)
+    btn_limpar.config(state=tk.DISABLED)
+    label_contagem.config(text="Procurando arquivos...")
+    extensoes = extensoes_configuradas(config_transcricao)
+    threading.Thread(target=varrer_pasta_selecionada, args=(pasta, extensoes), daemon=True).start()
+
+def varrer_pasta_selecionada(pasta, extensoes):
+    """Executada fora da thread da interface: envia os arquivos encontrados em lotes"""
+    try:
+        for lote in varrer_em_lotes(pasta, extensoes):
+            na_interface(adicionar_arquivos_lista, lote)
+    finally:
+        na_interface(concluir_varredura, extensoes)
+
+def adicionar_arquivos_lista(arquivos):
+    arquivos_selecionados.extend(arquivos)
+    lista_arquivos.adicionar(arquivos)
+    label_contagem.config(text=f"Arquivos selecionados: {len(arquivos_selecionados)} (procurando...)")
+
+def concluir_varredura(extensoes):
+    label_contagem.config(text=f"Arquivos selecionados: {len(arquivos_selecionados)}")
+    reativar_botoes()
+    if arquivos_selecionados:
+        messagebox.showinfo("Pasta selecionada", 
+                          f"Encontrados {len(arquivos_selecionados)} arquivos compatíveis na pasta selecionada.")
+    else:
+        messagebox.showwarning("Nenhum arquivo encontrado", 
+                             f"Não foram encontrados arquivos {', '.join(extensoes)} na pasta selecionada.")
 
 def limpar_selecao():
     arquivos_selecionados.clear()
     atualizar_lista_arquivos()
     progress_bar['value'] = 0
 
+def marcar_estado_arquivo(indice, arquivo, estado):
+    """Atualiza a linha do arquivo na lista com o estado atual do processamento"""
+    lista_arquivos.marcar_estado(arquivo, estado)
+
 def atualizar_lista_arquivos():
-    # Limpar lista
-    lista_arquivos.delete(0, tk.END)
-    
-    # Adicionar arquivos selecionados
-    for arquivo in arquivos_selecionados:
-        nome_arquivo = os.path.basename(arquivo)
-        lista_arquivos.insert(tk.END, nome_arquivo)
+    # A lista só desenha as linhas visíveis, então trocar a seleção não depende do tamanho dela
+    lista_arquivos.definir(arquivos_selecionados)
     
     # Atualizar label de contagem
     label_contagem.config(text=f"Arquivos selecionados: {len(arquivos_selecionados)}")
 
-# Configuração da janela principal
-janela = tk.Tk()
-janela.title("Transcrição de Vídeos e Áudios - Processamento em Lote")
-janela.geometry("800x680")
-janela.minsize(600, 500)
-
-# MOVER A CRIAÇÃO DA VARIÁVEL PARA AQUI (após criar a janela):
-# Variável global para controlar timestamp
-incluir_timestamp = tk.BooleanVar()
-
-# Carregar configurações ao iniciar
-carregar_configuracoes()
-
-# Frame principal
-frame = tk.Frame(janela, padx=10, pady=10)
-frame.pack(fill=tk.BOTH, expand=True)
-
-# Frame para seleção de arquivos
-frame_selecao = tk.LabelFrame(frame, text="Seleção de Arquivos", padx=5, pady=5)
-frame_selecao.pack(fill=tk.X, pady=(0, 10))
-
-# Botões de seleção
-frame_botoes = tk.Frame(frame_selecao)
-frame_botoes.pack(fill=tk.X, pady=5)
-
-btn_selecionar_arquivo = tk.Button(frame_botoes, text="📄 Arquivo Único", command=selecionar_arquivo_unico)
-btn_selecionar_arquivo.pack(side=tk.LEFT, padx=(0, 5))
-
-btn_selecionar_multiplos = tk.Button(frame_botoes, text="📄📄 Múltiplos Arquivos", command=selecionar_multiplos_arquivos)
-btn_selecionar_multiplos.pack(side=tk.LEFT, padx=5)
-
-btn_selecionar_pasta = tk.Button(frame_botoes, text="📁 Pasta Completa", command=selecionar_pasta)
-btn_selecionar_pasta.pack(side=tk.LEFT, padx=5)
-
-btn_limpar = tk.Button(frame_botoes, text="🗑️ Limpar", command=limpar_selecao)
-btn_limpar.pack(side=tk.LEFT, padx=5)
-
-# Botão de configurações
-btn_configuracoes = tk.Button(frame_botoes, text="⚙️ Configurações", command=abrir_configuracoes, bg="#9C27B0", fg="white")
-btn_configuracoes.pack(side=tk.RIGHT, padx=5)
-
-# Comentar ou remover estas linhas temporariamente:
-# btn_verificar_consistencia = tk.Button(frame_botoes, text="🔍 Verificar Consistência", 
-#                                       command=verificar_consistencia_arquivos, 
-#                                       bg="#2196F3", fg="white")
-# btn_verificar_consistencia.pack(side=tk.RIGHT, padx=(5, 0))
-
-# Label de contagem
-label_contagem = tk.Label(frame_selecao, text="Arquivos selecionados: 0", font=("Arial", 9))
-label_contagem.pack(anchor="w", pady=(5, 0))
-
-# Lista de arquivos selecionados
-frame_lista = tk.Frame(frame_selecao)
-frame_lista.pack(fill=tk.BOTH, expand=True, pady=5)
-
-scrollbar_lista = tk.Scrollbar(frame_lista)
-scrollbar_lista.pack(side=tk.RIGHT, fill=tk.Y)
-
-lista_arquivos = tk.Listbox(frame_lista, height=4, yscrollcommand=scrollbar_lista.set)
-lista_arquivos.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-scrollbar_lista.config(command=lista_arquivos.yview)
-
-# Frame para opções de transcrição
-frame_opcoes = tk.LabelFrame(frame, text="Opções de Transcrição", padx=5, pady=5)
-frame_opcoes.pack(fill=tk.X, pady=(0, 10))
-
-# Checkbox para timestamp
-chk_timestamp = tk.Checkbutton(frame_opcoes, text="🕒 Incluir timestamps na transcrição", 
-                              variable=incluir_timestamp, font=("Arial", 9))
-chk_timestamp.pack(anchor="w", padx=5, pady=5)
-
-# Label explicativo
-label_explicacao = tk.Label(frame_opcoes, 
-                           text="Quando ativado, cada segmento de áudio terá seu tempo de início marcado no formato [MM:SS]",
-                           font=("Arial", 8), fg="gray")
-label_explicacao.pack(anchor="w", padx=20, pady=(0, 5))
-
-# Barra de progresso
-frame_progresso = tk.Frame(frame)
-frame_progresso.pack(fill=tk.X, pady=(0, 10))
-
-tk.Label(frame_progresso, text="Progresso Geral:").pack(anchor="w")
-progress_bar = ttk.Progressbar(frame_progresso, length=400, mode='determinate')
-progress_bar.pack(fill=tk.X, pady=5)
-
-# Botão de iniciar
-btn_iniciar = tk.Button(frame, text="🚀 Iniciar Transcrição em Lote", command=iniciar_transcricao, 
-                       font=("Arial", 10, "bold"), bg="#4CAF50", fg="white")
-btn_iniciar.pack(pady=10)
-
-# Área de texto para saída
-tk.Label(frame, text="Log de Progresso:").pack(anchor="w")
-txt_saida = scrolledtext.ScrolledText(frame, height=12)
-txt_saida.pack(fill=tk.BOTH, expand=True)
-
-janela.mainloop()
-
-
 def verificar_consistencia_arquivos():
     """Verifica a consistência dos arquivos de transcrição gerados"""
     if not arquivos_selecionados:
@@ -535,145 +486,109 @@ def verificar_consistencia_arquivos():
     frame_btn_verif = tk.Frame(frame_verif)
     frame_btn_verif.pack(fill=tk.X)
     
+    # Fechar a janela interrompe a verificação em andamento
+    cancelado = threading.Event()
+    
+    def mostrar_verificacao(texto):
+        txt_verificacao.insert(tk.END, texto)
+        txt_verificacao.see(tk.END)
+    
+    def na_janela(funcao, *argumentos):
+        # A janela pode ter sido fechada enquanto a verificação rodava
+        def chamar():
+            if janela_verificacao.winfo_exists():
+                funcao(*argumentos)
+        na_interface(chamar)
+    
+    def finalizar_verificacao(problemas):
+        problemas_encontrados[:] = problemas
+        btn_verificar.config(state=tk.NORMAL)
+        # Habilitar botão de reprocessamento se houver problemas
+        if problemas_encontrados:
+            btn_reprocessar.config(state=tk.NORMAL)
+    
     def executar_verificacao():
         txt_verificacao.delete(1.0, tk.END)
         txt_verificacao.insert(tk.END, "=== INICIANDO VERIFICAÇÃO DE CONSISTÊNCIA ===\n\n")
-        txt_verificacao.update()
-        
-        arquivos_ok = 0
-        arquivos_problemas = 0
-        arquivos_faltando = 0
-        problemas_encontrados = []
-        
-        for i, arquivo_original in enumerate(arquivos_selecionados, 1):
-            nome_base = os.path.splitext(arquivo_original)[0]
-            
-            # Verificar ambos os tipos de arquivo de saída
-            arquivo_normal = nome_base + "_transcrito.txt"
-            arquivo_timestamp = nome_base + "_transcrito_com_timestamp.txt"
-            
-            txt_verificacao.insert(tk.END, f"[{i}/{len(arquivos_selecionados)}] Verificando: {os.path.basename(arquivo_original)}\n")
-            txt_verificacao.update()
-            
-            arquivo_transcricao = None
-            if os.path.exists(arquivo_timestamp):
-                arquivo_transcricao = arquivo_timestamp
-                tipo_arquivo = "com timestamp"
-            elif os.path.exists(arquivo_normal):
-                arquivo_transcricao = arquivo_normal
-                tipo_arquivo = "normal"
-            
-            if not arquivo_transcricao:
-                txt_verificacao.insert(tk.END, f"  ❌ FALTANDO: Arquivo de transcrição não encontrado\n")
-                arquivos_faltando += 1
-                problemas_encontrados.append({
-                    'arquivo': arquivo_original,
-                    'problema': 'Arquivo de transcrição não encontrado',
-                    'tipo': 'faltando'
-                })
-                continue
-            
-            # Verificar integridade do arquivo
-            try:
-                with open(arquivo_transcricao, 'r', encoding='utf-8') as f:
-                    conteudo = f.read()
-                
-                # Verificações de consistência
-                problemas_arquivo = []
-                
-                # 1. Verificar se o arquivo não está vazio
-                if len(conteudo.strip()) == 0:
-                    problemas_arquivo.append("Arquivo vazio")
-                
-                # 2. Verificar se há muitos erros de transcrição
-                linhas = conteudo.split('\n')
-                linhas_com_erro = sum(1 for linha in linhas if '[ERRO' in linha or '[Erro' in linha)
-                total_linhas = len([linha for linha in linhas if linha.strip()])
-                
-                if total_linhas > 0:
-                    percentual_erro = (linhas_com_erro / total_linhas) * 100
-                    if percentual_erro > 50:
-                        problemas_arquivo.append(f"Alto percentual de erros: {percentual_erro:.1f}%")
-                
-                # 3. Verificar tamanho mínimo esperado
-                tamanho_arquivo = os.path.getsize(arquivo_transcricao)
-                if tamanho_arquivo < 50:  # Menos de 50 bytes é suspeito
-                    problemas_arquivo.append(f"Arquivo muito pequeno: {tamanho_arquivo} bytes")
-                
-                # 4. Verificar se há timestamps quando esperado
-                if "timestamp" in arquivo_transcricao and not any('[' in linha and ']' in linha for linha in linhas[:10]):
-                    problemas_arquivo.append("Timestamps esperados mas não encontrados")
-                
-                # 5. Verificar encoding e caracteres estranhos
-                caracteres_estranhos = sum(1 for char in conteudo if ord(char) > 127 and char not in 'áéíóúàèìòùâêîôûãõçÁÉÍÓÚÀÈÌÒÙÂÊÎÔÛÃÕÇ')
-                if caracteres_estranhos > len(conteudo) * 0.1:  # Mais de 10% de caracteres estranhos
-                    problemas_arquivo.append(f"Muitos caracteres não reconhecidos: {caracteres_estranhos}")
-                
-                if problemas_arquivo:
-                    txt_verificacao.insert(tk.END, f"  ⚠️ PROBLEMAS ({tipo_arquivo}): {', '.join(problemas_arquivo)}\n")
-                    arquivos_problemas += 1
-                    problemas_encontrados.append({
-                        'arquivo': arquivo_original,
-                        'transcricao': arquivo_transcricao,
-                        'problema': ', '.join(problemas_arquivo),
-                        'tipo': 'problemas'
-                    })
-                else:
-                    txt_verificacao.insert(tk.END, f"  ✅ OK ({tipo_arquivo}): {total_linhas} linhas, {tamanho_arquivo} bytes")
-                    if linhas_com_erro > 0:
-                        txt_verificacao.insert(tk.END, f", {linhas_com_erro} erros")
-                    txt_verificacao.insert(tk.END, "\n")
-                    arquivos_ok += 1
-                    
-            except Exception as e:
-                txt_verificacao.insert(tk.END, f"  ❌ ERRO: Não foi possível ler o arquivo: {str(e)}\n")
-                arquivos_problemas += 1
-                problemas_encontrados.append({
-                    'arquivo': arquivo_original,
-                    'transcricao': arquivo_transcricao,
-                    'problema': f'Erro de leitura: {str(e)}',
-                    'tipo': 'erro_leitura'
-                })
-        
-        # Relatório final
-        txt_verificacao.insert(tk.END, "\n" + "="*50 + "\n")
-        txt_verificacao.insert(tk.END, "=== RELATÓRIO DE CONSISTÊNCIA ===\n")
-        txt_verificacao.insert(tk.END, f"Arquivos verificados: {len(arquivos_selecionados)}\n")
-        txt_verificacao.insert(tk.END, f"✅ Arquivos OK: {arquivos_ok}\n")
-        txt_verificacao.insert(tk.END, f"⚠️ Arquivos com problemas: {arquivos_problemas}\n")
-        txt_verificacao.insert(tk.END, f"❌ Arquivos faltando: {arquivos_faltando}\n")
+        btn_verificar.config(state=tk.DISABLED)
+        btn_reprocessar.config(state=tk.DISABLED)
+        cancelado.clear()
         
-        # Calcular taxa de sucesso
-        if len(arquivos_selecionados) > 0:
-            taxa_sucesso = (arquivos_ok / len(arquivos_selecionados)) * 100
-            txt_verificacao.insert(tk.END, f"📊 Taxa de sucesso: {taxa_sucesso:.1f}%\n")
+        # Leitura e contagem em threads; a janela só recebe o texto pela fila_interface
+        thread = threading.Thread(target=verificar_em_segundo_plano,
+                                  args=(arquivos_selecionados.copy(), config_transcricao.copy()), daemon=True)
+        thread.start()
+    
+    def verificar_em_segundo_plano(arquivos, config_atual):
+        total = len(arquivos)
+        contagem = {'ok': 0, 'problemas': 0, 'erro_leitura': 0, 'faltando': 0}
+        problemas = []
+        pendente = []
+        ultimo_envio = time.monotonic()
         
-        # Salvar relatório detalhado
+        # Relatório detalhado gravado enquanto a verificação anda
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nome_relatorio = f"relatorio_consistencia_{timestamp}.json"
-        
-        relatorio = {
-            'timestamp': datetime.now().isoformat(),
-            'total_arquivos': len(arquivos_selecionados),
-            'arquivos_ok': arquivos_ok,
-            'arquivos_problemas': arquivos_problemas,
-            'arquivos_faltando': arquivos_faltando,
-            'taxa_sucesso': taxa_sucesso if len(arquivos_selecionados) > 0 else 0,
-            'problemas_detalhados': problemas_encontrados
-        }
+        relatorio = RelatorioConsistencia(f"relatorio_consistencia_{timestamp}.json")
+        try:
+            relatorio.abrir()
+        except OSError as e:
+            pendente.append(f"⚠️ Erro ao criar relatório: {str(e)}\n")
+            relatorio = None
         
         try:
-            with open(nome_relatorio, 'w', encoding='utf-8') as f:
-                json.dump(relatorio, f, indent=2, ensure_ascii=False)
-            txt_verificacao.insert(tk.END, f"\n📄 Relatório salvo: {nome_relatorio}\n")
+            for i, resultado in enumerate(verificar_arquivos(arquivos, config_atual, cancelado=cancelado), 1):
+                status = resultado['status']
+                contagem[status] += 1
+                if relatorio:
+                    relatorio.adicionar(resultado)
+                if status != 'ok':
+                    problemas.append({'arquivo': resultado['arquivo'], 'tipo': status})
+                
+                pendente.append(f"[{i}/{total}] Verificando: {os.path.basename(resultado['arquivo'])}\n")
+                if status == 'faltando':
+                    pendente.append(f"  ❌ FALTANDO: Arquivo de transcrição não encontrado\n")
+                elif status == 'erro_leitura':
+                    pendente.append(f"  ❌ ERRO: {resultado['problemas'][0]}\n")
+                elif status == 'problemas':
+                    pendente.append(f"  ⚠️ PROBLEMAS ({resultado['tipo_arquivo']}): {', '.join(resultado['problemas'])}\n")
+                else:
+                    erros = f", {resultado['linhas_com_erro']} erros" if resultado['linhas_com_erro'] else ""
+                    pendente.append(f"  ✅ OK ({resultado['tipo_arquivo']}): {resultado['linhas']} linhas, "
+                                    f"{resultado['tamanho']} bytes{erros}\n")
+                
+                # Texto enviado em lotes, não por arquivo
+                if time.monotonic() - ultimo_envio >= INTERVALO_FILA_MS / 1000:
+                    na_janela(mostrar_verificacao, "".join(pendente))
+                    pendente = []
+                    ultimo_envio = time.monotonic()
+            
+            verificados = sum(contagem.values())
+            if cancelado.is_set():
+                pendente.append(f"\nVerificação interrompida após {verificados} arquivos\n")
+            
+            # Relatório final
+            pendente.append("\n" + "="*50 + "\n")
+            pendente.append("=== RELATÓRIO DE CONSISTÊNCIA ===\n")
+            pendente.append(f"Arquivos verificados: {verificados}\n")
+            pendente.append(f"✅ Arquivos OK: {contagem['ok']}\n")
+            pendente.append(f"⚠️ Arquivos com problemas: {contagem['problemas'] + contagem['erro_leitura']}\n")
+            pendente.append(f"❌ Arquivos faltando: {contagem['faltando']}\n")
+            if verificados > 0:
+                pendente.append(f"📊 Taxa de sucesso: {contagem['ok'] / verificados * 100:.1f}%\n")
+            
+            if relatorio:
+                try:
+                    relatorio.concluir()
+                    pendente.append(f"\n📄 Relatório salvo: {relatorio.caminho}\n")
+                except OSError as e:
+                    pendente.append(f"\n⚠️ Erro ao salvar relatório: {str(e)}\n")
         except Exception as e:
-            txt_verificacao.insert(tk.END, f"\n⚠️ Erro ao salvar relatório: {str(e)}\n")
-        
-        # Habilitar botão de reprocessamento se houver problemas
-        if problemas_encontrados:
-            btn_reprocessar.config(state=tk.NORMAL)
-        
-        txt_verificacao.see(tk.END)
+            pendente.append(f"\n❌ Erro na verificação: {str(e)}\n")
+        finally:
+            if relatorio:
+                relatorio.fechar()
+            na_janela(mostrar_verificacao, "".join(pendente))
+            na_janela(finalizar_verificacao, problemas)
     
     def reprocessar_problemas():
         """Reprocessa apenas os arquivos que tiveram problemas"""
@@ -697,8 +612,8 @@ def verificar_consistencia_arquivos():
             arquivos_selecionados.extend(arquivos_problema)
             atualizar_lista_arquivos()
             
-            # Iniciar transcrição
-            iniciar_transcricao()
+            # Iniciar transcrição do zero, sem aproveitar os checkpoints
+            iniciar_transcricao(retomar=False)
             
             # Restaurar lista original após processamento
             def restaurar_lista():
@@ -718,16 +633,125 @@ def verificar_consistencia_arquivos():
                                command=reprocessar_problemas, bg="#FF9800", fg="white", state=tk.DISABLED)
     btn_reprocessar.pack(side=tk.LEFT, padx=5)
     
+    def fechar_verificacao():
+        cancelado.set()
+        janela_verificacao.destroy()
+    
     btn_fechar = tk.Button(frame_btn_verif, text="❌ Fechar", 
-                          command=janela_verificacao.destroy)
+                          command=fechar_verificacao)
     btn_fechar.pack(side=tk.RIGHT)
+    janela_verificacao.protocol("WM_DELETE_WINDOW", fechar_verificacao)
     
     # Variável para armazenar problemas encontrados
     problemas_encontrados = []
 
-# Adicionar botão de verificação na interface principal
-# No frame_botoes, após o botão de configurações:
-btn_verificar_consistencia = tk.Button(frame_botoes, text="🔍 Verificar Consistência", 
-                                      command=verificar_consistencia_arquivos, 
-                                      bg="#2196F3", fg="white")
-btn_verificar_consistencia.pack(side=tk.RIGHT, padx=(5, 0))
\ No newline at end of file
+# A interface só é montada quando executada diretamente: os processos de conversão
+# do lote (spawn no Windows) reimportam este módulo e não devem abrir janelas
+if __name__ == "__main__":
+    # Configuração da janela principal
+    janela = tk.Tk()
+    janela.title("Transcrição de Vídeos e Áudios - Processamento em Lote")
+    janela.geometry("800x680")
+    janela.minsize(600, 500)
+
+    # MOVER A CRIAÇÃO DA VARIÁVEL PARA AQUI (após criar a janela):
+    # Variável global para controlar timestamp
+    incluir_timestamp = tk.BooleanVar()
+    timestamp_completo = tk.BooleanVar()
+
+    # Carregar configurações ao iniciar
+    carregar_configuracoes()
+    modo_streaming = tk.BooleanVar(value=config_transcricao['modo_streaming'])
+    retomar_lote = tk.BooleanVar(value=config_transcricao['retomar_lote'])
+
+    # Frame principal
+    frame = tk.Frame(janela, padx=10, pady=10)
+    frame.pack(fill=tk.BOTH, expand=True)
+
+    # Frame para seleção de arquivos
+    frame_selecao = tk.LabelFrame(frame, text="Seleção de Arquivos", padx=5, pady=5)
+    frame_selecao.pack(fill=tk.X, pady=(0, 10))
+
+    # Botões de seleção
+    frame_botoes = tk.Frame(frame_selecao)
+    frame_botoes.pack(fill=tk.X, pady=5)
+
+    btn_selecionar_arquivo = tk.Button(frame_botoes, text="📄 Arquivo Único", command=selecionar_arquivo_unico)
+    btn_selecionar_arquivo.pack(side=tk.LEFT, padx=(0, 5))
+
+    btn_selecionar_multiplos = tk.Button(frame_botoes, text="📄📄 Múltiplos Arquivos", command=selecionar_multiplos_arquivos)
+    btn_selecionar_multiplos.pack(side=tk.LEFT, padx=5)
+
+    btn_selecionar_pasta = tk.Button(frame_botoes, text="📁 Pasta Completa", command=selecionar_pasta)
+    btn_selecionar_pasta.pack(side=tk.LEFT, padx=5)
+
+    btn_limpar = tk.Button(frame_botoes, text="🗑️ Limpar", command=limpar_selecao)
+    btn_limpar.pack(side=tk.LEFT, padx=5)
+
+    # Botão de configurações
+    btn_configuracoes = tk.Button(frame_botoes, text="⚙️ Configurações", command=abrir_configuracoes, bg="#9C27B0", fg="white")
+    btn_configuracoes.pack(side=tk.RIGHT, padx=5)
+
+    btn_verificar_consistencia = tk.Button(frame_botoes, text="🔍 Verificar Consistência", 
+                                          command=verificar_consistencia_arquivos, 
+                                          bg="#2196F3", fg="white")
+    btn_verificar_consistencia.pack(side=tk.RIGHT, padx=(5, 0))
+
+    # Label de contagem
+    label_contagem = tk.Label(frame_selecao, text="Arquivos selecionados: 0", font=("Arial", 9))
+    label_contagem.pack(anchor="w", pady=(5, 0))
+
+    # Lista de arquivos selecionados, com filtro e ordenação por estado
+    lista_arquivos = ListaArquivosVirtual(frame_selecao, linhas=4)
+    lista_arquivos.pack(fill=tk.BOTH, expand=True, pady=5)
+
+    # Frame para opções de transcrição
+    frame_opcoes = tk.LabelFrame(frame, text="Opções de Transcrição", padx=5, pady=5)
+    frame_opcoes.pack(fill=tk.X, pady=(0, 10))
+
+    # Checkbox para timestamp
+    chk_timestamp = tk.Checkbutton(frame_opcoes, text="🕒 Incluir timestamps na transcrição", 
+                                  variable=incluir_timestamp, font=("Arial", 9))
+    chk_timestamp.pack(anchor="w", padx=5, pady=5)
+
+    # Label explicativo
+    label_explicacao = tk.Label(frame_opcoes, 
+                               text="Quando ativado, cada segmento de áudio terá seu tempo de início marcado no formato [MM:SS]",
+                               font=("Arial", 8), fg="gray")
+    label_explicacao.pack(anchor="w", padx=20, pady=(0, 5))
+
+    # Checkbox para timestamp com horas e milissegundos
+    chk_timestamp_completo = tk.Checkbutton(frame_opcoes, text="Formato completo [HH:MM:SS.mmm]", 
+                                           variable=timestamp_completo, font=("Arial", 9))
+    chk_timestamp_completo.pack(anchor="w", padx=20, pady=(0, 5))
+
+    # Checkbox para decodificação em blocos (arquivos muito longos)
+    chk_streaming = tk.Checkbutton(frame_opcoes, text="🌊 Modo streaming (arquivos longos, memória limitada)", 
+                                  variable=modo_streaming, font=("Arial", 9))
+    chk_streaming.pack(anchor="w", padx=5, pady=(0, 5))
+
+    # Checkbox para continuar de onde o lote anterior parou
+    chk_retomar = tk.Checkbutton(frame_opcoes, text="↻ Retomar lote interrompido (pular arquivos e chunks já transcritos)", 
+                                variable=retomar_lote, font=("Arial", 9))
+    chk_retomar.pack(anchor="w", padx=5, pady=(0, 5))
+
+    # Barra de progresso
+    frame_progresso = tk.Frame(frame)
+    frame_progresso.pack(fill=tk.X, pady=(0, 10))
+
+    tk.Label(frame_progresso, text="Progresso Geral:").pack(anchor="w")
+    progress_bar = ttk.Progressbar(frame_progresso, length=400, mode='determinate')
+    progress_bar.pack(fill=tk.X, pady=5)
+
+    # Botão de iniciar
+    btn_iniciar = tk.Button(frame, text="🚀 Iniciar Transcrição em Lote", command=iniciar_transcricao, 
+                           font=("Arial", 10, "bold"), bg="#4CAF50", fg="white")
+    btn_iniciar.pack(pady=10)
+
+    # Área de texto para saída
+    tk.Label(frame, text="Log de Progresso:").pack(anchor="w")
+    txt_saida = scrolledtext.ScrolledText(frame, height=12)
+    txt_saida.pack(fill=tk.BOTH, expand=True)
+
+    processar_fila_interface()
+    janela.mainloop()
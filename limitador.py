@@ -0,0 +1,102 @@
+import time
+import random
+import threading
+
+# Taxa mínima após sucessivos limites do serviço (requisições por segundo)
+TAXA_MINIMA = 0.1
+
+# Fração do teto recuperada a cada sucesso (aumento aditivo, redução multiplicativa)
+PASSO_RECUPERACAO = 0.05
+
+# Maior expoente do backoff, para a espera não crescer sem limite
+EXPOENTE_MAXIMO = 6
+
+def pausa_com_jitter(pausa_base, tentativa):
+    """Backoff exponencial com jitter: metade fixa e metade sorteada de pausa_base * 2^tentativa"""
+    teto = pausa_base * 2 ** min(tentativa, EXPOENTE_MAXIMO)
+    return teto / 2 + random.uniform(0, teto / 2)
+
+class LimitadorTaxa:
+    """
+    Token bucket compartilhado entre as threads de reconhecimento, na frente
+    das chamadas ao serviço remoto.
+
+    Enquanto não há erros, as requisições saem até a taxa_maxima. Um erro de
+    cota corta a taxa pela metade e pausa todas as threads por um backoff
+    exponencial com jitter (base pausa_base). Cada sucesso devolve uma parte
+    da taxa, até voltar ao teto.
+    """
+
+    def __init__(self, taxa_maxima, pausa_base):
+        self.taxa_maxima = max(TAXA_MINIMA, float(taxa_maxima))
+        self.pausa_base = pausa_base
+        self.taxa = self.taxa_maxima
+        self.capacidade = max(1.0, self.taxa_maxima)
+        self.tokens = self.capacidade
+        self.limites = 0
+        self.tempo_espera = 0.0
+        self._limites_seguidos = 0
+        self._bloqueado_ate = 0.0
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def configurar(self, taxa_maxima, pausa_base):
+        """Aplica novos teto e pausa base sem descartar a redução em curso (a taxa só desce até o novo teto)"""
+        with self._lock:
+            # Fichas acumuladas até agora contam com a taxa antiga
+            self._repor(time.monotonic())
+            self.taxa_maxima = max(TAXA_MINIMA, float(taxa_maxima))
+            self.capacidade = max(1.0, self.taxa_maxima)
+            self.taxa = min(self.taxa, self.taxa_maxima)
+            self.tokens = min(self.tokens, self.capacidade)
+            self.pausa_base = pausa_base
+
+    def _repor(self, agora):
+        self.tokens = min(self.capacidade, self.tokens + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def adquirir(self):
+        """Bloqueia até haver uma ficha disponível e fora de um período de backoff"""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._repor(agora)
+                espera = self._bloqueado_ate - agora
+                if espera <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    espera = (1 - self.tokens) / self.taxa
+                self.tempo_espera += espera
+            time.sleep(espera)
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self._limites_seguidos = 0
+            self.taxa = min(self.taxa_maxima, self.taxa + self.taxa_maxima * PASSO_RECUPERACAO)
+
+    def registrar_limite(self):
+        """Serviço recusou por cota: reduz a taxa e pausa todas as threads; retorna a pausa em segundos"""
+        with self._lock:
+            pausa = pausa_com_jitter(self.pausa_base, self._limites_seguidos)
+            self._limites_seguidos += 1
+            self.limites += 1
+            self.taxa = max(TAXA_MINIMA, self.taxa / 2)
+            self.tokens = 0
+            self._bloqueado_ate = max(self._bloqueado_ate, time.monotonic() + pausa)
+            return pausa
+
+_limitadores = {}
+_limitadores_lock = threading.Lock()
+
+def obter_limitador(config, servico="google"):
+    """Limitador compartilhado do processo para o serviço"""
+    taxa_maxima = config.get('requisicoes_por_segundo', 5)
+    pausa_base = config.get('pausa_entre_tentativas', 0.8)
+    with _limitadores_lock:
+        limitador = _limitadores.get(servico)
+        if limitador is None:
+            limitador = _limitadores[servico] = LimitadorTaxa(taxa_maxima, pausa_base)
+    # Configurações alteradas na interface valem para o próximo arquivo
+    limitador.configurar(taxa_maxima, pausa_base)
+    return limitador
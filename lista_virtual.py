@@ -0,0 +1,233 @@
+import os
+import tkinter as tk
+from tkinter import ttk, font as tkfont
+
+# Indicadores de estado exibidos na lista durante o processamento em lote
+ICONES_ESTADO = {
+    'convertendo': '🔄',
+    'transcrevendo': '🎙️',
+    'concluido': '✅',
+    'erro': '❌'
+}
+
+# Filtro -> estados exibidos (None = arquivo ainda não processado); 'Todos' não filtra
+FILTROS_ESTADO = {
+    'Todos': None,
+    'Pendentes': (None,),
+    'Em andamento': ('convertendo', 'transcrevendo'),
+    'Concluídos': ('concluido',),
+    'Com erro': ('erro',),
+}
+
+ORDENACOES = ('Seleção', 'Nome', 'Estado')
+
+# Posição de cada estado na ordenação por estado: erros primeiro, concluídos no fim
+ORDEM_ESTADOS = {'erro': 0, 'transcrevendo': 1, 'convertendo': 2, None: 3, 'concluido': 4}
+
+class ModeloListaArquivos:
+    """
+    Arquivos, estados e a ordem de exibição da lista, sem widgets. visiveis
+    (posições dos arquivos na ordem exibida) só é recalculada quando o filtro,
+    a ordenação ou, se eles dependem do estado, algum estado muda; com o filtro
+    'Todos' e a ordem da seleção não há lista alguma além dos arquivos.
+    """
+
+    def __init__(self):
+        self.arquivos = []
+        self.estados = {}
+        self.filtro = 'Todos'
+        self.ordenacao = 'Seleção'
+        self._posicoes = {}
+        self._visiveis = None
+
+    def definir(self, arquivos):
+        self.arquivos = []
+        self.estados = {}
+        self._posicoes = {}
+        self.adicionar(arquivos)
+
+    def adicionar(self, arquivos):
+        for arquivo in arquivos:
+            # Arquivo repetido: o estado vai para a primeira ocorrência, como antes
+            self._posicoes.setdefault(arquivo, len(self.arquivos))
+            self.arquivos.append(arquivo)
+        self._visiveis = None
+
+    def depende_do_estado(self):
+        return FILTROS_ESTADO[self.filtro] is not None or self.ordenacao == 'Estado'
+
+    def marcar_estado(self, arquivo, estado):
+        """Posição do arquivo cujo estado mudou, ou None se ele não está na lista"""
+        posicao = self._posicoes.get(arquivo)
+        if posicao is None:
+            return None
+        self.estados[posicao] = estado
+        if self.depende_do_estado():
+            self._visiveis = None
+        return posicao
+
+    def configurar(self, filtro=None, ordenacao=None):
+        if filtro is not None:
+            self.filtro = filtro
+        if ordenacao is not None:
+            self.ordenacao = ordenacao
+        self._visiveis = None
+
+    def _calcular_visiveis(self):
+        estados_filtro = FILTROS_ESTADO[self.filtro]
+        if estados_filtro is None:
+            posicoes = range(len(self.arquivos))
+        else:
+            posicoes = [posicao for posicao in range(len(self.arquivos))
+                        if self.estados.get(posicao) in estados_filtro]
+        if self.ordenacao == 'Nome':
+            return sorted(posicoes, key=lambda posicao: os.path.basename(self.arquivos[posicao]).lower())
+        if self.ordenacao == 'Estado':
+            return sorted(posicoes, key=lambda posicao: ORDEM_ESTADOS.get(self.estados.get(posicao), 3))
+        return posicoes
+
+    def visiveis(self):
+        if self._visiveis is None:
+            self._visiveis = self._calcular_visiveis()
+        return self._visiveis
+
+    def janela(self, primeira, linhas):
+        """
+        (primeira, posições) das linhas desenhadas a partir de primeira, com
+        primeira ajustada para a janela não passar do fim da lista. Vem uma
+        posição a mais, para não sobrar espaço vazio com a última linha cortada.
+        """
+        visiveis = self.visiveis()
+        primeira = max(0, min(primeira, len(visiveis) - linhas))
+        return primeira, list(visiveis[primeira:primeira + linhas + 1])
+
+    def texto(self, posicao):
+        estado = self.estados.get(posicao)
+        nome = os.path.basename(self.arquivos[posicao])
+        return f"{ICONES_ESTADO[estado]} {nome}" if estado in ICONES_ESTADO else nome
+
+class ListaArquivosVirtual(tk.Frame):
+    """
+    Lista de arquivos que só desenha as linhas visíveis: o Listbox recebe
+    apenas a janela de linhas em exibição e a barra de rolagem é controlada
+    aqui, pela posição na lista completa. Redesenhar, rolar ou atualizar o
+    estado de um arquivo custa o mesmo com 10 ou 100 mil arquivos.
+    """
+
+    def __init__(self, master, linhas=4, **opcoes):
+        super().__init__(master, **opcoes)
+        self.modelo = ModeloListaArquivos()
+        self.primeira = 0
+        self.linhas = linhas
+        self._altura_linha = None
+        self._redesenho_agendado = False
+
+        frame_filtros = tk.Frame(self)
+        frame_filtros.pack(fill=tk.X)
+        tk.Label(frame_filtros, text="Mostrar:", font=("Arial", 9)).pack(side=tk.LEFT)
+        self.var_filtro = tk.StringVar(value=self.modelo.filtro)
+        combo_filtro = ttk.Combobox(frame_filtros, textvariable=self.var_filtro, values=list(FILTROS_ESTADO),
+                                    state="readonly", width=14)
+        combo_filtro.pack(side=tk.LEFT, padx=5)
+        combo_filtro.bind("<<ComboboxSelected>>", self._filtro_alterado)
+        tk.Label(frame_filtros, text="Ordenar por:", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 0))
+        self.var_ordenacao = tk.StringVar(value=self.modelo.ordenacao)
+        combo_ordenacao = ttk.Combobox(frame_filtros, textvariable=self.var_ordenacao, values=list(ORDENACOES),
+                                       state="readonly", width=10)
+        combo_ordenacao.pack(side=tk.LEFT, padx=5)
+        combo_ordenacao.bind("<<ComboboxSelected>>", self._filtro_alterado)
+
+        frame_lista = tk.Frame(self)
+        frame_lista.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        self.scrollbar = tk.Scrollbar(frame_lista, command=self._rolar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(frame_lista, height=linhas, activestyle='none', takefocus=0)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # A rolagem do próprio Listbox só andaria dentro da janela desenhada
+        self.listbox.bind("<Configure>", self._redimensionado)
+        self.listbox.bind("<MouseWheel>", lambda evento: self._rolar_linhas(-3 if evento.delta > 0 else 3))
+        self.listbox.bind("<Button-4>", lambda evento: self._rolar_linhas(-3))
+        self.listbox.bind("<Button-5>", lambda evento: self._rolar_linhas(3))
+
+    def definir(self, arquivos):
+        """Substitui a lista inteira (estados zerados) e volta ao topo"""
+        self.modelo.definir(arquivos)
+        self.primeira = 0
+        self.redesenhar()
+
+    def adicionar(self, arquivos):
+        self.modelo.adicionar(arquivos)
+        self.redesenhar()
+
+    def marcar_estado(self, arquivo, estado):
+        """Atualiza só a linha do arquivo, se estiver visível; com filtro ou ordem por estado, redesenha a janela"""
+        posicao = self.modelo.marcar_estado(arquivo, estado)
+        if posicao is None:
+            return
+        if self.modelo.depende_do_estado():
+            self._agendar_redesenho()
+            return
+        janela = self._janela()
+        if posicao in janela:
+            linha = janela.index(posicao)
+            self.listbox.delete(linha)
+            self.listbox.insert(linha, self.modelo.texto(posicao))
+
+    def _janela(self):
+        self.primeira, janela = self.modelo.janela(self.primeira, self.linhas)
+        return janela
+
+    def _agendar_redesenho(self):
+        # Vários estados mudando em sequência geram um único recálculo
+        if not self._redesenho_agendado:
+            self._redesenho_agendado = True
+            self.after_idle(self.redesenhar)
+
+    def redesenhar(self):
+        self._redesenho_agendado = False
+        total = len(self.modelo.visiveis())
+        self.listbox.delete(0, tk.END)
+        janela = self._janela()
+        if janela:
+            self.listbox.insert(tk.END, *(self.modelo.texto(posicao) for posicao in janela))
+        if total:
+            self.scrollbar.set(self.primeira / total, min(1.0, (self.primeira + self.linhas) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if self._altura_linha is None and len(janela) >= 2:
+            # Altura real de uma linha, medida na primeira vez que há duas linhas desenhadas
+            caixas = self.listbox.bbox(0), self.listbox.bbox(1)
+            if None not in caixas and caixas[1][1] > caixas[0][1]:
+                self._altura_linha = caixas[1][1] - caixas[0][1]
+                self._ajustar_linhas()
+
+    def _rolar(self, acao, quantidade, unidade=None):
+        if acao == 'moveto':
+            self.primeira = int(float(quantidade) * len(self.modelo.visiveis()))
+        elif unidade == 'pages':
+            self.primeira += int(quantidade) * self.linhas
+        else:
+            self.primeira += int(quantidade)
+        self.redesenhar()
+
+    def _rolar_linhas(self, quantidade):
+        self._rolar('scroll', quantidade, 'units')
+        return "break"
+
+    def _redimensionado(self, evento=None):
+        self._ajustar_linhas()
+
+    def _ajustar_linhas(self):
+        """Número de linhas inteiras que cabem no Listbox, usado na rolagem e no tamanho da janela desenhada"""
+        altura_linha = self._altura_linha or tkfont.Font(font=self.listbox.cget('font')).metrics('linespace')
+        bordas = 2 * (int(self.listbox.cget('borderwidth')) + int(self.listbox.cget('highlightthickness')))
+        linhas = max(1, (self.listbox.winfo_height() - bordas) // altura_linha)
+        if linhas != self.linhas:
+            self.linhas = linhas
+            self.redesenhar()
+
+    def _filtro_alterado(self, evento=None):
+        self.modelo.configurar(filtro=self.var_filtro.get(), ordenacao=self.var_ordenacao.get())
+        self.primeira = 0
+        self.redesenhar()
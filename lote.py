@@ -0,0 +1,332 @@
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pydub import AudioSegment
+from transcriber import transcribe_audio, carregar_audio, segmentar_audio
+from checkpoint_lote import CheckpointTranscricao, caminho_checkpoint, checkpoint_concluido
+from saida import SaidaTranscricao, nome_arquivo_saida, nomes_arquivos_saida, resultado_com_falha
+from manifesto import abrir_manifesto, identificar_arquivo
+from perfil import Perfil, etapa, criar_perfil_lote
+
+def nome_wav_convertido(arquivo):
+    """Retorna o caminho do WAV pré-processado gravado quando config['salvar_wav'] está ativo"""
+    return os.path.splitext(arquivo)[0] + "_convertido.wav"
+
+def preparar_audio(arquivo, config, perfil=None):
+    """Decodifica e pré-processa em memória; grava o WAV apenas se config['salvar_wav'] pedir"""
+    audio = carregar_audio(arquivo, config, perfil)
+    if config.get('salvar_wav', False):
+        with etapa(perfil, 'exportacao'):
+            audio.export(nome_wav_convertido(arquivo), format="wav")
+    return audio
+
+def identificar_entrada(arquivo, config):
+    """
+    Tamanho, data e hash do arquivo para o manifesto (None se ele estiver
+    desligado), calculados no worker que converte o arquivo para não parar o
+    agendamento do lote enquanto o arquivo inteiro é lido
+    """
+    if not config.get('usar_manifesto', True):
+        return None
+    return identificar_arquivo(arquivo)
+
+def _preparar_no_processo(arquivo, config, medir):
+    """
+    preparar_audio, segmentar_audio e identificar_entrada no pool de conversão.
+
+    Retorna (pcm, formato, segmentacao, eventos, identificacao): as amostras
+    em bytes e o formato para AudioSegment(data=pcm, **formato), em vez do
+    AudioSegment serializado. O perfil não é compartilhado entre processos:
+    com medir, os eventos voltam junto com o áudio, senão None.
+    """
+    perfil = Perfil(arquivo) if medir else None
+    identificacao = identificar_entrada(arquivo, config)
+    audio = preparar_audio(arquivo, config, perfil)
+    segmentacao = segmentar_audio(audio, config, perfil)
+    formato = {'sample_width': audio.sample_width, 'frame_rate': audio.frame_rate, 'channels': audio.channels}
+    return audio.raw_data, formato, segmentacao, perfil.eventos if perfil else None, identificacao
+
+def transcrever_arquivo_convertido(arquivo, audio, config, callback_progresso, perfil=None, cancelado=None, segmentacao=None):
+    """
+    Transcreve o áudio já pré-processado e salva o resultado ao lado do arquivo original.
+    segmentacao, se já calculada (segmentar_audio), vai direto para transcribe_audio.
+
+    O texto e os formatos extras de config['formatos_saida'] (SRT, WebVTT,
+    JSON Lines) são gravados à medida que os chunks chegam, em arquivos
+    parciais renomeados para o nome final ao terminar. O progresso é registrado em um
+    checkpoint ao lado da saída; com config['retomar_lote'] os chunks já
+    registrados não são reconhecidos de novo. Se cancelado (threading.Event)
+    for sinalizado, para entre dois chunks e retorna None, deixando os
+    parciais e o checkpoint para a próxima execução.
+    """
+    chunk_count = 0
+    chunks_com_erro = 0
+
+    nomes_saida = nomes_arquivos_saida(arquivo, config)
+    nome_saida = nomes_saida['txt']
+    os.makedirs(os.path.dirname(os.path.abspath(nome_saida)), exist_ok=True)
+    checkpoint = CheckpointTranscricao(caminho_checkpoint(nome_saida), arquivo, config,
+                                       retomar=config.get('retomar_lote', True)).abrir()
+    if checkpoint.resultados:
+        callback_progresso(f"↻ Retomando: {len(checkpoint.resultados)} chunks recuperados do checkpoint")
+
+    saida = SaidaTranscricao(nomes_saida)
+    # Tempos, backend, tentativas e latência de cada chunk para as legendas e o JSON Lines
+    config_chunks = dict(config, metadados_chunk=True)
+    try:
+        saida.abrir()
+        for chunk_data in transcribe_audio(audio, ".", callback_progresso, config=config_chunks, checkpoint=checkpoint,
+                                           perfil=perfil, cancelado=cancelado, segmentacao=segmentacao):
+            # Uma só passada: cada chunk vai para todos os formatos assim que chega
+            saida.adicionar(chunk_data)
+
+            chunk_count += 1
+
+            # Contar erros (inclusive timeouts e falhas, que também ficam fora do checkpoint)
+            if resultado_com_falha(chunk_data):
+                chunks_com_erro += 1
+
+            # Atualizar progresso do arquivo atual
+            if chunk_count % 5 == 0:  # A cada 5 chunks
+                callback_progresso(f"  → {chunk_count} chunks processados")
+
+        if cancelado is not None and cancelado.is_set():
+            # Transcrição incompleta: não substituir a saída final
+            return None
+
+        # Colocar as transcrições no lugar só depois do último chunk
+        saida.concluir()
+        if chunks_com_erro == 0:
+            # Com erros o arquivo não está concluído: a próxima execução tenta de novo só os chunks que falharam
+            checkpoint.concluir(chunk_count, chunks_com_erro)
+    finally:
+        saida.fechar()
+        checkpoint.fechar()
+
+    callback_progresso(f"✓ Transcrição salva: {', '.join(os.path.basename(nome) for nome in nomes_saida.values())}")
+    callback_progresso(f"  → Total de chunks: {chunk_count}, Chunks com erro: {chunks_com_erro}")
+
+    if chunks_com_erro > 0:
+        callback_progresso(f"  ⚠️ Atenção: {chunks_com_erro} chunks tiveram problemas")
+
+    return {
+        'saida': nome_saida,
+        'saidas': nomes_saida,
+        'chunks': chunk_count,
+        'chunks_com_erro': chunks_com_erro
+    }
+
+def _converter_e_transcrever(arquivo, config, callback_progresso, perfil=None, cancelado=None, convertido=None):
+    """
+    Transcrição de um arquivo do lote na thread de reconhecimento. convertido é
+    o (áudio, segmentação, identificação) que veio do pool de conversão; sem ele
+    (caminho sem pool de processos) a conversão roda aqui mesmo. Retorna (estatísticas de
+    transcrever_arquivo_convertido, identificação de identificar_entrada).
+    """
+    segmentacao = None
+    if convertido is not None:
+        audio, segmentacao, identificacao = convertido
+    else:
+        identificacao = identificar_entrada(arquivo, config)
+        if config.get('modo_streaming', False):
+            # transcribe_audio decodifica o caminho em blocos pelo ffmpeg
+            audio = arquivo
+        else:
+            audio = preparar_audio(arquivo, config, perfil)
+            callback_progresso(f"✓ Áudio decodificado e pré-processado")
+    return transcrever_arquivo_convertido(arquivo, audio, config, callback_progresso, perfil, cancelado,
+                                          segmentacao), identificacao
+
+def executar_lote(lista_arquivos, config, callback_progresso, callback_estado=None):
+    """
+    Transcreve vários arquivos sobrepondo conversão e reconhecimento.
+
+    A conversão (decodificação, reamostragem, filtros e divisão em chunks) roda
+    em um pool de processos com config['processos_conversao'] workers e devolve
+    as amostras e as fronteiras dos chunks, sem WAV temporário; o reconhecimento
+    roda em um pool de threads com config['arquivos_simultaneos'] workers.
+    Enquanto um arquivo espera o reconhecedor, os próximos já estão sendo
+    convertidos. Com 0 ou 1 processo não há pool: cada arquivo é convertido
+    na própria thread de reconhecimento.
+
+    Gera um dicionário por arquivo, na ordem de conclusão, com as chaves
+    'indice', 'arquivo', 'saida', 'chunks', 'chunks_com_erro', 'erro',
+    'tempo' (segundos desde o início da conversão) e 'pulado'.
+    Com config['retomar_lote'], arquivos em dia no manifesto (mesmo conteúdo,
+    mesmas configurações e transcrição presente) ou cujo checkpoint indica
+    conclusão com a mesma configuração são pulados sem conversão. Cada arquivo
+    transcrito é registrado no manifesto (config['usar_manifesto']).
+    callback_estado(indice, arquivo, estado) recebe 'convertendo',
+    'transcrevendo', 'concluido' ou 'erro' para cada arquivo.
+    Com config['arquivo_perfil'], o tempo de parede e de CPU de cada etapa
+    é gravado no fim em JSON (por arquivo e do lote) e em Chrome trace.
+    Se o gerador for interrompido (Ctrl-C) ou fechado antes do fim, os
+    arquivos em reconhecimento param no chunk atual e os da fila são
+    descartados, sem esperar por eles.
+    """
+    total_arquivos = len(lista_arquivos)
+    processos = max(0, int(config.get('processos_conversao', 1)))
+    if processos == 1:
+        # Um só processo não paraleliza as conversões e ainda copiaria o áudio de volta: converter na thread
+        processos = 0
+    if config.get('modo_streaming', False):
+        # No modo streaming o ffmpeg já decodifica em outro processo, em paralelo ao reconhecimento
+        processos = 0
+    simultaneos = max(1, int(config.get('arquivos_simultaneos', 1)))
+
+    def avisar(indice, arquivo, estado):
+        if callback_estado:
+            callback_estado(indice, arquivo, estado)
+
+    def progresso_do_arquivo(indice, arquivo):
+        # Com vários arquivos em reconhecimento as mensagens se intercalam: identificar a origem
+        if simultaneos == 1:
+            return callback_progresso
+        prefixo = f"[{indice}/{total_arquivos}] "
+        return lambda mensagem: callback_progresso(prefixo + mensagem)
+
+    # Arquivos em andamento (convertendo + aguardando/fazendo reconhecimento), para limitar a memória com áudios decodificados
+    limite_em_andamento = processos + simultaneos
+    pendentes = list(enumerate(lista_arquivos, 1))
+    
+    em_conversao = {}
+    em_transcricao = {}
+    inicios = {}
+    perfil_lote = criar_perfil_lote(config)
+    perfis = {}
+    try:
+        manifesto = abrir_manifesto(config)
+    except Exception as e:
+        # Sem manifesto o lote funciona como antes (só os checkpoints pulam arquivos)
+        callback_progresso(f"⚠️ Manifesto indisponível: {e}")
+        manifesto = None
+
+    def registrar_no_manifesto(arquivo, saida, chunks, chunks_com_erro, identificacao=None):
+        if manifesto is None:
+            return
+        try:
+            manifesto.registrar(arquivo, config, saida, chunks, chunks_com_erro, identificacao)
+        except Exception as e:
+            # Sem registro o arquivo só será transcrito de novo na próxima vez
+            callback_progresso(f"⚠️ Não foi possível registrar no manifesto: {e}")
+
+    pool_conversao = ProcessPoolExecutor(max_workers=processos) if processos > 0 else None
+    pool_reconhecimento = ThreadPoolExecutor(max_workers=simultaneos, thread_name_prefix="lote")
+    # Registros que ainda precisam ler o arquivo inteiro para o hash (concluídos antes do manifesto)
+    pool_manifesto = None
+    cancelado = threading.Event()
+    terminou = False
+
+    def agendar_proximos():
+        while len(em_conversao) + len(em_transcricao) < limite_em_andamento:
+            item = next(fila, None)
+            if item is None:
+                return
+            indice, arquivo = item
+            inicios[indice] = time.perf_counter()
+            perfis[indice] = perfil_lote.novo(arquivo) if perfil_lote else None
+            callback_progresso(f"\n[{indice}/{total_arquivos}] Processando: {os.path.basename(arquivo)}")
+            if pool_conversao:
+                avisar(indice, arquivo, 'convertendo')
+                futuro = pool_conversao.submit(_preparar_no_processo, arquivo, config, perfil_lote is not None)
+                em_conversao[futuro] = (indice, arquivo)
+            else:
+                avisar(indice, arquivo, 'transcrevendo')
+                futuro = pool_reconhecimento.submit(_converter_e_transcrever, arquivo, config,
+                                                    progresso_do_arquivo(indice, arquivo), perfis[indice], cancelado)
+                em_transcricao[futuro] = (indice, arquivo)
+
+    def tempo_do_arquivo(indice):
+        tempo = time.perf_counter() - inicios.pop(indice)
+        perfil = perfis.pop(indice)
+        if perfil:
+            perfil_lote.concluir_arquivo(perfil, tempo)
+        return tempo
+
+    try:
+        if config.get('retomar_lote', True):
+            # Arquivos já transcritos em uma execução anterior do lote
+            restantes = []
+            for indice, arquivo in pendentes:
+                nome_saida = nome_arquivo_saida(arquivo, config)
+                concluido = manifesto.atualizado(arquivo, config, nome_saida) if manifesto else None
+                if concluido is None:
+                    concluido = checkpoint_concluido(arquivo, nome_saida, config)
+                    if concluido is not None and manifesto is not None:
+                        # Concluído antes do manifesto existir: registrar para as próximas vezes, com o
+                        # hash calculado em outra thread para não atrasar o início das conversões
+                        if pool_manifesto is None:
+                            pool_manifesto = ThreadPoolExecutor(max_workers=1, thread_name_prefix="manifesto")
+                        pool_manifesto.submit(registrar_no_manifesto, arquivo, nome_saida, concluido.get('chunks', 0),
+                                              concluido.get('chunks_com_erro', 0))
+                if concluido is None:
+                    restantes.append((indice, arquivo))
+                    continue
+                callback_progresso(f"\n[{indice}/{total_arquivos}] Já transcrito, pulando: {os.path.basename(arquivo)}")
+                avisar(indice, arquivo, 'concluido')
+                yield {'indice': indice, 'arquivo': arquivo, 'saida': nome_saida,
+                       'saidas': nomes_arquivos_saida(arquivo, config),
+                       'chunks': concluido.get('chunks', 0), 'chunks_com_erro': concluido.get('chunks_com_erro', 0),
+                       'erro': None, 'tempo': 0.0, 'pulado': True}
+            pendentes = restantes
+        
+        fila = iter(pendentes)
+        agendar_proximos()
+        while em_conversao or em_transcricao:
+            concluidos, _ = wait(list(em_conversao) + list(em_transcricao), return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                if futuro in em_conversao:
+                    indice, arquivo = em_conversao.pop(futuro)
+                    try:
+                        pcm, formato, segmentacao, eventos, identificacao = futuro.result()
+                    except Exception as e:
+                        avisar(indice, arquivo, 'erro')
+                        yield {'indice': indice, 'arquivo': arquivo, 'erro': str(e),
+                               'tempo': tempo_do_arquivo(indice), 'pulado': False}
+                        continue
+                    if eventos:
+                        perfis[indice].incorporar(eventos)
+                    callback_progresso(f"✓ Áudio decodificado e pré-processado: {os.path.basename(arquivo)}")
+                    avisar(indice, arquivo, 'transcrevendo')
+                    audio = AudioSegment(data=pcm, **formato)
+                    novo = pool_reconhecimento.submit(_converter_e_transcrever, arquivo, config,
+                                                      progresso_do_arquivo(indice, arquivo), perfis[indice], cancelado,
+                                                      (audio, segmentacao, identificacao))
+                    em_transcricao[novo] = (indice, arquivo)
+                else:
+                    indice, arquivo = em_transcricao.pop(futuro)
+                    try:
+                        estatisticas, identificacao = futuro.result()
+                    except Exception as e:
+                        avisar(indice, arquivo, 'erro')
+                        yield {'indice': indice, 'arquivo': arquivo, 'erro': str(e),
+                               'tempo': tempo_do_arquivo(indice), 'pulado': False}
+                        continue
+                    # O hash veio do worker: aqui só a gravação no SQLite
+                    registrar_no_manifesto(arquivo, estatisticas['saida'], estatisticas['chunks'],
+                                           estatisticas['chunks_com_erro'], identificacao)
+                    avisar(indice, arquivo, 'concluido')
+                    yield dict(estatisticas, indice=indice, arquivo=arquivo, erro=None,
+                               tempo=tempo_do_arquivo(indice), pulado=False)
+            agendar_proximos()
+        terminou = True
+    finally:
+        if not terminou:
+            # Interrupção: os arquivos em reconhecimento param no chunk atual, com o checkpoint
+            # gravado, e os da fila nem começam; esperar por eles só atrasaria a saída
+            cancelado.set()
+        pool_reconhecimento.shutdown(wait=terminou, cancel_futures=True)
+        if pool_conversao:
+            pool_conversao.shutdown(wait=terminou, cancel_futures=True)
+        if pool_manifesto:
+            # Interrompido: um registro ainda lendo o arquivo não espera; depois de fechar() ele é descartado
+            pool_manifesto.shutdown(wait=terminou, cancel_futures=True)
+        if manifesto:
+            manifesto.fechar()
+        if perfil_lote:
+            try:
+                caminhos = perfil_lote.exportar(config['arquivo_perfil'])
+                callback_progresso(f"Perfil salvo: {', '.join(caminhos)}")
+            except Exception as e:
+                callback_progresso(f"⚠️ Não foi possível salvar o perfil: {e}")
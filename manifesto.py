@@ -0,0 +1,136 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from checkpoint_lote import PARAMETROS_CHECKPOINT
+
+# Versão do formato do manifesto: mudar faz todos os arquivos serem considerados desatualizados
+VERSAO_MANIFESTO = 1
+
+# Bytes lidos por vez no hash do arquivo de entrada
+BYTES_POR_BLOCO_HASH = 1 << 20
+
+def caminho_manifesto_padrao():
+    return os.path.join(os.path.expanduser("~"), ".transcricao_manifesto.sqlite3")
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo, lido em blocos"""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        while True:
+            bloco = f.read(BYTES_POR_BLOCO_HASH)
+            if not bloco:
+                break
+            h.update(bloco)
+    return h.hexdigest()
+
+def identificar_arquivo(caminho):
+    """
+    (tamanho, data de modificação em ns, SHA-256) do arquivo, como gravados
+    no manifesto. A data é lida antes do hash: se o arquivo mudar durante a
+    leitura, a próxima verificação compara o conteúdo de novo.
+    """
+    info = os.stat(caminho)
+    return info.st_size, info.st_mtime_ns, hash_arquivo(caminho)
+
+def hash_configuracao(config):
+    """Hash das configurações que mudam a transcrição (as mesmas do checkpoint)"""
+    dados = {nome: config.get(nome) for nome in PARAMETROS_CHECKPOINT}
+    dados['versao'] = VERSAO_MANIFESTO
+    return hashlib.sha256(json.dumps(dados, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _chave(arquivo):
+    return os.path.normcase(os.path.abspath(arquivo))
+
+class ManifestoTranscricao:
+    """
+    Registro dos arquivos já transcritos, em SQLite: tamanho, data de
+    modificação e SHA-256 do arquivo de entrada, hash das configurações e
+    caminho da transcrição gerada.
+
+    Como em um sistema de build, um arquivo está atualizado se a transcrição
+    existe, nada disso mudou e nenhum chunk terminou com erro. Tamanho e data iguais dispensam ler o arquivo;
+    com a data diferente (cópia ou sincronização que só "toca" o arquivo) o
+    conteúdo é comparado pelo hash, e a data nova é guardada.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        # Pode ser usado pelo gerador do lote e pelas threads que o consomem; o lock serializa o acesso
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS arquivos ("
+                " caminho TEXT PRIMARY KEY, tamanho INTEGER, modificado INTEGER, hash TEXT,"
+                " hash_config TEXT, saida TEXT, chunks INTEGER, chunks_com_erro INTEGER, transcrito_em TEXT)")
+
+    def atualizado(self, arquivo, config, saida):
+        """Registro do arquivo (dicionário) se a transcrição está em dia, senão None"""
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT tamanho, modificado, hash, hash_config, saida, chunks, chunks_com_erro"
+                " FROM arquivos WHERE caminho = ?", (_chave(arquivo),)).fetchone()
+        if linha is None:
+            return None
+        tamanho, modificado, hash_conteudo, hash_config, saida_registrada, chunks, chunks_com_erro = linha
+        if hash_config != hash_configuracao(config) or saida_registrada != os.path.abspath(saida):
+            return None
+        if chunks_com_erro:
+            # Registros antigos de transcrições com falhas: transcrever de novo
+            return None
+        try:
+            info = os.stat(arquivo)
+            if info.st_size != tamanho or not os.path.exists(saida):
+                return None
+            if info.st_mtime_ns != modificado:
+                if hash_arquivo(arquivo) != hash_conteudo:
+                    return None
+                with self._lock, self._conexao:
+                    self._conexao.execute("UPDATE arquivos SET modificado = ? WHERE caminho = ?",
+                                          (info.st_mtime_ns, _chave(arquivo)))
+        except OSError:
+            return None
+        return {'saida': saida_registrada, 'chunks': chunks, 'chunks_com_erro': chunks_com_erro}
+
+    def registrar(self, arquivo, config, saida, chunks, chunks_com_erro, identificacao=None):
+        """
+        Grava (ou substitui) o registro de um arquivo recém-transcrito; com chunks_com_erro o registro é removido.
+
+        identificacao é o resultado de identificar_arquivo, calculado fora
+        (por exemplo, no worker que converteu o arquivo); sem ela o arquivo
+        inteiro é lido aqui para o hash.
+        """
+        if chunks_com_erro:
+            # Não está em dia: a próxima execução retoma pelo checkpoint e refaz os chunks com erro
+            self._gravar("DELETE FROM arquivos WHERE caminho = ?", (_chave(arquivo),))
+            return
+        tamanho, modificado, hash_conteudo = identificacao or identificar_arquivo(arquivo)
+        self._gravar("INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                     (_chave(arquivo), tamanho, modificado, hash_conteudo, hash_configuracao(config),
+                      os.path.abspath(saida), chunks, chunks_com_erro, datetime.now().isoformat(timespec='seconds')))
+
+    def _gravar(self, sql, parametros):
+        with self._lock:
+            if self._conexao is None:
+                # Fechado por um lote interrompido enquanto o hash era calculado: fica para a próxima execução
+                return
+            with self._conexao:
+                self._conexao.execute(sql, parametros)
+
+    def fechar(self):
+        """Fecha a conexão; registros que terminarem depois são descartados"""
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+def abrir_manifesto(config):
+    """Manifesto de config['arquivo_manifesto'] (ou o padrão), ou None se config['usar_manifesto'] estiver desligado"""
+    if not config.get('usar_manifesto', True):
+        return None
+    return ManifestoTranscricao(config.get('arquivo_manifesto') or caminho_manifesto_padrao())
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# (pid, time.time(), time.perf_counter()) lidos juntos no processo atual
+_ancora = None
+
+def relogio_parede(instante):
+    """
+    Converte um instante de time.perf_counter deste processo para o relógio
+    de parede (time.time). perf_counter não tem origem comum entre processos:
+    os eventos do processo de conversão só se alinham aos do lote assim.
+    """
+    global _ancora
+    if _ancora is None or _ancora[0] != os.getpid():
+        # Também depois de um fork, que herda a âncora do processo pai
+        _ancora = (os.getpid(), time.time(), time.perf_counter())
+    _, parede, referencia = _ancora
+    return parede + (instante - referencia)
+
+def caminho_trace(caminho_perfil):
+    """Arquivo do Chrome trace gravado ao lado do JSON do perfil (abrir em chrome://tracing ou ui.perfetto.dev)"""
+    return os.path.splitext(caminho_perfil)[0] + ".trace.json"
+
+class Perfil:
+    """
+    Eventos de tempo das etapas de um arquivo: início (time.time, via
+    relogio_parede) e duração (time.perf_counter), tempo de CPU da thread que
+    executou a etapa (time.thread_time), processo e thread.
+
+    A decodificação pelo ffmpeg roda em outro processo: a CPU dele não entra
+    na etapa, só a espera. Pode ser usado por várias threads ao mesmo tempo.
+    """
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo
+        self.eventos = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def etapa(self, nome, **argumentos):
+        inicio = time.perf_counter()
+        inicio_cpu = time.thread_time()
+        try:
+            yield argumentos
+        finally:
+            self.registrar(nome, inicio, time.perf_counter() - inicio, time.thread_time() - inicio_cpu, argumentos)
+
+    def registrar(self, nome, inicio, duracao, cpu, argumentos=None):
+        """inicio é um instante de time.perf_counter deste processo"""
+        evento = {
+            'etapa': nome,
+            'inicio': relogio_parede(inicio),
+            'duracao': duracao,
+            'cpu': cpu,
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'thread': threading.current_thread().name,
+        }
+        if argumentos:
+            evento['args'] = argumentos
+        with self._lock:
+            self.eventos.append(evento)
+
+    def incorporar(self, eventos):
+        """Acrescenta eventos medidos em outro processo (o de conversão do lote)"""
+        with self._lock:
+            self.eventos.extend(eventos)
+
+    def resumo(self):
+        return resumir_eventos(self.eventos)
+
+def etapa(perfil, nome, **argumentos):
+    """perfil.etapa(nome) ou, sem perfil, um contexto que não mede nada"""
+    if perfil is None:
+        return nullcontext(argumentos)
+    return perfil.etapa(nome, **argumentos)
+
+def resumir_eventos(eventos):
+    """
+    {etapa: {'chamadas', 'tempo', 'cpu', 'maximo'}} em segundos. Etapas que
+    rodam em várias threads ao mesmo tempo somam mais que o tempo de parede.
+    """
+    resumo = {}
+    for evento in eventos:
+        dados = resumo.setdefault(evento['etapa'], {'chamadas': 0, 'tempo': 0.0, 'cpu': 0.0, 'maximo': 0.0})
+        dados['chamadas'] += 1
+        dados['tempo'] += evento['duracao']
+        dados['cpu'] += evento['cpu']
+        dados['maximo'] = max(dados['maximo'], evento['duracao'])
+    for dados in resumo.values():
+        for chave in ('tempo', 'cpu', 'maximo'):
+            dados[chave] = round(dados[chave], 6)
+    return resumo
+
+def linhas_resumo(resumo):
+    """Uma linha de texto por etapa, da mais demorada para a mais rápida"""
+    return [f"{nome}: {dados['tempo']:.2f}s em {dados['chamadas']} chamadas (CPU {dados['cpu']:.2f}s, máx. {dados['maximo']:.2f}s)"
+            for nome, dados in sorted(resumo.items(), key=lambda item: -item[1]['tempo'])]
+
+class PerfilLote:
+    """
+    Perfis dos arquivos de um lote, exportados juntos: JSON com os totais por
+    etapa do lote e de cada arquivo, e Chrome trace com um evento por etapa
+    (uma linha por processo e thread, tempos relativos ao início do lote).
+    """
+
+    def __init__(self):
+        self._inicio_perf = time.perf_counter()
+        self.inicio = relogio_parede(self._inicio_perf)
+        self.perfis = []
+        self.tempos = {}
+        self._lock = threading.Lock()
+
+    def novo(self, arquivo):
+        perfil = Perfil(arquivo)
+        with self._lock:
+            self.perfis.append(perfil)
+        return perfil
+
+    def concluir_arquivo(self, perfil, tempo):
+        """Guarda o tempo total do arquivo (do agendamento ao fim da transcrição)"""
+        self.tempos[id(perfil)] = tempo
+
+    def eventos(self):
+        with self._lock:
+            return [evento for perfil in self.perfis for evento in perfil.eventos]
+
+    def dados_json(self):
+        return {
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'tempo_total': round(time.perf_counter() - self._inicio_perf, 6),
+            'etapas': resumir_eventos(self.eventos()),
+            'arquivos': [{
+                'arquivo': perfil.arquivo,
+                'tempo': round(self.tempos[id(perfil)], 6) if id(perfil) in self.tempos else None,
+                'etapas': perfil.resumo(),
+            } for perfil in self.perfis],
+        }
+
+    def dados_trace(self):
+        eventos_trace = []
+        threads = {}
+        for perfil in self.perfis:
+            for evento in perfil.eventos:
+                threads[(evento['pid'], evento['tid'])] = evento['thread']
+                argumentos = {'arquivo': perfil.arquivo, 'cpu_ms': round(evento['cpu'] * 1000, 3)}
+                argumentos.update(evento.get('args', {}))
+                eventos_trace.append({
+                    'name': evento['etapa'],
+                    'cat': 'transcricao',
+                    'ph': 'X',
+                    'ts': round((evento['inicio'] - self.inicio) * 1e6, 3),
+                    'dur': round(evento['duracao'] * 1e6, 3),
+                    'pid': evento['pid'],
+                    'tid': evento['tid'],
+                    'args': argumentos,
+                })
+        # Nomes das threads (lote_0, reconhecimento_1, MainThread do processo de conversão...)
+        for (pid, tid), nome in threads.items():
+            eventos_trace.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': nome}})
+        return {'traceEvents': eventos_trace, 'displayTimeUnit': 'ms'}
+
+    def exportar(self, caminho):
+        """Grava o JSON em caminho e o Chrome trace em caminho_trace(caminho); retorna os dois caminhos"""
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        trace = caminho_trace(caminho)
+        for destino, dados in ((caminho, self.dados_json()), (trace, self.dados_trace())):
+            with open(destino, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False, indent=2 if destino == caminho else None)
+        return caminho, trace
+
+def criar_perfil_lote(config):
+    """PerfilLote se config['arquivo_perfil'] estiver definido, senão None"""
+    return PerfilLote() if config.get('arquivo_perfil') else None
@@ -0,0 +1,94 @@
+import math
+import numpy as np
+from pydub import AudioSegment
+from segmentacao import TIPOS_AMOSTRA
+from perfil import etapa
+
+# Folga do pico na normalização, em dB (mesmo padrão de AudioSegment.normalize)
+HEADROOM_DB = 0.1
+
+# Amostras filtradas por vez na convolução por FFT
+AMOSTRAS_POR_BLOCO = 1 << 18
+
+def coeficientes_passa_faixa(sample_rate, freq_baixa, freq_alta):
+    """
+    Filtro FIR de fase linear (sinc janelado com Blackman) que corta abaixo de
+    freq_baixa e acima de freq_alta. Um limite fora de (0, Nyquist) desativa
+    aquele lado; sem nenhum dos dois retorna None.
+    """
+    nyquist = sample_rate / 2
+    passa_alta = 0 < freq_baixa < nyquist
+    passa_baixa = 0 < freq_alta < nyquist
+    if not (passa_alta or passa_baixa):
+        return None
+
+    # Transição de metade da frequência de corte mais baixa (a Blackman precisa de ~5,5 * taxa / N)
+    transicao = min(f for f, ativo in ((freq_baixa, passa_alta), (freq_alta, passa_baixa)) if ativo) / 2
+    transicao = max(transicao, 20)
+    numtaps = int(math.ceil(5.5 * sample_rate / transicao)) | 1
+    n = np.arange(numtaps) - (numtaps - 1) / 2
+
+    def passa_baixa_ideal(corte):
+        return 2 * corte / sample_rate * np.sinc(2 * corte / sample_rate * n)
+
+    # Passa-faixa = passa-baixa(alta) - passa-baixa(baixa); sem o lado alto, o "passa-baixa" é o impulso
+    coeficientes = passa_baixa_ideal(freq_alta) if passa_baixa else (n == 0).astype(np.float64)
+    if passa_alta:
+        coeficientes = coeficientes - passa_baixa_ideal(freq_baixa)
+    return coeficientes * np.blackman(numtaps)
+
+def filtrar_fft(amostras, coeficientes):
+    """
+    Convolução por overlap-add com FFT, alinhada à entrada (compensando o
+    atraso do filtro). Retorna float32 do mesmo tamanho de amostras.
+    """
+    numtaps = len(coeficientes)
+    atraso = (numtaps - 1) // 2
+    tamanho_fft = 1 << int(math.ceil(math.log2(AMOSTRAS_POR_BLOCO + numtaps - 1)))
+    passo = tamanho_fft - numtaps + 1
+    resposta = np.fft.rfft(coeficientes, tamanho_fft)
+
+    # Saída completa da convolução; a parte alinhada é devolvida como view
+    completo = np.zeros(len(amostras) + numtaps - 1, dtype=np.float32)
+    for inicio in range(0, len(amostras), passo):
+        bloco = amostras[inicio:inicio + passo].astype(np.float64)
+        filtrado = np.fft.irfft(np.fft.rfft(bloco, tamanho_fft) * resposta, tamanho_fft)
+        fim = min(inicio + tamanho_fft, len(completo))
+        completo[inicio:fim] += filtrado[:fim - inicio]
+    return completo[atraso:atraso + len(amostras)]
+
+def normalizar_amostras(amostras, sample_width=2, headroom=HEADROOM_DB):
+    """Ganho para o pico ficar headroom dB abaixo do máximo, como AudioSegment.normalize; retorna inteiros"""
+    tipo = TIPOS_AMOSTRA[sample_width]
+    limite = np.iinfo(tipo)
+    pico = max(float(amostras.max()), -float(amostras.min())) if len(amostras) else 0.0
+    if pico == 0:
+        return amostras.astype(tipo)
+    ganho = (2 ** (sample_width * 8) / 2) * (10 ** (-headroom / 20)) / pico
+
+    # Em blocos, para não criar uma cópia float64 do arquivo inteiro
+    saida = np.empty(len(amostras), dtype=tipo)
+    for inicio in range(0, len(amostras), AMOSTRAS_POR_BLOCO):
+        bloco = np.floor(amostras[inicio:inicio + AMOSTRAS_POR_BLOCO] * ganho)
+        saida[inicio:inicio + AMOSTRAS_POR_BLOCO] = np.clip(bloco, limite.min, limite.max)
+    return saida
+
+def preprocessar_audio(audio, config, perfil=None):
+    """
+    Etapa única de pré-processamento: taxa de config['sample_rate'], mono,
+    16 bits, passa-faixa entre filtro_freq_baixa e filtro_freq_alta e uma só
+    normalização do arquivo inteiro. Os chunks recortados depois já estão
+    prontos para o reconhecedor. Com perfil, mede reamostragem, filtro e normalização.
+    """
+    with etapa(perfil, 'reamostragem'):
+        audio = audio.set_frame_rate(config['sample_rate']).set_channels(1).set_sample_width(2)
+    amostras = np.frombuffer(audio.raw_data, dtype=np.int16)
+
+    coeficientes = coeficientes_passa_faixa(audio.frame_rate, config['filtro_freq_baixa'], config['filtro_freq_alta'])
+    if coeficientes is not None and len(amostras):
+        with etapa(perfil, 'filtro'):
+            amostras = filtrar_fft(amostras, coeficientes)
+
+    with etapa(perfil, 'normalizacao'):
+        amostras = normalizar_amostras(amostras)
+    return AudioSegment(data=amostras.tobytes(), sample_width=2, frame_rate=audio.frame_rate, channels=1)
@@ -0,0 +1,237 @@
+import os
+import json
+import time
+
+# Intervalo máximo entre gravações em disco do arquivo parcial (segundos)
+INTERVALO_FLUSH = 2.0
+
+def caminho_parcial(caminho):
+    """Arquivo que recebe a transcrição enquanto ela é gerada, renomeado para caminho no fim"""
+    return caminho + ".parcial"
+
+class EscritorIncremental:
+    """
+    Grava a transcrição à medida que os chunks chegam, em caminho_parcial
+    (que pode ser acompanhado com tail), descarregando em disco pelo menos a
+    cada INTERVALO_FLUSH segundos. concluir() faz fsync e renomeia o parcial
+    para o caminho final com os.replace, então o arquivo final nunca aparece
+    pela metade; após uma falha o parcial fica com o que já foi transcrito.
+
+    O texto gravado é o mesmo de juntar todas as partes com seus separadores
+    e aplicar strip(): espaços no início e o último separador não são gravados.
+    """
+
+    def __init__(self, caminho, intervalo_flush=INTERVALO_FLUSH):
+        self.caminho = caminho
+        self.intervalo_flush = intervalo_flush
+        self._arquivo = None
+        self._pendente = ""
+        self._escrito = False
+        self._ultimo_flush = 0.0
+
+    def abrir(self):
+        self._arquivo = open(caminho_parcial(self.caminho), 'w', encoding='utf-8')
+        self._ultimo_flush = time.monotonic()
+        return self
+
+    def escrever(self, texto, separador=" "):
+        """Acrescenta texto seguido de separador (gravado só se vier mais texto depois)"""
+        conteudo = self._pendente + texto
+        if not self._escrito:
+            conteudo = conteudo.lstrip()
+        corpo = conteudo.rstrip()
+        self._pendente = conteudo[len(corpo):] + separador
+        if corpo:
+            self._escrito = True
+        self._gravar(corpo)
+
+    def _gravar(self, conteudo):
+        if conteudo:
+            self._arquivo.write(conteudo)
+        agora = time.monotonic()
+        if agora - self._ultimo_flush >= self.intervalo_flush:
+            self._arquivo.flush()
+            self._ultimo_flush = agora
+
+    def concluir(self):
+        """Grava tudo em disco e coloca o arquivo no caminho final"""
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        self._arquivo.close()
+        self._arquivo = None
+        os.replace(caminho_parcial(self.caminho), self.caminho)
+
+    def fechar(self):
+        """Fecha sem renomear (interrupção ou erro), mantendo o parcial"""
+        if self._arquivo:
+            self._arquivo.close()
+            self._arquivo = None
+
+def texto_resultado(resultado):
+    """Texto de um resultado de transcribe_audio (dicionário ou só o texto)"""
+    return resultado.get('texto', '') if isinstance(resultado, dict) else str(resultado)
+
+def resultado_com_erro(resultado):
+    """Chunks que não foram transcritos chegam com o texto entre colchetes ([Erro...], [Áudio inaudível]...)"""
+    return texto_resultado(resultado).startswith("[")
+
+# Único texto entre colchetes que não indica falha: o reconhecedor não encontrou fala
+TEXTO_INAUDIVEL = "[Áudio inaudível]"
+
+def resultado_com_falha(resultado):
+    """Chunk que não foi transcrito por erro, timeout ou falha do serviço (áudio inaudível não conta)"""
+    return resultado_com_erro(resultado) and texto_resultado(resultado) != TEXTO_INAUDIVEL
+
+def formatar_tempo(milissegundos, separador="."):
+    """HH:MM:SS.mmm (WebVTT) ou HH:MM:SS,mmm (SRT)"""
+    milissegundos = int(milissegundos)
+    segundos, ms = divmod(milissegundos, 1000)
+    minutos, segundos = divmod(segundos, 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas:02d}:{minutos:02d}:{segundos:02d}{separador}{ms:03d}"
+
+class EscritorTexto(EscritorIncremental):
+    """Texto corrido, ou uma linha [timestamp] texto por chunk quando há timestamp"""
+
+    def adicionar(self, resultado):
+        if isinstance(resultado, dict) and resultado.get('timestamp'):
+            self.escrever(f"[{resultado['timestamp']}] {resultado['texto']}", "\n")
+        else:
+            self.escrever(texto_resultado(resultado))
+
+class EscritorLegenda(EscritorIncremental):
+    """
+    Legenda com um bloco por chunk transcrito, nos tempos inicio_ms/fim_ms do
+    resultado (transcribe_audio com config['metadados_chunk']). Chunks com
+    erro ficam de fora.
+    """
+    cabecalho = ""
+    separador_ms = "."
+
+    def abrir(self):
+        super().abrir()
+        self._blocos = 0
+        self._gravar(self.cabecalho)
+        return self
+
+    def adicionar(self, resultado):
+        if not isinstance(resultado, dict) or 'inicio_ms' not in resultado or resultado_com_erro(resultado):
+            return
+        texto = resultado['texto'].strip()
+        if not texto:
+            return
+        self._blocos += 1
+        tempos = (f"{formatar_tempo(resultado['inicio_ms'], self.separador_ms)} --> "
+                  f"{formatar_tempo(resultado['fim_ms'], self.separador_ms)}")
+        self._gravar(self.formatar_bloco(self._blocos, tempos, texto))
+
+    def formatar_bloco(self, numero, tempos, texto):
+        raise NotImplementedError
+
+class EscritorSrt(EscritorLegenda):
+    separador_ms = ","
+
+    def formatar_bloco(self, numero, tempos, texto):
+        return f"{numero}\n{tempos}\n{texto}\n\n"
+
+class EscritorVtt(EscritorLegenda):
+    cabecalho = "WEBVTT\n\n"
+
+    def formatar_bloco(self, numero, tempos, texto):
+        return f"{tempos}\n{texto}\n\n"
+
+class EscritorJsonl(EscritorIncremental):
+    """Um objeto JSON por chunk, com texto, tempos, backend, tentativas, latência e se houve erro"""
+
+    def abrir(self):
+        super().abrir()
+        self._indice = 0
+        return self
+
+    def adicionar(self, resultado):
+        dados = dict(resultado) if isinstance(resultado, dict) else {'texto': str(resultado)}
+        dados.pop('timestamp', None)
+        registro = {'indice': self._indice}
+        registro.update(dados)
+        registro['erro'] = resultado_com_erro(resultado)
+        self._indice += 1
+        self._gravar(json.dumps(registro, ensure_ascii=False) + "\n")
+
+# Formato -> (classe do escritor, extensão); o texto é sempre gerado
+FORMATOS = {
+    'txt': (EscritorTexto, ".txt"),
+    'srt': (EscritorSrt, ".srt"),
+    'vtt': (EscritorVtt, ".vtt"),
+    'jsonl': (EscritorJsonl, ".jsonl"),
+}
+
+def formatos_configurados(config):
+    """
+    Formatos de config['formatos_saida'] (lista ou texto separado por vírgulas),
+    sempre começando por 'txt'. Levanta ValueError para formato desconhecido.
+    """
+    valor = config.get('formatos_saida') or []
+    if isinstance(valor, str):
+        valor = valor.split(",")
+    formatos = ['txt']
+    for formato in valor:
+        formato = formato.strip().lower().lstrip(".")
+        if not formato or formato in formatos:
+            continue
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de saída desconhecido: {formato} (disponíveis: {', '.join(FORMATOS)})")
+        formatos.append(formato)
+    return formatos
+
+def _base_saida(arquivo, config):
+    base = os.path.splitext(arquivo)[0]
+    pasta_saida = config.get('pasta_saida')
+    if pasta_saida:
+        base = os.path.join(pasta_saida, os.path.basename(base))
+    return base
+
+def nome_arquivo_saida(arquivo, config):
+    """
+    Retorna o caminho do arquivo de transcrição gerado para o arquivo de
+    entrada: ao lado dele, ou em config['pasta_saida'] se configurada.
+    """
+    sufixo = "_transcrito_com_timestamp.txt" if config.get('incluir_timestamp', False) else "_transcrito.txt"
+    return _base_saida(arquivo, config) + sufixo
+
+def nomes_arquivos_saida(arquivo, config):
+    """{formato: caminho} de todos os formatos de config['formatos_saida'] (o texto sempre incluído)"""
+    nomes = {}
+    for formato in formatos_configurados(config):
+        if formato == 'txt':
+            nomes[formato] = nome_arquivo_saida(arquivo, config)
+        else:
+            nomes[formato] = _base_saida(arquivo, config) + "_transcrito" + FORMATOS[formato][1]
+    return nomes
+
+class SaidaTranscricao:
+    """
+    Todos os formatos pedidos gerados em uma só passada pelos resultados:
+    cada chunk é entregue a cada escritor assim que chega. caminhos é
+    {formato: caminho final}.
+    """
+
+    def __init__(self, caminhos):
+        self.caminhos = caminhos
+        self.escritores = [FORMATOS[formato][0](caminho) for formato, caminho in caminhos.items()]
+
+    def abrir(self):
+        for escritor in self.escritores:
+            escritor.abrir()
+        return self
+
+    def adicionar(self, resultado):
+        for escritor in self.escritores:
+            escritor.adicionar(resultado)
+
+    def concluir(self):
+        for escritor in self.escritores:
+            escritor.concluir()
+
+    def fechar(self):
+        for escritor in self.escritores:
+            escritor.fechar()
@@ -0,0 +1,356 @@
+import math
+import numpy as np
+from pydub import AudioSegment
+
+# Tipos numpy para cada largura de amostra suportada pelo pydub (PCM com sinal, como no audioop)
+TIPOS_AMOSTRA = {1: np.int8, 2: np.int16, 4: np.int32}
+
+# Frames lidos por vez ao calcular a energia, para não duplicar o buffer inteiro em memória
+FRAMES_POR_BLOCO = 1 << 20
+
+def energia_acumulada(sound):
+    """
+    Calcula a energia acumulada (soma dos quadrados das amostras) em cada
+    fronteira de milissegundo do áudio, em uma única passada pelo buffer.
+
+    Retorna (acumulado, limites, energia_total, total_amostras): acumulado[m] é
+    a energia dos frames anteriores ao milissegundo m, e limites[m] é o frame
+    correspondente, calculado como no fatiamento do pydub.
+    """
+    canais = sound.channels
+    amostras = np.frombuffer(sound.raw_data, dtype=TIPOS_AMOSTRA[sound.sample_width])
+    total_frames = len(amostras) // canais
+    duracao = len(sound)
+
+    # Mesma conta de AudioSegment._parse_position: int(ms * (frame_rate / 1000.0))
+    limites = (np.arange(duracao + 1) * (sound.frame_rate / 1000.0)).astype(np.int64)
+    limites_validos = np.minimum(limites, total_frames)
+
+    # Inteiros são exatos para 8 e 16 bits; 32 bits estouraria int64 nos quadrados
+    tipo_soma = np.int64 if sound.sample_width <= 2 else np.float64
+    acumulado = np.zeros(duracao + 1, dtype=tipo_soma)
+    base = tipo_soma(0)
+
+    for inicio in range(0, total_frames, FRAMES_POR_BLOCO):
+        fim = min(inicio + FRAMES_POR_BLOCO, total_frames)
+        bloco = amostras[inicio * canais:fim * canais].astype(tipo_soma)
+        energia = (bloco * bloco).reshape(-1, canais).sum(axis=1)
+        soma = np.concatenate(([base], base + np.cumsum(energia)))
+
+        # Fronteiras de milissegundo que caem dentro deste bloco
+        a = np.searchsorted(limites_validos, inicio, side='left')
+        b = np.searchsorted(limites_validos, fim, side='right')
+        acumulado[a:b] = soma[limites_validos[a:b] - inicio]
+        base = soma[-1]
+
+    return acumulado, limites, base, total_frames * canais
+
+def dbfs(energia_total, total_amostras, sample_width):
+    """Equivalente a AudioSegment.dBFS a partir da energia já calculada"""
+    if total_amostras == 0:
+        return -float("infinity")
+    rms = int(math.sqrt(energia_total / total_amostras))
+    if not rms:
+        return -float("infinity")
+    amplitude_maxima = (2 ** (sample_width * 8)) / 2
+    return 20 * math.log10(rms / amplitude_maxima)
+
+def janelas_silenciosas(sound, min_silence_len, silence_thresh, energia=None):
+    """Inícios (ms) das janelas de min_silence_len cujo RMS não passa de silence_thresh (dBFS)"""
+    duracao = len(sound)
+    if duracao < min_silence_len:
+        return np.empty(0, dtype=np.int64)
+
+    if energia is None:
+        energia = energia_acumulada(sound)
+    acumulado, limites, _, _ = energia
+
+    # RMS de cada janela [i, i + min_silence_len) para todo início i
+    inicios = np.arange(duracao - min_silence_len + 1)
+    fins = inicios + min_silence_len
+    rms = rms_truncado(acumulado[fins] - acumulado[inicios], (limites[fins] - limites[inicios]) * sound.channels)
+    return np.flatnonzero(rms <= limite_rms(silence_thresh, sound.sample_width))
+
+def rms_truncado(soma, amostras):
+    """RMS truncado como no audioop, a partir da soma dos quadrados e do número de amostras (0 sem amostras)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rms = np.floor(np.sqrt(np.asarray(soma, dtype=np.float64) / amostras))
+    rms[np.asarray(amostras) == 0] = 0
+    return rms
+
+def limite_rms(silence_thresh, sample_width):
+    """RMS correspondente a silence_thresh (dBFS)"""
+    return (10 ** (silence_thresh / 20)) * ((2 ** (sample_width * 8)) / 2)
+
+def agrupar_janelas(inicios_silencio, min_silence_len):
+    """Junta inícios de janelas silenciosas em faixas [início_ms, fim_ms], como pydub.silence.detect_silence"""
+    if len(inicios_silencio) == 0:
+        return []
+
+    # Inícios separados por mais que min_silence_len começam uma nova faixa
+    quebras = np.flatnonzero(np.diff(inicios_silencio) > min_silence_len)
+    primeiros = np.concatenate(([inicios_silencio[0]], inicios_silencio[quebras + 1]))
+    ultimos = np.concatenate((inicios_silencio[quebras], [inicios_silencio[-1]]))
+    return [[int(a), int(b) + min_silence_len] for a, b in zip(primeiros, ultimos)]
+
+def detectar_silencio(sound, min_silence_len, silence_thresh, energia=None):
+    """
+    Versão vetorizada de pydub.silence.detect_silence (seek_step=1).
+
+    Retorna as faixas silenciosas [início_ms, fim_ms]; silence_thresh em dBFS.
+    """
+    inicios_silencio = janelas_silenciosas(sound, min_silence_len, silence_thresh, energia)
+    return agrupar_janelas(inicios_silencio, min_silence_len)
+
+def detectar_segmentos(sound, min_silence_len, silence_thresh_offset, keep_silence, energia=None):
+    """
+    Substituto de pydub.silence.split_on_silence que devolve apenas as
+    fronteiras dos chunks como (início_ms, fim_ms), sem copiar o áudio.
+
+    O limiar de silêncio é sound.dBFS + silence_thresh_offset, como em
+    transcribe_audio, e keep_silence segue a mesma regra do pydub.
+    """
+    if energia is None:
+        energia = energia_acumulada(sound)
+    _, _, energia_total, total_amostras = energia
+    silence_thresh = dbfs(energia_total, total_amostras, sound.sample_width) + silence_thresh_offset
+
+    duracao = len(sound)
+    faixas_silencio = detectar_silencio(sound, min_silence_len, silence_thresh, energia)
+    faixas_fala = inverter_faixas(faixas_silencio, duracao)
+    return aplicar_keep_silence(faixas_fala, keep_silence, duracao)
+
+def nivel_ruido(sound, segmentos, energia=None):
+    """
+    RMS do áudio fora dos segmentos de fala (os silêncios que a divisão já
+    encontrou), como estimativa do ruído de fundo do arquivo inteiro.
+    segmentos deve vir de detectar_segmentos: qualquer trecho fora deles é
+    tratado como silêncio. Retorna None se os segmentos cobrem todo o áudio.
+    """
+    if energia is None:
+        energia = energia_acumulada(sound)
+    acumulado, limites, _, total_amostras = energia
+    duracao = len(sound)
+    limites = np.minimum(limites, total_amostras // sound.channels)
+
+    soma = 0
+    amostras = 0
+    anterior = 0
+    for inicio, fim in list(segmentos) + [(duracao, duracao)]:
+        if inicio > anterior:
+            soma += int(acumulado[inicio] - acumulado[anterior])
+            amostras += int(limites[inicio] - limites[anterior]) * sound.channels
+        anterior = max(anterior, fim)
+
+    if amostras == 0:
+        return None
+    return int(math.sqrt(soma / amostras))
+
+def inverter_faixas(faixas_silencio, duracao):
+    """Faixas não silenciosas, com as mesmas regras de pydub.silence.detect_nonsilent"""
+    if not faixas_silencio:
+        return [[0, duracao]]
+    if faixas_silencio[0][0] == 0 and faixas_silencio[0][1] == duracao:
+        return []
+    
+    faixas_fala = []
+    fim_anterior = 0
+    for inicio, fim in faixas_silencio:
+        faixas_fala.append([fim_anterior, inicio])
+        fim_anterior = fim
+    if fim != duracao:
+        faixas_fala.append([fim_anterior, duracao])
+    if faixas_fala[0] == [0, 0]:
+        faixas_fala.pop(0)
+    return faixas_fala
+
+def aplicar_keep_silence(faixas_fala, keep_silence, duracao):
+    """Expande as faixas de fala com keep_silence como pydub.silence.split_on_silence, retornando (início_ms, fim_ms)"""
+    if isinstance(keep_silence, bool):
+        keep_silence = duracao if keep_silence else 0
+
+    faixas = [[inicio - keep_silence, fim + keep_silence] for inicio, fim in faixas_fala]
+
+    # Silêncio menor que 2 * keep_silence é dividido ao meio entre os chunks vizinhos
+    for anterior, seguinte in zip(faixas, faixas[1:]):
+        if seguinte[0] < anterior[1]:
+            anterior[1] = (anterior[1] + seguinte[0]) // 2
+            seguinte[0] = anterior[1]
+
+    return [(max(inicio, 0), min(fim, duracao)) for inicio, fim in faixas]
+
+class _Serie:
+    """Vetor numpy que cresce no fim e descarta do início em tempo amortizado constante"""
+
+    def __init__(self, dtype):
+        self._dados = np.empty(1024, dtype=dtype)
+        self._inicio = 0
+        self._fim = 0
+
+    def __len__(self):
+        return self._fim - self._inicio
+
+    def valores(self):
+        return self._dados[self._inicio:self._fim]
+
+    def estender(self, valores):
+        tamanho = len(self)
+        if self._fim + len(valores) > len(self._dados):
+            # Sem espaço no fim: trazer os valores para o início, dobrando a capacidade se preciso
+            dados = self._dados
+            if tamanho + len(valores) > len(dados) // 2:
+                dados = np.empty(2 * (tamanho + len(valores)), dtype=self._dados.dtype)
+            dados[:tamanho] = self._dados[self._inicio:self._fim]
+            self._dados, self._inicio, self._fim = dados, 0, tamanho
+        self._dados[self._fim:self._fim + len(valores)] = valores
+        self._fim += len(valores)
+
+    def descartar(self, quantidade):
+        self._inicio += min(quantidade, len(self))
+
+def segmentar_stream(blocos, sample_rate, min_silence_len, silence_thresh_offset, keep_silence,
+                     janela_max_ms, chunk_length):
+    """
+    Segmentação incremental sobre blocos de PCM 16-bit mono (por exemplo, de
+    um pipe do ffmpeg), gerando (início_ms, fim_ms, trecho) assim que cada
+    chunk não pode mais mudar.
+
+    Mantém em memória apenas o áudio ainda não entregue. Um chunk é entregue
+    quando o silêncio depois dele termina ou já passa de min_silence_len +
+    keep_silence; silêncios longos são descartados mantendo só o necessário
+    para a próxima fala. Se a fala contínua passar de janela_max_ms, o início da janela é
+    cortado em pedaços de chunk_length, como na divisão forçada por tempo.
+
+    A energia acumulada por milissegundo e o RMS de cada janela são
+    calculados só para o bloco novo. As fronteiras de milissegundo contam a
+    partir do início do stream, como em detectar_segmentos sobre o arquivo
+    inteiro. Como o áudio inteiro não está disponível, o limiar de silêncio
+    usa o dBFS de tudo o que foi decodificado até o momento.
+    """
+    if isinstance(keep_silence, bool):
+        keep_silence = janela_max_ms if keep_silence else 0
+    janela_max_ms = max(janela_max_ms, chunk_length)
+    frames_por_ms = sample_rate / 1000.0
+
+    def frame(ms):
+        # Mesma conta de AudioSegment._parse_position
+        return int(ms * frames_por_ms)
+
+    def frames(inicio_ms, fim_ms):
+        return (np.arange(inicio_ms, fim_ms) * frames_por_ms).astype(np.int64)
+
+    buffer = bytearray()
+    base_ms = 0
+    energia_total = 0
+    total_frames = 0
+    # acumulado[k]: energia dos frames antes do milissegundo base_ms + k, só para fronteiras já recebidas
+    acumulado = _Serie(np.int64)
+    # rms[k]: RMS da janela que começa em base_ms + k, só para janelas que terminam numa fronteira recebida
+    rms = _Serie(np.float64)
+
+    def adicionar(bloco):
+        nonlocal energia_total, total_frames
+        amostras = np.frombuffer(bloco, dtype=np.int16).astype(np.int64)
+        soma = np.concatenate(([energia_total], energia_total + np.cumsum(amostras * amostras)))
+        proximo = base_ms + len(acumulado)
+        limites = frames(proximo, proximo + int(len(amostras) / frames_por_ms) + 2)
+        limites = limites[limites <= total_frames + len(amostras)]
+        acumulado.estender(soma[limites - total_frames])
+
+        # Janelas que passaram a terminar numa fronteira recebida
+        inicio = len(rms)
+        fim = len(acumulado) - min_silence_len
+        if fim > inicio:
+            valores = acumulado.valores()
+            limites = frames(base_ms + inicio, base_ms + fim + min_silence_len)
+            rms.estender(rms_truncado(valores[inicio + min_silence_len:] - valores[inicio:fim],
+                                      limites[min_silence_len:] - limites[:fim - inicio]))
+
+        buffer.extend(bloco)
+        energia_total = int(soma[-1])
+        total_frames += len(amostras)
+
+    def duracao_atual():
+        # len() do AudioSegment com tudo o que foi recebido, a partir de base_ms
+        return round(1000 * (total_frames / sample_rate)) - base_ms
+
+    def janelas_silenciosas_atuais(duracao, silence_thresh):
+        limite = limite_rms(silence_thresh, 2)
+        inicios_silencio = np.flatnonzero(rms.valores() <= limite)
+        # Janelas que terminam depois do último frame recebido (no máximo uma ou duas): fim truncado, como no pydub
+        inicios = np.arange(len(rms), duracao - min_silence_len + 1)
+        if len(inicios) == 0:
+            return inicios_silencio
+        valores = acumulado.valores()
+        fins = inicios + min_silence_len
+        energia_fins = np.where(fins < len(valores), valores[np.minimum(fins, len(valores) - 1)], energia_total)
+        amostras = frames(base_ms, base_ms + duracao + 1)
+        provisorios = rms_truncado(energia_fins - valores[inicios], amostras[fins] - amostras[inicios])
+        return np.concatenate((inicios_silencio, inicios[provisorios <= limite]))
+
+    def recortar(inicio, fim):
+        primeiro = frame(base_ms)
+        dados = bytes(buffer[(frame(base_ms + inicio) - primeiro) * 2:(frame(base_ms + fim) - primeiro) * 2])
+        return AudioSegment(data=dados, sample_width=2, frame_rate=sample_rate, channels=1)
+
+    def descartar(ms):
+        nonlocal base_ms
+        del buffer[:(frame(base_ms + ms) - frame(base_ms)) * 2]
+        acumulado.descartar(ms)
+        rms.descartar(ms)
+        base_ms += ms
+
+    for bloco in blocos:
+        adicionar(bloco)
+        if total_frames - frame(base_ms) < min_silence_len * frames_por_ms:
+            continue
+
+        silence_thresh = dbfs(energia_total, total_frames, 2) + silence_thresh_offset
+        duracao = duracao_atual()
+        inicios_silencio = janelas_silenciosas_atuais(duracao, silence_thresh)
+        faixas_silencio = agrupar_janelas(inicios_silencio, min_silence_len)
+        faixas_fala = inverter_faixas(faixas_silencio, duracao)
+        ajustadas = aplicar_keep_silence(faixas_fala, keep_silence, duracao)
+
+        # Silêncio fechado: todas as janelas que poderiam estendê-lo já foram avaliadas
+        fechadas = [faixa for faixa in faixas_silencio if faixa[1] <= duracao - min_silence_len]
+        aberta = faixas_silencio[-1] if faixas_silencio and faixas_silencio[-1][1] == duracao else None
+
+        # limite_fala: falas que começam antes dele já são definitivas; corte: novo início do buffer
+        limite_fala = corte = None
+        if aberta:
+            # Silêncio em andamento: descartá-lo a partir de uma janela silenciosa, guardando o
+            # suficiente para que a próxima fala seja detectada no mesmo ponto
+            alvo = duracao - max(min_silence_len, keep_silence)
+            posicao = np.searchsorted(inicios_silencio, alvo, side='right') - 1
+            if posicao >= 0 and inicios_silencio[posicao] >= aberta[0] + keep_silence:
+                limite_fala = aberta[0]
+                corte = int(inicios_silencio[posicao])
+        if limite_fala is None and fechadas:
+            limite_fala = fechadas[-1][1]
+
+        if limite_fala is not None:
+            for (inicio_fala, _), (inicio, fim) in zip(faixas_fala, ajustadas):
+                if inicio_fala >= limite_fala:
+                    # O buffer passa a começar no início ajustado da fala seguinte
+                    if corte is None:
+                        corte = inicio
+                    break
+                yield (base_ms + inicio, base_ms + fim, recortar(inicio, fim))
+            if corte is None:
+                corte = limite_fala
+            descartar(corte)
+
+        # Fala contínua além da janela: cortar por tempo para limitar a memória
+        while total_frames - frame(base_ms) >= janela_max_ms * frames_por_ms:
+            yield (base_ms, base_ms + chunk_length, recortar(0, chunk_length))
+            descartar(chunk_length)
+
+    # Fim do stream: o restante é segmentado de uma vez
+    if buffer:
+        silence_thresh = dbfs(energia_total, total_frames, 2) + silence_thresh_offset
+        duracao = duracao_atual()
+        faixas_silencio = agrupar_janelas(janelas_silenciosas_atuais(duracao, silence_thresh), min_silence_len)
+        faixas_fala = inverter_faixas(faixas_silencio, duracao)
+        for inicio, fim in aplicar_keep_silence(faixas_fala, keep_silence, duracao):
+            yield (base_ms + inicio, base_ms + fim, recortar(inicio, fim))
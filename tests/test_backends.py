@@ -0,0 +1,140 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import speech_recognition as sr
+from pydub import AudioSegment
+
+import backends
+from backends import BackendFake, BackendVosk, obter_backend, obter_fallback
+from transcriber import transcribe_audio
+from configuracao import CONFIG_PADRAO
+
+TAXA = 16000
+
+def audio_data(amostras):
+    return sr.AudioData(np.asarray(amostras, dtype=np.int16).tobytes(), TAXA, 2)
+
+def test_fake_identifica_o_audio_e_nao_reconhece_silencio():
+    backend = BackendFake({})
+    tom = (3000 * np.sin(np.arange(TAXA // 2) / 5)).astype(np.int16)
+    texto = backend.transcrever(audio_data(tom), None)
+    assert texto.startswith("fala 500ms ")
+    assert backend.transcrever(audio_data(tom), None) == texto
+    with pytest.raises(sr.UnknownValueError):
+        backend.transcrever(audio_data(np.zeros(TAXA)), None)
+    assert backend.chamadas == 3
+
+def test_vosk_sem_o_modulo_levanta_request_error(monkeypatch):
+    # None em sys.modules faz o import levantar ImportError, mesmo com o vosk instalado
+    monkeypatch.setitem(sys.modules, 'vosk', None)
+    with pytest.raises(sr.RequestError, match="vosk"):
+        BackendVosk({}).transcrever(audio_data(np.ones(TAXA)), None)
+
+def test_selecao_do_fallback():
+    assert obter_fallback({'backend': 'google', 'backend_fallback': 'nenhum'}) is None
+    assert obter_fallback({'backend': 'fake', 'backend_fallback': 'fake'}) is None
+    assert obter_fallback({'backend': 'vosk', 'backend_fallback': 'fake'}).nome == "fake"
+    # Sem backend_fallback na configuração, o padrão é o Sphinx
+    assert obter_fallback({'backend': 'google'}).nome == "sphinx"
+    with pytest.raises(ValueError):
+        obter_backend('inexistente', {})
+
+def test_vosk_sem_o_modulo_cai_no_fallback(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'vosk', None)
+    monkeypatch.setitem(backends._backends, 'vosk', BackendVosk({}))
+    config = dict(CONFIG_PADRAO, backend='vosk', backend_fallback='fake', metadados_chunk=True,
+                  cache_tamanho_max_mb=0, pasta_cache=str(tmp_path / "cache"))
+    t = np.arange(TAXA * 2) / TAXA
+    tom = AudioSegment(data=(8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16).tobytes(),
+                       sample_width=2, frame_rate=TAXA, channels=1)
+    audio = AudioSegment.silent(1000, frame_rate=TAXA) + tom + AudioSegment.silent(1000, frame_rate=TAXA)
+
+    resultados = list(transcribe_audio(audio, ".", config=config))
+    assert len(resultados) == 1
+    assert resultados[0]['texto'].startswith("fala ")
+    # Erro de instalação vai direto ao fallback, sem repetir as tentativas do principal
+    assert (resultados[0]['backend'], resultados[0]['tentativas']) == ("fake", 1)
+
+class DecodificadorFalso:
+    """Decoder do pocketsphinx falso: registra as instâncias e falha com áudio marcado com 0x7f"""
+    criados = []
+    barreira = None
+
+    def __init__(self, configuracao):
+        self.configuracao = configuracao
+        self.usos = 0
+        DecodificadorFalso.criados.append(self)
+
+    def start_utt(self):
+        self._dados = b""
+
+    def process_raw(self, dados, sem_busca, frase_completa):
+        if self.barreira:
+            self.barreira.wait(timeout=5)
+        if dados[:1] == b"\x7f":
+            raise RuntimeError("decodificação falhou")
+        self._dados = dados
+
+    def end_utt(self):
+        self.usos += 1
+
+    def hyp(self):
+        if not any(self._dados):
+            return None
+        return type("Hipotese", (), {'hypstr': f"decodificador {DecodificadorFalso.criados.index(self)}"})()
+
+@pytest.fixture
+def sphinx_falso(tmp_path, monkeypatch):
+    """pocketsphinx falso e os arquivos de modelo do pt-BR onde BackendSphinx os procura"""
+    class Config:
+        def set_string(self, opcao, valor):
+            pass
+
+    modulo = type(sys)("pocketsphinx")
+    modulo.pocketsphinx = type(sys)("pocketsphinx.pocketsphinx")
+    modulo.pocketsphinx.Config = Config
+    modulo.pocketsphinx.Decoder = DecodificadorFalso
+    monkeypatch.setitem(sys.modules, 'pocketsphinx', modulo)
+
+    pasta = tmp_path / "pocketsphinx-data" / "pt-BR"
+    (pasta / "acoustic-model").mkdir(parents=True)
+    (pasta / "language-model.lm.bin").write_bytes(b"")
+    (pasta / "pronounciation-dictionary.dict").write_bytes(b"")
+    monkeypatch.setattr(sr, '__file__', str(tmp_path / "__init__.py"))
+    DecodificadorFalso.criados = []
+    return backends.BackendSphinx({})
+
+def test_sphinx_reaproveita_o_decodificador_entre_chunks(sphinx_falso):
+    for _ in range(5):
+        assert sphinx_falso.transcrever(audio_data(np.ones(TAXA)), None) == "decodificador 0"
+    # Sem fala a hipótese é None, mas o decodificador volta para a reserva
+    with pytest.raises(sr.UnknownValueError):
+        sphinx_falso.transcrever(audio_data(np.zeros(TAXA)), None)
+    assert len(DecodificadorFalso.criados) == 1
+    assert (DecodificadorFalso.criados[0].usos, sphinx_falso.cargas) == (6, 1)
+
+def test_sphinx_descarta_o_decodificador_que_falhou(sphinx_falso):
+    sphinx_falso.transcrever(audio_data(np.ones(TAXA)), None)
+    with pytest.raises(RuntimeError):
+        sphinx_falso.transcrever(sr.AudioData(b"\x7f\x00" * TAXA, TAXA, 2), None)
+    # O decodificador com erro não volta para a reserva: o próximo chunk carrega outro
+    assert sphinx_falso.transcrever(audio_data(np.ones(TAXA)), None) == "decodificador 1"
+    assert sphinx_falso.transcrever(audio_data(np.ones(TAXA)), None) == "decodificador 1"
+    assert sphinx_falso.cargas == 2
+
+def test_sphinx_um_decodificador_por_chamada_simultanea(sphinx_falso, monkeypatch):
+    # As três chamadas ficam dentro de process_raw ao mesmo tempo: nenhuma pode usar o decodificador de outra
+    monkeypatch.setattr(DecodificadorFalso, 'barreira', threading.Barrier(3))
+    with ThreadPoolExecutor(3) as executor:
+        textos = list(executor.map(lambda _: sphinx_falso.transcrever(audio_data(np.ones(TAXA)), None), range(3)))
+    assert sorted(textos) == ["decodificador 0", "decodificador 1", "decodificador 2"]
+
+    # Depois os três ficam na reserva e são reaproveitados, sem carregar outro
+    monkeypatch.setattr(DecodificadorFalso, 'barreira', None)
+    for _ in range(6):
+        sphinx_falso.transcrever(audio_data(np.ones(TAXA)), None)
+    assert sphinx_falso.cargas == 3
+    assert sum(decodificador.usos for decodificador in DecodificadorFalso.criados) == 9
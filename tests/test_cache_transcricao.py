@@ -0,0 +1,36 @@
+from cache_transcricao import CacheTranscricao
+
+def test_sobrescrever_nao_soma_o_tamanho_de_novo(tmp_path):
+    cache = CacheTranscricao(str(tmp_path), 1)
+    chave = cache.chave(b"\x00\x01" * 100, {})
+    cache.guardar(chave, "primeiro texto")
+    tamanho = cache._tamanho_atual
+    for _ in range(10):
+        cache.guardar(chave, "primeiro texto")
+    assert cache._tamanho_atual == tamanho
+    cache.guardar(chave, "texto mais longo que o primeiro")
+    assert cache._tamanho_atual == sum(tamanho for _, _, tamanho in cache._entradas())
+    assert cache.obter(chave) == "texto mais longo que o primeiro"
+
+def test_entradas_antigas_removidas_acima_do_limite(tmp_path):
+    cache = CacheTranscricao(str(tmp_path), 0.001)
+    for i in range(100):
+        cache.guardar(cache.chave(bytes([i]) * 10, {}), "x" * 20)
+    assert cache._tamanho_atual <= cache.tamanho_maximo
+    assert cache._tamanho_atual == sum(tamanho for _, _, tamanho in cache._entradas())
+
+def test_registro_guarda_o_backend(tmp_path):
+    cache = CacheTranscricao(str(tmp_path), 1)
+    chave = cache.chave(b"\x00\x01" * 100, {}, servico="google")
+    cache.guardar(chave, "texto", "google")
+    assert cache.obter_registro(chave) == {'texto': "texto", 'backend': "google"}
+    outra = cache.chave(b"\x02" * 100, {})
+    cache.guardar(outra, "sem backend")
+    assert cache.obter_registro(outra) == {'texto': "sem backend"}
+    assert cache.obter(outra) == "sem backend"
+    assert (cache.acertos, cache.falhas) == (3, 0)
+
+def test_pular_chunks_de_ruido_muda_a_chave(tmp_path):
+    cache = CacheTranscricao(str(tmp_path), 1)
+    dados = b"\x00\x01" * 100
+    assert cache.chave(dados, {'pular_chunks_de_ruido': False}) != cache.chave(dados, {'pular_chunks_de_ruido': True})
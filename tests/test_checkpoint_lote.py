@@ -0,0 +1,51 @@
+import os
+
+from checkpoint_lote import CheckpointTranscricao, caminho_checkpoint, checkpoint_concluido
+
+CONFIG = {'backend': 'fake', 'sample_rate': 16000}
+
+def preparar(tmp_path):
+    arquivo = tmp_path / "a.wav"
+    arquivo.write_bytes(b"audio")
+    saida = tmp_path / "a_transcrito.txt"
+    saida.write_text("texto", encoding="utf-8")
+    return str(arquivo), str(saida)
+
+def test_concluido_sem_erros_e_pulado(tmp_path):
+    arquivo, saida = preparar(tmp_path)
+    checkpoint = CheckpointTranscricao(caminho_checkpoint(saida), arquivo, CONFIG).abrir()
+    checkpoint.registrar(0, "fala")
+    checkpoint.concluir(1, 0)
+    checkpoint.fechar()
+    assert checkpoint_concluido(arquivo, saida, CONFIG) == {'concluido': True, 'chunks': 1, 'chunks_com_erro': 0}
+
+def test_conclusao_com_erros_nao_pula_o_arquivo(tmp_path):
+    # Diário gravado antes da correção, com todos os chunks em erro
+    arquivo, saida = preparar(tmp_path)
+    checkpoint = CheckpointTranscricao(caminho_checkpoint(saida), arquivo, CONFIG).abrir()
+    checkpoint.concluir(5, 5)
+    checkpoint.fechar()
+    assert checkpoint_concluido(arquivo, saida, CONFIG) is None
+
+def test_outra_configuracao_nao_pula(tmp_path):
+    arquivo, saida = preparar(tmp_path)
+    checkpoint = CheckpointTranscricao(caminho_checkpoint(saida), arquivo, CONFIG).abrir()
+    checkpoint.concluir(1, 0)
+    checkpoint.fechar()
+    assert checkpoint_concluido(arquivo, saida, dict(CONFIG, backend='google')) is None
+    # No modo streaming o tamanho do bloco muda o limiar de silêncio e, com ele, os chunks
+    assert checkpoint_concluido(arquivo, saida, dict(CONFIG, bloco_streaming_ms=500)) is None
+
+def test_conclusao_descarta_o_texto_dos_chunks(tmp_path):
+    arquivo, saida = preparar(tmp_path)
+    caminho = caminho_checkpoint(saida)
+    checkpoint = CheckpointTranscricao(caminho, arquivo, CONFIG).abrir()
+    checkpoint.registrar(0, "primeira fala")
+    checkpoint.registrar(1, "segunda fala")
+    checkpoint.concluir(2, 0)
+    checkpoint.fechar()
+    with open(caminho, encoding='utf-8') as f:
+        conteudo = f.read()
+    assert "fala" not in conteudo and len(conteudo.splitlines()) == 2
+    assert not os.path.exists(caminho + ".tmp")
+    assert checkpoint_concluido(arquivo, saida, CONFIG)['chunks'] == 2
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from cli import main
+
+TAXA = 16000
+
+def gravar_fala(caminho):
+    t = np.arange(TAXA * 2) / TAXA
+    tom = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    audio = AudioSegment.silent(1000, frame_rate=TAXA).set_sample_width(2) + \
+        AudioSegment(data=tom.tobytes(), sample_width=2, frame_rate=TAXA, channels=1)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    audio.export(str(caminho), format="wav")
+
+@pytest.fixture
+def argumentos(tmp_path):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({'cache_tamanho_max_mb': 0, 'processos_conversao': 0}), encoding='utf-8')
+    return ['--config', str(config), '--backend', 'fake', '--sem-manifesto', '-q']
+
+def test_codigo_0_quando_tudo_foi_transcrito(tmp_path, argumentos):
+    gravar_fala(tmp_path / "a.wav")
+    assert main([str(tmp_path / "a.wav")] + argumentos) == 0
+
+def test_codigo_1_quando_alguma_ou_nenhuma_entrada_tem_arquivos(tmp_path, argumentos):
+    gravar_fala(tmp_path / "a.wav")
+    assert main([str(tmp_path / "a.wav"), str(tmp_path / "nada.mp3")] + argumentos) == 1
+    assert main([str(tmp_path / "nada.mp3")] + argumentos) == 1
+
+def test_codigo_1_quando_algum_chunk_falhou(tmp_path, argumentos, monkeypatch, capsys):
+    import backends
+    import speech_recognition as sr
+
+    def falhar(self, *args):
+        raise sr.RequestError("serviço indisponível")
+
+    gravar_fala(tmp_path / "a.wav")
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({'cache_tamanho_max_mb': 0, 'processos_conversao': 0, 'backend_fallback': 'nenhum'}),
+                      encoding='utf-8')
+    monkeypatch.setattr(backends.BackendFake, 'reconhecer', falhar)
+    # O arquivo termina sem erro, mas com a transcrição incompleta
+    assert main([str(tmp_path / "a.wav")] + argumentos) == 1
+    resumo = json.loads(capsys.readouterr().out)
+    assert (resumo['com_erro'], resumo['chunks_com_erro']) == (0, 1)
+
+def test_codigo_2_para_conflito_de_saida(tmp_path, argumentos):
+    gravar_fala(tmp_path / "x" / "a.wav")
+    gravar_fala(tmp_path / "y" / "a.wav")
+    assert main([str(tmp_path / "x"), str(tmp_path / "y"), '-o', str(tmp_path / "saida")] + argumentos) == 2
@@ -0,0 +1,103 @@
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Pilha de áudio que só deve ser carregada quando a primeira transcrição começa
+MODULOS_PESADOS = ('pydub', 'speech_recognition', 'numpy', 'transcriber', 'lote', 'cache_transcricao', 'backends')
+
+def test_importar_interface_nao_carrega_a_pilha_de_audio():
+    # Processo novo: outros testes já importaram esses módulos neste
+    codigo = f"import sys, interface; print(','.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))"
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert resultado.stdout.strip() == ""
+
+def test_padroes_da_interface_partem_dos_do_lote():
+    import interface
+    from configuracao import CONFIG_LOTE_PADRAO
+
+    for chave, valor in CONFIG_LOTE_PADRAO.items():
+        assert interface.CONFIG_INTERFACE_PADRAO[chave] == valor
+    assert interface.config_transcricao == interface.CONFIG_INTERFACE_PADRAO
+
+class TextoFalso:
+    """O que inserir_linhas_log usa de um tk.Text: o texto termina com a quebra da última linha"""
+
+    def __init__(self):
+        self.conteudo = ""
+        self.insercoes = 0
+
+    def insert(self, indice, texto):
+        assert indice == "end"
+        self.conteudo += texto
+        self.insercoes += 1
+
+    def index(self, indice):
+        # "end-1c": logo depois do último caractere inserido
+        assert indice == "end-1c"
+        linhas = self.conteudo.split("\n")
+        return f"{len(linhas)}.{len(linhas[-1])}"
+
+    def delete(self, inicio, fim):
+        # Da linha 1 até o começo da linha fim
+        assert inicio == "1.0" and fim.endswith(".0")
+        linhas = self.conteudo.split("\n")
+        self.conteudo = "\n".join(linhas[int(fim.split(".")[0]) - 1:])
+
+    def see(self, indice):
+        pass
+
+class JanelaFalsa:
+    def __init__(self):
+        self.agendados = []
+
+    def after(self, ms, funcao):
+        self.agendados.append((ms, funcao))
+
+@pytest.fixture
+def interface_sem_tela(monkeypatch):
+    import interface
+    monkeypatch.setattr(interface, 'txt_saida', TextoFalso(), raising=False)
+    monkeypatch.setattr(interface, 'janela', JanelaFalsa(), raising=False)
+    monkeypatch.setattr(interface, 'fila_interface', interface.queue.Queue())
+    return interface
+
+def test_fila_esvaziada_na_ordem_com_as_linhas_juntas(interface_sem_tela):
+    interface = interface_sem_tela
+    ordem = []
+    for n in range(3):
+        interface.registrar_log(f"linha {n}")
+    interface.na_interface(lambda: ordem.append(interface.txt_saida.conteudo))
+    interface.registrar_log("linha 3")
+    interface.registrar_log("linha 4")
+
+    interface.processar_fila_interface()
+    # As linhas anteriores à chamada já estavam no log quando ela rodou
+    assert ordem == ["linha 0\nlinha 1\nlinha 2\n"]
+    assert interface.txt_saida.conteudo == "".join(f"linha {n}\n" for n in range(5))
+    assert interface.txt_saida.insercoes == 2
+    assert interface.fila_interface.empty()
+    assert interface.janela.agendados == [(interface.INTERVALO_FILA_MS, interface.processar_fila_interface)]
+
+def test_erro_numa_chamada_nao_para_a_leitura_da_fila(interface_sem_tela):
+    interface = interface_sem_tela
+    interface.na_interface(lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        interface.processar_fila_interface()
+    assert len(interface.janela.agendados) == 1
+
+def test_log_mantem_so_as_ultimas_linhas(interface_sem_tela, monkeypatch):
+    interface = interface_sem_tela
+    monkeypatch.setattr(interface, 'MAX_LINHAS_LOG', 10)
+    for n in range(7):
+        interface.registrar_log(f"linha {n}")
+    interface.processar_fila_interface()
+    assert interface.txt_saida.conteudo.count("\n") == 7
+
+    for n in range(7, 25):
+        interface.registrar_log(f"linha {n}")
+    interface.processar_fila_interface()
+    assert interface.txt_saida.conteudo == "".join(f"linha {n}\n" for n in range(15, 25))
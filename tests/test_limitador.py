@@ -0,0 +1,17 @@
+from limitador import LimitadorTaxa, obter_limitador
+
+def test_configurar_mantem_a_reducao_e_limita_as_fichas():
+    limitador = LimitadorTaxa(10, 0.01)
+    limitador.registrar_limite()
+    assert limitador.taxa == 5
+    limitador.configurar(20, 0.5)
+    assert (limitador.taxa_maxima, limitador.taxa, limitador.pausa_base) == (20, 5, 0.5)
+    limitador.configurar(2, 0.5)
+    assert (limitador.taxa, limitador.capacidade) == (2, 2)
+    assert limitador.tokens <= limitador.capacidade
+
+def test_obter_limitador_reaproveita_e_reconfigura():
+    primeiro = obter_limitador({'requisicoes_por_segundo': 8, 'pausa_entre_tentativas': 0.1}, "teste")
+    segundo = obter_limitador({'requisicoes_por_segundo': 3, 'pausa_entre_tentativas': 0.2}, "teste")
+    assert primeiro is segundo
+    assert (segundo.taxa_maxima, segundo.capacidade, segundo.pausa_base) == (3, 3, 0.2)
@@ -0,0 +1,81 @@
+from lista_virtual import ModeloListaArquivos
+
+TOTAL = 100000
+
+def modelo_grande():
+    modelo = ModeloListaArquivos()
+    modelo.definir([f"/gravacoes/pasta{n % 7}/Aula_{TOTAL - n:06d}.mp3" for n in range(TOTAL)])
+    return modelo
+
+def test_janela_fica_dentro_da_lista():
+    modelo = modelo_grande()
+    assert modelo.janela(0, 4) == (0, [0, 1, 2, 3, 4])
+    assert modelo.janela(50000, 4) == (50000, [50000, 50001, 50002, 50003, 50004])
+    # Rolar além do fim volta para a última janela cheia, sem a linha extra
+    assert modelo.janela(TOTAL + 10, 4) == (TOTAL - 4, [TOTAL - 4, TOTAL - 3, TOTAL - 2, TOTAL - 1])
+    assert modelo.janela(-3, 4)[0] == 0
+
+    pequeno = ModeloListaArquivos()
+    assert pequeno.janela(5, 4) == (0, [])
+    pequeno.definir(["a.mp3", "b.mp3"])
+    assert pequeno.janela(1, 4) == (0, [0, 1])
+
+def test_sem_filtro_nem_ordenacao_nao_copia_a_lista():
+    modelo = modelo_grande()
+    visiveis = modelo.visiveis()
+    assert isinstance(visiveis, range) and len(visiveis) == TOTAL
+    # Estado não muda a ordem da seleção: a lista exibida não é recalculada
+    modelo.marcar_estado(modelo.arquivos[10], 'concluido')
+    assert modelo.visiveis() is visiveis
+
+def test_filtros_por_estado():
+    modelo = modelo_grande()
+    com_erro = set(range(0, TOTAL, 1000))
+    for posicao in com_erro:
+        modelo.marcar_estado(modelo.arquivos[posicao], 'erro')
+    modelo.marcar_estado(modelo.arquivos[1], 'transcrevendo')
+
+    modelo.configurar(filtro='Com erro')
+    assert list(modelo.visiveis()) == sorted(com_erro)
+    modelo.configurar(filtro='Em andamento')
+    assert list(modelo.visiveis()) == [1]
+    modelo.configurar(filtro='Pendentes')
+    assert len(modelo.visiveis()) == TOTAL - len(com_erro) - 1
+
+    # Com filtro por estado, uma mudança de estado tira o arquivo da lista exibida
+    modelo.marcar_estado(modelo.arquivos[2], 'convertendo')
+    assert 2 not in modelo.visiveis()
+    modelo.configurar(filtro='Todos')
+    assert len(modelo.visiveis()) == TOTAL
+
+def test_ordenacoes():
+    modelo = modelo_grande()
+    modelo.configurar(ordenacao='Nome')
+    # Nome do arquivo, sem a pasta: a última posição tem o menor número
+    assert modelo.visiveis()[:2] == [TOTAL - 1, TOTAL - 2]
+
+    modelo.configurar(ordenacao='Estado')
+    modelo.marcar_estado(modelo.arquivos[5], 'concluido')
+    modelo.marcar_estado(modelo.arquivos[7], 'erro')
+    modelo.marcar_estado(modelo.arquivos[3], 'transcrevendo')
+    visiveis = modelo.visiveis()
+    # Erros primeiro e concluídos no fim; dentro do mesmo estado, a ordem da seleção
+    assert visiveis[:4] == [7, 3, 0, 1]
+    assert visiveis[-1] == 5
+
+def test_arquivo_marcado_na_sua_posicao():
+    modelo = ModeloListaArquivos()
+    modelo.definir(["/a/um.mp3", "/b/dois.mp3", "/a/um.mp3", "/c/tres.wav"])
+    # Arquivo repetido: o estado vai para a primeira ocorrência
+    assert modelo.marcar_estado("/a/um.mp3", 'erro') == 0
+    assert modelo.marcar_estado("/c/tres.wav", 'concluido') == 3
+    assert modelo.marcar_estado("/nao/esta.mp3", 'erro') is None
+    assert [modelo.texto(posicao) for posicao in range(4)] == ["❌ um.mp3", "dois.mp3", "um.mp3", "✅ tres.wav"]
+
+    # Na lista filtrada, a linha exibida do arquivo é a sua posição em visiveis
+    modelo.configurar(filtro='Pendentes')
+    primeira, janela = modelo.janela(0, 4)
+    assert [modelo.texto(posicao) for posicao in janela] == ["dois.mp3", "um.mp3"]
+
+    modelo.adicionar(["/d/quatro.mp3"])
+    assert modelo.marcar_estado("/d/quatro.mp3", 'convertendo') == 4
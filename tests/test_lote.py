@@ -0,0 +1,107 @@
+import os
+import time
+import signal
+import threading
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from lote import executar_lote
+from configuracao import CONFIG_LOTE_PADRAO
+from saida import nome_arquivo_saida
+from checkpoint_lote import caminho_checkpoint
+from manifesto import ManifestoTranscricao
+
+TAXA = 16000
+
+def gravar_falas(caminho, quantidade):
+    """WAV com quantidade tons separados por silêncio: um chunk por tom"""
+    t = np.arange(int(TAXA * 1.5)) / TAXA
+    audio = AudioSegment.silent(1000, frame_rate=TAXA).set_sample_width(2)
+    for i in range(quantidade):
+        tom = (8000 * np.sin(2 * np.pi * (300 + 40 * i) * t)).astype(np.int16)
+        audio += AudioSegment(data=tom.tobytes(), sample_width=2, frame_rate=TAXA, channels=1)
+        audio += AudioSegment.silent(1000, frame_rate=TAXA).set_sample_width(2)
+    audio.export(str(caminho), format="wav")
+
+def test_interrupcao_nao_espera_os_arquivos_em_andamento(tmp_path):
+    latencia, chunks = 0.3, 6
+    arquivos = []
+    for nome in ("a.wav", "b.wav", "c.wav"):
+        gravar_falas(tmp_path / nome, chunks)
+        arquivos.append(str(tmp_path / nome))
+    config = dict(CONFIG_LOTE_PADRAO, backend='fake', backend_fallback='nenhum', latencia_fake=latencia,
+                  processos_conversao=0, arquivos_simultaneos=2, usar_manifesto=False, cache_tamanho_max_mb=0,
+                  pasta_saida=str(tmp_path / "saida"))
+
+    # Ctrl-C de verdade no meio do primeiro par de arquivos (cada um leva chunks * latencia = 1,8 s)
+    threading.Timer(0.8, os.kill, (os.getpid(), signal.SIGINT)).start()
+    inicio = time.perf_counter()
+    with pytest.raises(KeyboardInterrupt):
+        list(executar_lote(arquivos, config, lambda mensagem: None))
+    assert time.perf_counter() - inicio < 0.8 + 2 * latencia
+
+    # As threads do lote param no chunk em andamento, sem reconhecer o resto
+    for thread in threading.enumerate():
+        if thread.name.startswith("lote"):
+            thread.join(timeout=2 * latencia)
+            assert not thread.is_alive()
+    for arquivo in arquivos[:2]:
+        saida = nome_arquivo_saida(arquivo, config)
+        assert not os.path.exists(saida)
+        with open(caminho_checkpoint(saida), encoding='utf-8') as f:
+            assert 1 < sum(1 for _ in f) < chunks
+    assert not os.path.exists(caminho_checkpoint(nome_arquivo_saida(arquivos[2], config)))
+
+def test_arquivos_transcritos_entram_no_manifesto_com_o_hash_do_worker(tmp_path):
+    gravar_falas(tmp_path / "a.wav", 2)
+    arquivo = str(tmp_path / "a.wav")
+    config = dict(CONFIG_LOTE_PADRAO, backend='fake', backend_fallback='nenhum', processos_conversao=0,
+                  cache_tamanho_max_mb=0, arquivo_manifesto=str(tmp_path / "manifesto.sqlite3"))
+    primeira = list(executar_lote([arquivo], config, lambda mensagem: None))
+    assert [(resultado['erro'], resultado['pulado']) for resultado in primeira] == [(None, False)]
+    manifesto = ManifestoTranscricao(config['arquivo_manifesto'])
+    assert manifesto.atualizado(arquivo, config, primeira[0]['saida'])['chunks'] == 2
+    manifesto.fechar()
+
+def test_pool_de_conversao_divide_no_processo_e_da_o_mesmo_resultado(tmp_path, monkeypatch):
+    arquivos = []
+    for nome in ("a.wav", "b.wav"):
+        gravar_falas(tmp_path / nome, 3)
+        arquivos.append(str(tmp_path / nome))
+    config = dict(CONFIG_LOTE_PADRAO, backend='fake', backend_fallback='nenhum', usar_manifesto=False,
+                  cache_tamanho_max_mb=0, retomar_lote=False)
+
+    def transcricoes(processos):
+        config.update(processos_conversao=processos, pasta_saida=str(tmp_path / f"saida{processos}"))
+        resultados = sorted(executar_lote(arquivos, config, lambda mensagem: None), key=lambda r: r['indice'])
+        assert [resultado['erro'] for resultado in resultados] == [None, None]
+        textos = []
+        for resultado in resultados:
+            with open(resultado['saida'], encoding='utf-8') as f:
+                textos.append(f.read())
+        return textos
+
+    # A divisão roda no processo de conversão: a thread de reconhecimento não divide de novo
+    import transcriber
+    dividir = transcriber.segmentar_audio
+    chamadas = []
+    monkeypatch.setattr(transcriber, 'segmentar_audio', lambda *args: chamadas.append(1) or dividir(*args))
+    com_pool = transcricoes(2)
+    assert chamadas == []
+    assert transcricoes(0) == com_pool
+    assert len(chamadas) == 2
+
+def test_um_processo_de_conversao_nao_cria_pool(tmp_path, monkeypatch):
+    import lote
+    gravar_falas(tmp_path / "a.wav", 1)
+
+    def sem_pool(*args, **kwargs):
+        raise AssertionError("pool de processos criado com processos_conversao=1")
+
+    monkeypatch.setattr(lote, 'ProcessPoolExecutor', sem_pool)
+    config = dict(CONFIG_LOTE_PADRAO, backend='fake', backend_fallback='nenhum', processos_conversao=1,
+                  usar_manifesto=False, cache_tamanho_max_mb=0, pasta_saida=str(tmp_path / "saida"))
+    resultados = list(executar_lote([str(tmp_path / "a.wav")], config, lambda mensagem: None))
+    assert [resultado['erro'] for resultado in resultados] == [None]
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from manifesto import ManifestoTranscricao
+
+CONFIG = {'backend': 'fake'}
+
+def preparar(tmp_path):
+    arquivo = tmp_path / "a.wav"
+    arquivo.write_bytes(b"audio")
+    saida = tmp_path / "a_transcrito.txt"
+    saida.write_text("texto", encoding="utf-8")
+    return str(arquivo), str(saida), ManifestoTranscricao(str(tmp_path / "manifesto.sqlite3"))
+
+def test_registro_sem_erros_esta_atualizado(tmp_path):
+    arquivo, saida, manifesto = preparar(tmp_path)
+    manifesto.registrar(arquivo, CONFIG, saida, 3, 0)
+    assert manifesto.atualizado(arquivo, CONFIG, saida)['chunks'] == 3
+    manifesto.fechar()
+
+def test_transcricao_com_erros_nao_fica_atualizada(tmp_path):
+    arquivo, saida, manifesto = preparar(tmp_path)
+    manifesto.registrar(arquivo, CONFIG, saida, 3, 0)
+    # Nova transcrição com falhas substitui a anterior: o registro deixa de valer
+    manifesto.registrar(arquivo, CONFIG, saida, 5, 5)
+    assert manifesto.atualizado(arquivo, CONFIG, saida) is None
+    manifesto.fechar()
+
+def test_registro_antigo_com_erros_nao_esta_atualizado(tmp_path):
+    arquivo, saida, manifesto = preparar(tmp_path)
+    manifesto.registrar(arquivo, CONFIG, saida, 3, 0)
+    with manifesto._conexao:
+        manifesto._conexao.execute("UPDATE arquivos SET chunks_com_erro = 2")
+    assert manifesto.atualizado(arquivo, CONFIG, saida) is None
+    manifesto.fechar()
+
+def test_registro_com_identificacao_nao_le_o_arquivo(tmp_path, monkeypatch):
+    import manifesto as modulo
+    arquivo, saida, manifesto = preparar(tmp_path)
+    identificacao = modulo.identificar_arquivo(arquivo)
+
+    def ler(caminho):
+        raise AssertionError("o hash deveria vir do worker")
+
+    monkeypatch.setattr(modulo, 'hash_arquivo', ler)
+    manifesto.registrar(arquivo, CONFIG, saida, 2, 0, identificacao)
+    assert manifesto.atualizado(arquivo, CONFIG, saida)['chunks'] == 2
+    manifesto.fechar()
+
+def test_registro_que_termina_depois_de_fechar_e_descartado(tmp_path, monkeypatch):
+    import manifesto as modulo
+    arquivo, saida, manifesto = preparar(tmp_path)
+    lendo, liberar = threading.Event(), threading.Event()
+    identificar = modulo.identificar_arquivo
+
+    def identificar_devagar(caminho):
+        lendo.set()
+        liberar.wait(5)
+        return identificar(caminho)
+
+    # Lote interrompido: o manifesto é fechado enquanto um registro ainda calcula o hash
+    monkeypatch.setattr(modulo, 'identificar_arquivo', identificar_devagar)
+    with ThreadPoolExecutor(1) as pool:
+        futuro = pool.submit(manifesto.registrar, arquivo, CONFIG, saida, 3, 0)
+        assert lendo.wait(5)
+        manifesto.fechar()
+        liberar.set()
+        assert futuro.result() is None
+    manifesto.fechar()
+
+    reaberto = modulo.ManifestoTranscricao(str(tmp_path / "manifesto.sqlite3"))
+    assert reaberto.atualizado(arquivo, CONFIG, saida) is None
+    reaberto.fechar()
@@ -0,0 +1,72 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from perfil import Perfil, PerfilLote, caminho_trace, criar_perfil_lote
+
+def medir_em_outro_processo(deslocamento):
+    """Etapa medida com um perf_counter de outra origem, como o de outro processo pode ter"""
+    real = time.perf_counter
+    time.perf_counter = lambda: real() + deslocamento
+    perfil = Perfil("a.mp3")
+    inicio = time.time()
+    with perfil.etapa('decodificacao'):
+        time.sleep(0.05)
+    return inicio, perfil.eventos
+
+def lote_com_dois_arquivos():
+    perfil_lote = PerfilLote()
+    for nome in ("a.mp3", "b.mp3"):
+        perfil = perfil_lote.novo(nome)
+        with perfil.etapa('segmentacao'):
+            time.sleep(0.01)
+        for tentativa in (1, 2):
+            with perfil.etapa('reconhecimento', backend='fake', tentativa=tentativa):
+                pass
+        perfil_lote.concluir_arquivo(perfil, 0.5)
+    return perfil_lote
+
+def test_sem_arquivo_de_perfil_nao_mede():
+    assert criar_perfil_lote({}) is None
+    assert isinstance(criar_perfil_lote({'arquivo_perfil': "perfil.json"}), PerfilLote)
+
+def test_json_com_totais_do_lote_e_de_cada_arquivo(tmp_path):
+    caminho, trace = lote_com_dois_arquivos().exportar(str(tmp_path / "saida" / "perfil.json"))
+    assert trace == caminho_trace(caminho) == str(tmp_path / "saida" / "perfil.trace.json")
+
+    with open(caminho, encoding='utf-8') as f:
+        dados = json.load(f)
+    assert dados['etapas']['reconhecimento']['chamadas'] == 4
+    assert dados['etapas']['segmentacao']['tempo'] >= 0.02
+    assert [arquivo['arquivo'] for arquivo in dados['arquivos']] == ["a.mp3", "b.mp3"]
+    assert all(arquivo['tempo'] == 0.5 for arquivo in dados['arquivos'])
+    assert dados['arquivos'][0]['etapas']['reconhecimento']['chamadas'] == 2
+    assert dados['tempo_total'] >= 0.02
+
+def test_trace_com_um_evento_por_etapa(tmp_path):
+    _, trace = lote_com_dois_arquivos().exportar(str(tmp_path / "perfil.json"))
+    with open(trace, encoding='utf-8') as f:
+        eventos = json.load(f)['traceEvents']
+    etapas = [evento for evento in eventos if evento['ph'] == 'X']
+    assert [evento['name'] for evento in etapas] == ["segmentacao", "reconhecimento", "reconhecimento"] * 2
+    assert all(0 <= evento['ts'] < 5e6 for evento in etapas)
+    # Eventos do mesmo arquivo em sequência, sem sobreposição
+    assert etapas[1]['ts'] >= etapas[0]['ts'] + etapas[0]['dur']
+    assert etapas[2]['args'] == {'arquivo': "a.mp3", 'cpu_ms': etapas[2]['args']['cpu_ms'], 'backend': 'fake', 'tentativa': 2}
+    nomes = [evento for evento in eventos if evento['ph'] == 'M']
+    assert [evento['args']['name'] for evento in nomes] == ["MainThread"]
+
+def test_trace_alinha_os_eventos_de_outro_processo(tmp_path):
+    perfil_lote = PerfilLote()
+    perfil = perfil_lote.novo("a.mp3")
+    with ProcessPoolExecutor(1) as executor:
+        inicio, eventos = executor.submit(medir_em_outro_processo, 1000.0).result()
+    perfil.incorporar(eventos)
+    with perfil.etapa('reconhecimento'):
+        pass
+
+    decodificacao, reconhecimento = [evento for evento in perfil_lote.dados_trace()['traceEvents'] if evento['ph'] == 'X']
+    # No relógio do lote, a etapa do outro processo começa quando começou de fato, e antes do reconhecimento
+    assert abs(decodificacao['ts'] - (inicio - perfil_lote.inicio) * 1e6) < 20000
+    assert decodificacao['ts'] + decodificacao['dur'] <= reconhecimento['ts']
+    assert decodificacao['pid'] != reconhecimento['pid']
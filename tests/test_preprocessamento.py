@@ -0,0 +1,70 @@
+import numpy as np
+from pydub import AudioSegment
+
+import preprocessamento
+from preprocessamento import coeficientes_passa_faixa, filtrar_fft, preprocessar_audio
+
+CONFIG = {'sample_rate': 16000, 'filtro_freq_baixa': 80, 'filtro_freq_alta': 8000}
+
+def resposta_db(coeficientes, taxa, frequencias):
+    """Ganho do filtro em dB nas frequências pedidas"""
+    pontos = 1 << 20
+    ganho = np.abs(np.fft.rfft(coeficientes, pontos))
+    indices = np.round(np.asarray(frequencias) * pontos / taxa).astype(int)
+    return 20 * np.log10(np.maximum(ganho[indices], 1e-12))
+
+def tons(taxa, duracao_s, componentes, dc=0.0):
+    t = np.arange(int(taxa * duracao_s)) / taxa
+    return dc + sum(amplitude * np.sin(2 * np.pi * frequencia * t) for frequencia, amplitude in componentes)
+
+def test_rejeita_abaixo_do_corte_e_passa_a_faixa_de_voz():
+    coeficientes = coeficientes_passa_faixa(16000, 80, 8000)
+    dc, hz20, corte = resposta_db(coeficientes, 16000, [0, 20, 80])
+    assert dc < -80 and hz20 < -80
+    assert abs(corte + 6) < 0.5
+    faixa = resposta_db(coeficientes, 16000, np.arange(160, 7501, 10))
+    assert np.abs(faixa).max() < 0.01
+
+    # A 44,1 kHz o lado alto também corta: -6 dB em 8 kHz e rejeição bem acima
+    coeficientes = coeficientes_passa_faixa(44100, 80, 8000)
+    passa, corte_alto, rejeitado = resposta_db(coeficientes, 44100, [1000, 8000, 12000])
+    assert abs(passa) < 0.01 and abs(corte_alto + 6) < 0.5 and rejeitado < -80
+
+def test_sem_limites_validos_nao_filtra():
+    assert coeficientes_passa_faixa(16000, 0, 8000) is None
+    assert coeficientes_passa_faixa(16000, 0, 0) is None
+
+def test_filtro_remove_dc_e_graves_sem_atrasar_a_voz():
+    taxa = 16000
+    voz = tons(taxa, 3, [(1000, 4000)])
+    filtrado = filtrar_fft(tons(taxa, 3, [(20, 4000), (1000, 4000)], dc=3000), coeficientes_passa_faixa(taxa, 80, 8000))
+    assert len(filtrado) == len(voz)
+    # Longe das bordas (meio filtro de cada lado) sobra só o tom de 1 kHz, na mesma fase
+    miolo = slice(taxa // 2, -taxa // 2)
+    assert abs(filtrado[miolo].mean()) < 1
+    assert np.abs(filtrado[miolo] - voz[miolo]).max() < 4000 * 0.01
+
+def test_blocos_da_fft_igual_a_convolucao_direta(monkeypatch):
+    # Blocos pequenos: o overlap-add precisa somar as caudas de vários blocos
+    monkeypatch.setattr(preprocessamento, 'AMOSTRAS_POR_BLOCO', 1000)
+    coeficientes = coeficientes_passa_faixa(16000, 80, 8000)
+    amostras = np.random.default_rng(0).integers(-20000, 20000, 10000).astype(np.int16)
+    atraso = (len(coeficientes) - 1) // 2
+    esperado = np.convolve(amostras.astype(np.float64), coeficientes)[atraso:atraso + len(amostras)]
+    assert np.abs(filtrar_fft(amostras, coeficientes) - esperado).max() < 0.05
+
+def test_audio_vazio_e_silencioso():
+    vazio = preprocessar_audio(AudioSegment.empty(), CONFIG)
+    assert len(vazio.raw_data) == 0
+
+    silencio = preprocessar_audio(AudioSegment.silent(1000, frame_rate=44100), CONFIG)
+    assert (silencio.frame_rate, silencio.channels, silencio.sample_width) == (16000, 1, 2)
+    assert len(silencio.raw_data) == 16000 * 2
+    assert not np.frombuffer(silencio.raw_data, dtype=np.int16).any()
+
+def test_normaliza_o_arquivo_inteiro_uma_vez():
+    amostras = tons(16000, 2, [(440, 1000)]).astype(np.int16)
+    audio = AudioSegment(data=amostras.tobytes(), sample_width=2, frame_rate=16000, channels=1)
+    saida = np.frombuffer(preprocessar_audio(audio, CONFIG).raw_data, dtype=np.int16)
+    # Pico 0,1 dB abaixo do máximo, como AudioSegment.normalize
+    assert abs(np.abs(saida).max() - 32768 * 10 ** (-0.1 / 20)) < 2
@@ -0,0 +1,93 @@
+import os
+import json
+
+from saida import (EscritorTexto, EscritorSrt, EscritorVtt, EscritorJsonl, SaidaTranscricao,
+                   caminho_parcial, formatar_tempo, TEXTO_INAUDIVEL)
+
+RESULTADOS = [
+    {'texto': "bom dia", 'inicio_ms': 1000, 'fim_ms': 3500, 'backend': 'fake'},
+    {'texto': "[Erro na transcrição]", 'inicio_ms': 3500, 'fim_ms': 5000, 'backend': 'fake'},
+    {'texto': TEXTO_INAUDIVEL, 'inicio_ms': 5000, 'fim_ms': 6000, 'backend': None},
+    {'texto': " tudo bem ", 'inicio_ms': 3723004, 'fim_ms': 3725000, 'backend': 'fake', 'timestamp': "62:03"},
+]
+
+def escrever(classe, caminho):
+    escritor = classe(str(caminho)).abrir()
+    for resultado in RESULTADOS:
+        escritor.adicionar(resultado)
+    escritor.concluir()
+    return caminho.read_text(encoding="utf-8")
+
+def test_texto_corrido_ou_uma_linha_por_timestamp(tmp_path):
+    escritor = EscritorTexto(str(tmp_path / "a.txt")).abrir()
+    for texto in (" bom dia", "tudo bem ", " "):
+        escritor.adicionar({'texto': texto})
+    escritor.concluir()
+    assert (tmp_path / "a.txt").read_text(encoding="utf-8") == "bom dia tudo bem"
+
+    escritor = EscritorTexto(str(tmp_path / "b.txt")).abrir()
+    escritor.adicionar({'texto': "bom dia", 'timestamp': "00:01"})
+    escritor.adicionar({'texto': "tudo bem", 'timestamp': "62:03"})
+    escritor.concluir()
+    assert (tmp_path / "b.txt").read_text(encoding="utf-8") == "[00:01] bom dia\n[62:03] tudo bem"
+
+def test_parcial_so_vira_arquivo_final_na_conclusao(tmp_path):
+    caminho = tmp_path / "a.txt"
+    caminho.write_text("transcrição anterior", encoding="utf-8")
+    escritor = EscritorTexto(str(caminho), intervalo_flush=0).abrir()
+    escritor.adicionar({'texto': "bom dia"})
+    # Antes da conclusão o final anterior continua intacto e o novo está só no parcial
+    assert caminho.read_text(encoding="utf-8") == "transcrição anterior"
+    assert (tmp_path / "a.txt.parcial").read_text(encoding="utf-8") == "bom dia"
+
+    escritor.concluir()
+    assert not os.path.exists(caminho_parcial(str(caminho)))
+    assert caminho.read_text(encoding="utf-8") == "bom dia"
+
+def test_fechar_sem_concluir_mantem_o_parcial(tmp_path):
+    caminho = tmp_path / "a.txt"
+    escritor = EscritorTexto(str(caminho), intervalo_flush=0).abrir()
+    escritor.adicionar({'texto': "bom dia"})
+    escritor.fechar()
+    assert not caminho.exists()
+    assert (tmp_path / "a.txt.parcial").read_text(encoding="utf-8") == "bom dia"
+
+def test_formatar_tempo():
+    assert formatar_tempo(1000) == "00:00:01.000"
+    assert formatar_tempo(1000, ",") == "00:00:01,000"
+    assert formatar_tempo(3723004.9) == "01:02:03.004"
+
+def test_srt_usa_virgula_e_numera_so_os_blocos_com_texto(tmp_path):
+    assert escrever(EscritorSrt, tmp_path / "a.srt") == (
+        "1\n00:00:01,000 --> 00:00:03,500\nbom dia\n\n"
+        "2\n01:02:03,004 --> 01:02:05,000\ntudo bem\n\n"
+    )
+
+def test_vtt_tem_cabecalho_e_usa_ponto(tmp_path):
+    assert escrever(EscritorVtt, tmp_path / "a.vtt") == (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:03.500\nbom dia\n\n"
+        "01:02:03.004 --> 01:02:05.000\ntudo bem\n\n"
+    )
+
+def test_jsonl_um_registro_por_chunk_com_erro_marcado(tmp_path):
+    linhas = escrever(EscritorJsonl, tmp_path / "a.jsonl").splitlines()
+    registros = [json.loads(linha) for linha in linhas]
+    assert [registro['indice'] for registro in registros] == [0, 1, 2, 3]
+    assert [registro['erro'] for registro in registros] == [False, True, True, False]
+    assert registros[2]['backend'] is None
+    assert 'timestamp' not in registros[3]
+
+def test_todos_os_formatos_concluidos_juntos(tmp_path):
+    caminhos = {'txt': str(tmp_path / "a.txt"), 'srt': str(tmp_path / "a.srt")}
+    (tmp_path / "a.srt").write_text("legenda anterior", encoding="utf-8")
+    saida = SaidaTranscricao(caminhos).abrir()
+    saida.adicionar(RESULTADOS[0])
+    assert (tmp_path / "a.srt").read_text(encoding="utf-8") == "legenda anterior"
+    assert not (tmp_path / "a.txt").exists()
+
+    saida.concluir()
+    for caminho in caminhos.values():
+        assert not os.path.exists(caminho_parcial(caminho))
+    assert (tmp_path / "a.txt").read_text(encoding="utf-8") == "bom dia"
+    assert (tmp_path / "a.srt").read_text(encoding="utf-8").startswith("1\n00:00:01,000 --> ")
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from pydub import AudioSegment
+from pydub.silence import split_on_silence, detect_silence
+
+from segmentacao import detectar_segmentos, detectar_silencio, segmentar_stream
+
+TAXA = 16000
+MIN_SILENCE_LEN = 300
+SILENCE_THRESH_OFFSET = -12
+
+def tom(duracao_ms, frequencia=440, amplitude=8000):
+    t = np.arange(int(TAXA * duracao_ms / 1000)) / TAXA
+    amostras = (amplitude * np.sin(2 * np.pi * frequencia * t)).astype(np.int16)
+    return AudioSegment(data=amostras.tobytes(), sample_width=2, frame_rate=TAXA, channels=1)
+
+def silencio(duracao_ms, ruido=0):
+    amostras = np.random.default_rng(duracao_ms).normal(0, ruido, int(TAXA * duracao_ms / 1000)) if ruido else \
+        np.zeros(int(TAXA * duracao_ms / 1000))
+    return AudioSegment(data=amostras.astype(np.int16).tobytes(), sample_width=2, frame_rate=TAXA, channels=1)
+
+CLIPES = {
+    'tom_e_silencio': lambda: tom(600) + silencio(500) + tom(400, 700) + silencio(350, 30) + tom(800, 300),
+    'silencio_no_inicio_e_no_fim': lambda: silencio(700) + tom(500) + silencio(400) + tom(600, 500) + silencio(900),
+    'so_silencio': lambda: silencio(1200),
+    'menor_que_min_silence_len': lambda: tom(120) + silencio(100),
+    'pausas_curtas': lambda: tom(500) + silencio(200) + tom(500, 600) + silencio(310) + tom(300, 800),
+}
+
+@pytest.mark.parametrize("nome", sorted(CLIPES))
+@pytest.mark.parametrize("keep_silence", [0, 100, 400, True])
+def test_fronteiras_iguais_ao_split_on_silence(nome, keep_silence):
+    audio = CLIPES[nome]()
+    esperado = split_on_silence(audio, min_silence_len=MIN_SILENCE_LEN,
+                                silence_thresh=audio.dBFS + SILENCE_THRESH_OFFSET, keep_silence=keep_silence)
+    segmentos = detectar_segmentos(audio, MIN_SILENCE_LEN, SILENCE_THRESH_OFFSET, keep_silence)
+    assert len(segmentos) == len(esperado)
+    for (inicio, fim), chunk in zip(segmentos, esperado):
+        assert audio[inicio:fim].raw_data == chunk.raw_data
+
+@pytest.mark.parametrize("nome", sorted(CLIPES))
+def test_silencio_igual_ao_detect_silence(nome):
+    audio = CLIPES[nome]()
+    limiar = audio.dBFS + SILENCE_THRESH_OFFSET
+    assert detectar_silencio(audio, MIN_SILENCE_LEN, limiar) == \
+        detect_silence(audio, min_silence_len=MIN_SILENCE_LEN, silence_thresh=limiar)
+
+def blocos(audio, bloco_ms):
+    tamanho = int(TAXA * bloco_ms / 1000) * 2
+    dados = audio.raw_data
+    return (dados[i:i + tamanho] for i in range(0, len(dados), tamanho))
+
+@pytest.mark.parametrize("bloco_ms", [50, 333, 1000, 4000])
+@pytest.mark.parametrize("keep_silence", [0, 100, 400])
+def test_stream_em_blocos_igual_ao_arquivo_inteiro(bloco_ms, keep_silence):
+    # Silêncio digital e limiar bem abaixo da fala: as fronteiras não dependem do dBFS parcial do stream
+    audio = silencio(800) + tom(900) + silencio(1200) + tom(600, 700) + silencio(450) + tom(1500, 300) + \
+        silencio(2500) + tom(700, 500) + silencio(600)
+    esperado = detectar_segmentos(audio, MIN_SILENCE_LEN, -70, keep_silence)
+    recebidos = list(segmentar_stream(blocos(audio, bloco_ms), TAXA, MIN_SILENCE_LEN, -70, keep_silence,
+                                      janela_max_ms=60000, chunk_length=10000))
+    assert [(inicio, fim) for inicio, fim, _ in recebidos] == esperado
+    for inicio, fim, trecho in recebidos:
+        assert trecho.raw_data == audio[inicio:fim].raw_data
+
+def test_stream_corta_fala_continua_na_janela_maxima():
+    audio = tom(5000) + silencio(1000)
+    recebidos = list(segmentar_stream(blocos(audio, 250), TAXA, MIN_SILENCE_LEN, -70, 0,
+                                      janela_max_ms=2000, chunk_length=1500))
+    assert [(inicio, fim) for inicio, fim, _ in recebidos][:3] == [(0, 1500), (1500, 3000), (3000, 4500)]
+    assert recebidos[-1][1] == 5000
+    for inicio, fim, trecho in recebidos:
+        assert trecho.raw_data == audio[inicio:fim].raw_data
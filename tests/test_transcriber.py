@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import threading
+
+import numpy as np
+import pytest
+import speech_recognition as sr
+from pydub import AudioSegment
+
+import backends
+from cache_transcricao import obter_cache
+from segmentacao import energia_acumulada, nivel_ruido
+from transcriber import transcribe_audio, indexar_chunks, executar_em_ordem, ler_blocos_ffmpeg, format_timestamp
+from configuracao import CONFIG_PADRAO
+
+TAXA = 16000
+
+def tom(duracao_ms, frequencia=440, amplitude=8000):
+    t = np.arange(int(TAXA * duracao_ms / 1000)) / TAXA
+    amostras = (amplitude * np.sin(2 * np.pi * frequencia * t)).astype(np.int16)
+    return AudioSegment(data=amostras.tobytes(), sample_width=2, frame_rate=TAXA, channels=1)
+
+def silencio(duracao_ms):
+    return AudioSegment.silent(duracao_ms, frame_rate=TAXA).set_sample_width(2)
+
+def falas(quantidade, duracao_ms=1500, pausa_ms=1000):
+    """Tons de frequências diferentes separados por silêncio: um chunk por tom"""
+    audio = silencio(pausa_ms)
+    for i in range(quantidade):
+        audio += tom(duracao_ms, 300 + 40 * i) + silencio(pausa_ms)
+    return audio
+
+@pytest.fixture
+def config(tmp_path):
+    return dict(CONFIG_PADRAO, backend='fake', backend_fallback='nenhum', metadados_chunk=True,
+                cache_tamanho_max_mb=0, pasta_cache=str(tmp_path / "cache"), requisicoes_por_segundo=1000)
+
+def test_texto_do_fallback_nao_entra_no_cache(config, monkeypatch):
+    chamadas = []
+    falhar = [True]
+
+    def google(self, audio_data, recognizer, idioma):
+        chamadas.append(1)
+        if falhar[0]:
+            raise sr.RequestError("sem rede")
+        return "texto do google"
+
+    monkeypatch.setattr(backends.BackendGoogle, 'reconhecer', google)
+    config.update(backend='google', backend_fallback='fake', cache_tamanho_max_mb=10)
+    audio = falas(3)
+
+    primeira = list(transcribe_audio(audio, ".", config=config))
+    assert [resultado['backend'] for resultado in primeira] == ['fake'] * 3
+
+    # Com o serviço de volta, o principal é consultado de novo e só então o cache é preenchido
+    falhar[0] = False
+    chamadas.clear()
+    segunda = list(transcribe_audio(audio, ".", config=config))
+    assert len(chamadas) == 3
+    assert [resultado['texto'] for resultado in segunda] == ["texto do google"] * 3
+
+    chamadas.clear()
+    terceira = list(transcribe_audio(audio, ".", config=config))
+    assert chamadas == []
+    assert [(resultado['texto'], resultado['backend'], resultado['tentativas']) for resultado in terceira] == \
+        [("texto do google", 'google', 0)] * 3
+
+def test_acerto_no_cache_informa_o_backend_que_gerou_o_texto(config):
+    config.update(cache_tamanho_max_mb=10)
+    audio = falas(2)
+    list(transcribe_audio(audio, ".", config=config))
+    # Entrada gravada por outro backend com a mesma chave: o JSON Lines deve mostrar quem gerou o texto
+    cache = obter_cache(config)
+    for caminho, _, _ in list(cache._entradas()):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write('{"texto": "do sphinx", "backend": "sphinx"}')
+    resultados = list(transcribe_audio(audio, ".", config=config))
+    assert [(resultado['texto'], resultado['backend'], resultado['tentativas']) for resultado in resultados] == \
+        [("do sphinx", 'sphinx', 0)] * 2
+
+def test_ruido_estimado_so_nos_silencios(config):
+    # Fala com ruído de fundo de amplitude 100 (RMS ~70) nas pausas
+    ruido = np.random.default_rng(0).normal(0, 70, TAXA * 10).astype(np.int16)
+    audio = AudioSegment(data=ruido.tobytes(), sample_width=2, frame_rate=TAXA, channels=1)
+    audio = audio.overlay(tom(2000), position=2000).overlay(tom(2000, 600), position=6000)
+    energia = energia_acumulada(audio)
+    segmentos, por_silencio = indexar_chunks(audio, config, energia=energia)
+    assert por_silencio
+    assert 50 < nivel_ruido(audio, segmentos, energia) < 100
+
+def test_fala_baixa_acima_do_ruido_vai_ao_backend_por_padrao(config, monkeypatch):
+    # Ruído de fundo (RMS ~360), uma fala normal e uma fala baixa (RMS ~495 com o ruído): acima do
+    # limiar de silêncio, mas abaixo de ruído * dynamic_energy_ratio (~540)
+    ruido = np.random.default_rng(1).normal(0, 360, TAXA * 20)
+    audio = AudioSegment(data=ruido.astype(np.int16).tobytes(), sample_width=2, frame_rate=TAXA, channels=1)
+    audio = audio.overlay(tom(2000), position=4000).overlay(tom(2000, 300, amplitude=480), position=12000)
+
+    chamadas = []
+    reconhecer = backends.BackendFake.reconhecer
+    monkeypatch.setattr(backends.BackendFake, 'reconhecer',
+                        lambda self, *args: chamadas.append(1) or reconhecer(self, *args))
+    resultados = list(transcribe_audio(audio, ".", config=config))
+    assert [resultado['texto'].startswith("fala") for resultado in resultados] == [True, True]
+    assert len(chamadas) == 2
+
+    # Só com pular_chunks_de_ruido a fala baixa é tratada como ruído e não vai ao backend
+    chamadas.clear()
+    resultados = list(transcribe_audio(audio, ".", config=dict(config, pular_chunks_de_ruido=True)))
+    assert resultados[0]['texto'].startswith("fala")
+    assert (resultados[1]['texto'], resultados[1]['backend']) == ("[Áudio inaudível]", None)
+    assert len(chamadas) == 1
+
+def test_sem_estimativa_de_ruido_na_divisao_por_tempo(config):
+    # Tom contínuo de 30,5 s: divisão por tempo, e o último meio segundo (fala) fica de fora
+    mensagens = []
+    audio = tom(30500)
+    segmentos, por_silencio = indexar_chunks(audio, config)
+    assert not por_silencio and segmentos[-1][1] == 30000
+    list(transcribe_audio(audio, ".", mensagens.append, config=config))
+    assert not any("Ruído de fundo" in mensagem for mensagem in mensagens)
+
+def test_executar_em_ordem_preserva_a_ordem_com_pendentes_limitados():
+    em_andamento = []
+    maximo = [0]
+    lock = threading.Lock()
+
+    def funcao(tarefa):
+        with lock:
+            em_andamento.append(tarefa)
+            maximo[0] = max(maximo[0], len(em_andamento))
+        # Tarefas posteriores terminam antes das anteriores
+        time.sleep(0.02 * (3 - tarefa % 4))
+        with lock:
+            em_andamento.remove(tarefa)
+        return tarefa * 10
+
+    assert list(executar_em_ordem(funcao, range(20), max_workers=4)) == [tarefa * 10 for tarefa in range(20)]
+    assert maximo[0] == 4
+
+def test_reconhecimento_concorrente_mantem_a_ordem_e_reduz_o_tempo(config):
+    latencia, chunks, workers = 0.2, 8, 4
+    config.update(latencia_fake=latencia)
+    audio = falas(chunks)
+    sequencial = list(transcribe_audio(audio, ".", config=config))
+
+    config.update(max_workers=workers)
+    inicio = time.perf_counter()
+    concorrente = list(transcribe_audio(audio, ".", config=config))
+    tempo = time.perf_counter() - inicio
+
+    assert len(concorrente) == chunks
+    assert [resultado['inicio_ms'] for resultado in concorrente] == sorted(resultado['inicio_ms'] for resultado in concorrente)
+    assert [resultado['texto'] for resultado in concorrente] == [resultado['texto'] for resultado in sequencial]
+    # Serial: chunks * latencia = 1,6 s; com 4 workers, cerca de 0,4 s
+    assert tempo < chunks * latencia / 2
+
+# Substituto do ffmpeg: grava o PID, escreve o log no stderr e PCM no stdout
+FFMPEG_FALSO = """#!{python}
+import os, sys
+open({pid!r}, "w").write(str(os.getpid()))
+sys.stderr.write("x" * {bytes_erro} + "entrada corrompida\\n")
+sys.stderr.flush()
+bloco = b"\\x00\\x01" * 1600
+for _ in range({blocos}):
+    sys.stdout.buffer.write(bloco)
+sys.stdout.flush()
+sys.exit({codigo})
+"""
+
+@pytest.fixture
+def ffmpeg_falso(tmp_path, monkeypatch):
+    def criar(bytes_erro=0, blocos=10, codigo=0):
+        script = tmp_path / "ffmpeg"
+        script.write_text(FFMPEG_FALSO.format(python=sys.executable, pid=str(tmp_path / "pid"),
+                                              bytes_erro=bytes_erro, blocos=blocos, codigo=codigo))
+        script.chmod(0o755)
+        monkeypatch.setattr(AudioSegment, 'converter', str(script))
+        return tmp_path / "pid"
+    return criar
+
+def leitores_ativos():
+    return [thread for thread in threading.enumerate() if thread.name == "leitor_ffmpeg"]
+
+@pytest.mark.skipif(sys.platform == "win32", reason="ffmpeg falso é um script com shebang")
+def test_ffmpeg_com_erro_e_log_grande_nao_trava(ffmpeg_falso):
+    # Mais que o buffer de 64 KB de um pipe no stderr antes de terminar com erro
+    ffmpeg_falso(bytes_erro=200000, blocos=20, codigo=1)
+    config = dict(CONFIG_PADRAO, bloco_streaming_ms=100)
+    recebidos = []
+    with pytest.raises(Exception, match="entrada corrompida"):
+        for bloco in ler_blocos_ffmpeg("entrada.mp4", config):
+            recebidos.append(bloco)
+    assert sum(len(bloco) for bloco in recebidos) == 20 * 3200
+    assert not leitores_ativos()
+
+@pytest.mark.skipif(sys.platform == "win32", reason="ffmpeg falso é um script com shebang")
+def test_fechar_o_gerador_encerra_o_ffmpeg_e_o_leitor(ffmpeg_falso):
+    # Muito mais áudio do que a fila comporta: o ffmpeg fica bloqueado escrevendo no stdout
+    pid = ffmpeg_falso(blocos=100000)
+    config = dict(CONFIG_PADRAO, bloco_streaming_ms=100, janela_streaming_ms=500)
+    blocos = ler_blocos_ffmpeg("entrada.mp4", config)
+    assert len(next(blocos)) == 3200
+    blocos.close()
+    assert not leitores_ativos()
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid.read_text()), 0)
+
+def test_format_timestamp():
+    assert format_timestamp(1000) == "00:01"
+    assert format_timestamp(3723004) == "62:03"
+    assert format_timestamp(1000, completo=True) == "00:00:01.000"
+    assert format_timestamp(3723004.9, completo=True) == "01:02:03.004"
+
+def test_timestamp_completo_no_inicio_real_de_cada_chunk(config):
+    config = dict(config, incluir_timestamp=True, timestamp_completo=True)
+    resultados = list(transcribe_audio(falas(3), ".", config=config))
+    assert len(resultados) == 3
+    # Tons a cada 2,5 s: o início de cada chunk avança 2,5 s (não o tamanho dos chunks anteriores)
+    assert [resultado['timestamp'] for resultado in resultados] == ["00:00:00.623", "00:00:03.123", "00:00:05.623"]
+    assert all(resultado['timestamp'] == format_timestamp(resultado['inicio_ms'], True) for resultado in resultados)
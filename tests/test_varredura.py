@@ -0,0 +1,34 @@
+import os
+
+from varredura import extensoes_configuradas, listar_arquivos_audio, varrer_em_lotes
+
+def criar(tmp_path, *nomes):
+    for nome in nomes:
+        caminho = tmp_path / nome
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_bytes(b"")
+
+def nomes(caminhos, tmp_path):
+    return [os.path.relpath(caminho, tmp_path).replace(os.sep, "/") for caminho in caminhos]
+
+def test_extensoes_sem_diferenciar_maiusculas(tmp_path):
+    criar(tmp_path, "a.MP3", "b.Wav", "c.mp4", "d.txt", "e.mp3.bak")
+    extensoes = extensoes_configuradas({'extensoes_audio': " .MP3, wav,*.mp3"})
+    assert extensoes == (".mp3", ".wav")
+    assert nomes(listar_arquivos_audio(str(tmp_path), extensoes), tmp_path) == ["a.MP3", "b.Wav"]
+
+def test_wav_convertido_nao_e_entrada(tmp_path):
+    criar(tmp_path, "aula.mp4", "aula_convertido.wav", "AULA2_CONVERTIDO.WAV", "sub/fala.wav")
+    extensoes = extensoes_configuradas({})
+    assert nomes(listar_arquivos_audio(str(tmp_path), extensoes), tmp_path) == ["aula.mp4", "sub/fala.wav"]
+
+def test_varrer_em_lotes_agrupa_na_ordem_da_varredura(tmp_path):
+    criar(tmp_path, *[f"{n:02d}.mp3" for n in range(5)], "sub/05.mp3", "sub/06.mp3")
+    extensoes = extensoes_configuradas({})
+
+    lotes = [nomes(lote, tmp_path) for lote in varrer_em_lotes(str(tmp_path), extensoes, tamanho_lote=3)]
+    assert lotes == [["00.mp3", "01.mp3", "02.mp3"], ["03.mp3", "04.mp3", "sub/05.mp3"], ["sub/06.mp3"]]
+
+    # Sem recursão, e com um número de arquivos múltiplo do lote: nenhum lote vazio no fim
+    lotes = list(varrer_em_lotes(str(tmp_path), extensoes, recursivo=False, tamanho_lote=5))
+    assert [len(lote) for lote in lotes] == [5]
@@ -0,0 +1,47 @@
+import pytest
+
+import verificacao
+from verificacao import analisar_transcricao, verificar_arquivo, CARACTERES_ACENTUADOS
+
+TRANSCRICOES = {
+    'vazia': "",
+    'so_quebras': "\n \n\t\n",
+    'texto_corrido': "bom dia a todos " * 40,
+    'com_timestamp': "[00:01] bom dia\n[00:05] [Erro de conexão: timeout]\n\n[00:09] ação e reação\n",
+    'erro_no_fim_sem_quebra': "linha boa\noutra linha\n[ERRO no último chunk]",
+    'timestamp_depois_da_decima': "\n" * 12 + "[00:30] tarde demais",
+    'estranhos': "texto ½ com ™ símbolos ☃ e acentos ç ã\n" * 3,
+}
+
+def analise_em_memoria(conteudo):
+    """Lógica original da verificação, com o arquivo inteiro em memória"""
+    linhas = conteudo.split('\n')
+    return {
+        'caracteres': len(conteudo),
+        'estranhos': sum(1 for char in conteudo if ord(char) > 127 and char not in CARACTERES_ACENTUADOS),
+        'linhas': len([linha for linha in linhas if linha.strip()]),
+        'linhas_com_erro': sum(1 for linha in linhas if '[ERRO' in linha or '[Erro' in linha),
+        'timestamp_encontrado': any('[' in linha and ']' in linha for linha in linhas[:10]),
+    }
+
+@pytest.mark.parametrize('caracteres_por_bloco', [1, 2, 3, 7, 64, verificacao.CARACTERES_POR_BLOCO])
+def test_leitura_em_blocos_igual_a_leitura_inteira(tmp_path, monkeypatch, caracteres_por_bloco):
+    monkeypatch.setattr(verificacao, 'CARACTERES_POR_BLOCO', caracteres_por_bloco)
+    for nome, conteudo in TRANSCRICOES.items():
+        caminho = tmp_path / f"{nome}.txt"
+        caminho.write_text(conteudo, encoding='utf-8')
+        assert analisar_transcricao(str(caminho)) == analise_em_memoria(conteudo), nome
+
+def test_status_da_verificacao(tmp_path):
+    config = {}
+    boa = tmp_path / "boa.mp3"
+    (tmp_path / "boa_transcrito.txt").write_text(TRANSCRICOES['texto_corrido'], encoding='utf-8')
+    falha = tmp_path / "falha.mp3"
+    (tmp_path / "falha_transcrito_com_timestamp.txt").write_text(
+        "\n".join(["[Erro de conexão]"] * 3 + ["[00:10] ok"] * 2) + "\n" * 20, encoding='utf-8')
+
+    assert verificar_arquivo(str(boa), config)['status'] == 'ok'
+    resultado = verificar_arquivo(str(falha), config)
+    assert (resultado['status'], resultado['tipo_arquivo']) == ('problemas', "com timestamp")
+    assert resultado['problemas'] == ["Alto percentual de erros: 60.0%"]
+    assert verificar_arquivo(str(tmp_path / "sem.mp3"), config)['status'] == 'faltando'
@@ -2,42 +2,230 @@ import os
 import sys
 import speech_recognition as sr
 from pydub import AudioSegment
-from pydub.silence import split_on_silence
 import time
 import tempfile
 import shutil
+import threading
+import subprocess
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from segmentacao import TIPOS_AMOSTRA, energia_acumulada, detectar_segmentos, nivel_ruido, segmentar_stream
+from cache_transcricao import obter_cache
+from preprocessamento import preprocessar_audio
+from limitador import obter_limitador, pausa_com_jitter
+from backends import obter_backend, obter_fallback
+from perfil import etapa, linhas_resumo
+from saida import TEXTO_INAUDIVEL
+from configuracao import CONFIG_PADRAO
 
-def format_timestamp(milliseconds):
-    """Converte millisegundos para formato MM:SS"""
-    total_seconds = int(milliseconds / 1000)
+# Frames por leitura do sr.AudioFile (AudioFile.CHUNK), para calibrar o ruído como antes
+FRAMES_POR_LEITURA = 4096
+
+# Bytes do fim do log do ffmpeg incluídos na mensagem de erro do modo streaming
+BYTES_ERRO_FFMPEG = 4096
+
+def format_timestamp(milliseconds, completo=False):
+    """Converte millisegundos para formato MM:SS, ou HH:MM:SS.mmm quando completo=True"""
+    milliseconds = int(milliseconds)
+    total_seconds = milliseconds // 1000
+    if completo:
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        seconds = total_seconds % 60
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds % 1000:03d}"
     minutes = total_seconds // 60
     seconds = total_seconds % 60
     return f"{minutes:02d}:{seconds:02d}"
 
-def transcribe_audio(input_file, output_dir, callback_progress=None, callback_error=None, callback_info=None, config=None):
+def transcribe_audio(input_file, output_dir, callback_progress=None, callback_error=None, callback_info=None, config=None, checkpoint=None, perfil=None, cancelado=None, segmentacao=None):
+    """
+    Transcreve um caminho de WAV ou um AudioSegment já pré-processado (carregar_audio), gerando o texto de cada chunk.
+
+    segmentacao é o resultado de segmentar_audio para esse AudioSegment, já
+    calculado em outro lugar (no processo de conversão do lote); sem ela o
+    áudio é dividido aqui.
+
+    Com um checkpoint (CheckpointTranscricao já aberto), os chunks presentes no
+    diário são devolvidos sem reconhecimento e os novos são registrados nele.
+    Com um perfil (perfil.Perfil), registra o tempo de cada etapa.
+    cancelado (threading.Event) encerra a geração entre um chunk e outro: os
+    chunks que ainda não começaram não são reconhecidos.
+    """
     # Usar configurações padrão se não fornecidas
     if config is None:
-        config = {
-            'energy_threshold': 300,
-            'pause_threshold': 0.6,
-            'operation_timeout': 30,
-            'phrase_threshold': 0.3,
-            'non_speaking_duration': 0.6,
-            'min_silence_len': 700,
-            'silence_thresh_offset': -12,
-            'keep_silence': 400,
-            'chunk_length': 10000,
-            'max_chunk_size': 15000,
-            'sub_chunk_length': 8000,
-            'max_tentativas': 2,
-            'timeout_tentativa': 15,
-            'pausa_entre_tentativas': 0.8,
-            'sample_rate': 16000,
-            'filtro_freq_baixa': 80,
-            'filtro_freq_alta': 8000,
-            'incluir_timestamp': False
-        }
+        config = dict(CONFIG_PADRAO)
+    
+    if config.get('modo_streaming', False) and not isinstance(input_file, AudioSegment):
+        # Decodificação pelo ffmpeg em blocos: o reconhecimento começa antes do fim da decodificação
+        if callback_progress:
+            callback_progress("Modo streaming: decodificando e segmentando em blocos...")
+        segmentos = segmentar_stream(ler_blocos_ffmpeg(input_file, config),
+            config['sample_rate'],
+            config['min_silence_len'],
+            config['silence_thresh_offset'],
+            config['keep_silence'],
+            config.get('janela_streaming_ms', 60000),
+            config['chunk_length'])
+        # Cada trecho já chega recortado: (início_ms, fim_ms, trecho, início do trecho)
+        fontes = ((inicio, fim, trecho, inicio) for inicio, fim, trecho in segmentos)
+        total_segmentos = None
+        limiar_fala = None
+        # Sem o arquivo inteiro não há pico global: o ffmpeg filtra e cada chunk é normalizado
+        config = dict(config, normalizar_por_chunk=True)
+    else:
+        # Carregar áudio e dividir com parâmetros configuráveis
+        if isinstance(input_file, AudioSegment):
+            # Áudio já decodificado e pré-processado por carregar_audio
+            sound = input_file
+        else:
+            # WAV já pré-processado por converter_para_wav: normalizar de novo só repetiria o trabalho
+            with etapa(perfil, 'decodificacao'):
+                sound = AudioSegment.from_wav(input_file)
+        
+        # Índice compacto de (início_ms, fim_ms): os chunks só são recortados de sound na hora do reconhecimento
+        if segmentacao is None:
+            segmentacao = segmentar_audio(sound, config, perfil)
+        segmentos, por_silencio, ruido = segmentacao
+        fontes = ((inicio, fim, sound, 0) for inicio, fim in segmentos)
+        total_segmentos = len(segmentos)
+        
+        if callback_progress:
+            if not por_silencio:
+                callback_progress("Áudio sem pausas detectadas, dividido por tempo")
+            callback_progress(f"Áudio dividido em {len(segmentos)} segmentos")
+        
+        limiar_fala = None
+        if ruido is not None and config.get('pular_chunks_de_ruido', False):
+            # Mesma regra do listen() do SpeechRecognition: fala é energia acima de ruído * dynamic_energy_ratio.
+            # Opcional: fala baixa em ambiente ruidoso também fica abaixo disso e seria descartada
+            limiar_fala = ruido * sr.Recognizer().dynamic_energy_ratio
+            if callback_progress:
+                callback_progress(f"Ruído de fundo estimado: RMS {ruido} (chunks com RMS até {limiar_fala:.0f} não são reconhecidos)")
+        elif ruido is not None and callback_progress:
+            callback_progress(f"Ruído de fundo estimado: RMS {ruido}")
+    
+    r = criar_reconhecedor(config)
+    
+    # Contador de sucessos para relatório
+    chunks_processados = 0
+    chunks_com_sucesso = 0
+    
+    max_workers = max(1, int(config.get('max_workers', 1)))
+    backend = obter_backend(config.get('backend', 'google'), config)
+    if max_workers > 1 and not backend.concorrente:
+        # O backend não aceita chamadas simultâneas: mais workers só disputariam o lock
+        if callback_progress:
+            callback_progress(f"Backend {backend.nome} não suporta chamadas simultâneas, usando 1 worker")
+        max_workers = 1
+    if max_workers > 1 and callback_progress:
+        callback_progress(f"Reconhecimento concorrente com {max_workers} workers")
+    
+    # Um reconhecedor por worker: process_single_chunk altera operation_timeout a cada chamada
+    reconhecedores = threading.local()
+    
+    # Chunks já transcritos em execuções anteriores não voltam ao reconhecedor
+    cache = obter_cache(config)
+    uso_cache = {'acertos': 0, 'falhas': 0}
+    uso_cache_lock = threading.Lock()
     
+    def reconhecer(item):
+        if cancelado is not None and cancelado.is_set():
+            return None
+        indice, tarefa = item
+        if checkpoint and indice in checkpoint.resultados:
+            # Já transcrito antes da interrupção
+            return checkpoint.resultados[indice]
+        
+        chunk_id, inicio, fim, fonte, deslocamento, chunk_num, extra_info, timestamp = tarefa
+        chunk = fonte[inicio - deslocamento:fim - deslocamento]
+        metadados = {'inicio_ms': inicio, 'fim_ms': fim}
+        
+        if limiar_fala is not None and chunk.rms <= limiar_fala:
+            # Só ruído de fundo: o backend gastaria uma chamada para responder "inaudível"
+            if callback_progress:
+                info_extra = f" {extra_info}" if extra_info else ""
+                callback_progress(f"Chunk {chunk_num}/{total_segmentos or '?'}{info_extra} sem fala acima do ruído de fundo, pulando...")
+            metadados.update(backend=None, tentativas=0, latencia=0.0)
+            return montar_resultado(TEXTO_INAUDIVEL, timestamp, config, metadados)
+        
+        chave = None
+        if cache:
+            with etapa(perfil, 'cache'):
+                chave = cache.chave(chunk.raw_data, config, servico=backend.nome)
+                registro = cache.obter_registro(chave)
+            texto = registro['texto'] if registro else None
+            with uso_cache_lock:
+                uso_cache['acertos' if texto is not None else 'falhas'] += 1
+            if texto is not None:
+                if callback_progress:
+                    preview = texto[:50] + "..." if len(texto) > 50 else texto
+                    info_extra = f" {extra_info}" if extra_info else ""
+                    timestamp_info = f" [{timestamp}]" if timestamp else ""
+                    callback_progress(f"Chunk {chunk_num}/{total_segmentos or '?'}{info_extra}{timestamp_info} (cache): {preview}")
+                # O backend que gerou o texto guardado; entradas gravadas sem ele são atribuídas ao principal
+                metadados.update(backend=registro.get('backend') or backend.nome, tentativas=0, latencia=0.0)
+                return montar_resultado(texto, timestamp, config, metadados)
+        
+        if max_workers == 1:
+            recognizer = r
+        else:
+            recognizer = getattr(reconhecedores, 'recognizer', None)
+            if recognizer is None:
+                recognizer = reconhecedores.recognizer = criar_reconhecedor(config)
+        result = process_single_chunk(chunk, chunk_id, recognizer,
+                                      callback_progress, chunk_num, total_segmentos or "?",
+                                      extra_info, config, timestamp, metadados, perfil)
+        
+        # Só guardar transcrições de verdade; erros e falhas devem ser tentados de novo. A chave é do
+        # backend principal: um texto do fallback ocuparia o lugar do resultado do principal para sempre
+        texto = result.get('texto', str(result)) if isinstance(result, dict) else str(result)
+        if chave and not texto.startswith("[") and metadados.get('backend') == backend.nome:
+            cache.guardar(chave, texto, metadados['backend'])
+        return result
+    
+    # O índice sequencial da tarefa identifica o chunk no checkpoint
+    tarefas = enumerate(gerar_tarefas(fontes, config, callback_progress, total_segmentos))
+    
+    # Processar cada chunk com gerador, mantendo a ordem original
+    for indice, result in enumerate(executar_em_ordem(reconhecer, tarefas, max_workers)):
+        if cancelado is not None and cancelado.is_set():
+            # Sair do laço fecha executar_em_ordem, que descarta as tarefas ainda na fila
+            return
+        if result:
+            chunks_processados += 1
+            texto = result.get('texto', str(result)) if isinstance(result, dict) else str(result)
+            if not texto.startswith("["):
+                chunks_com_sucesso += 1
+                # Como no cache, chunks com erro ficam fora do checkpoint para serem tentados de novo
+                if checkpoint:
+                    checkpoint.registrar(indice, result)
+            yield result
+    
+    # Relatório final
+    if callback_progress:
+        callback_progress(f"\n=== RELATÓRIO DE TRANSCRIÇÃO ===")
+        callback_progress(f"Chunks processados: {chunks_processados}")
+        callback_progress(f"Chunks com sucesso: {chunks_com_sucesso}")
+        callback_progress(f"Taxa de sucesso: {(chunks_com_sucesso/max(chunks_processados,1)*100):.1f}%")
+        if cache:
+            callback_progress(f"Cache: {uso_cache['acertos']} acertos, {uso_cache['falhas']} falhas")
+        limitador = obter_limitador(config, backend.nome) if backend.remoto else None
+        if limitador and limitador.limites:
+            callback_progress(f"Rate limit: {limitador.limites} ocorrências no processo, taxa atual {limitador.taxa:.2f}/s")
+        # Tempo de reconhecimento e de carga de modelos, separados, acumulados no processo
+        for usado in (backend, obter_fallback(config)):
+            resumo = usado.resumo() if usado else None
+            if resumo:
+                callback_progress(f"Backend {resumo}")
+        if perfil:
+            callback_progress("Tempo por etapa:")
+            for linha in linhas_resumo(perfil.resumo()):
+                callback_progress(f"  {linha}")
+
+def criar_reconhecedor(config):
+    """Cria um sr.Recognizer com as configurações de reconhecimento aplicadas"""
     r = sr.Recognizer()
     
     # Aplicar configurações do reconhecedor
@@ -47,230 +235,299 @@ def transcribe_audio(input_file, output_dir, callback_progress=None, callback_er
     r.operation_timeout = config['operation_timeout']
     r.phrase_threshold = config['phrase_threshold']
     r.non_speaking_duration = config['non_speaking_duration']
+    return r
+
+def segmentar_audio(sound, config, perfil=None):
+    """
+    Divide o áudio pré-processado e estima o ruído de fundo, retornando
+    (segmentos, por_silencio, ruido) para transcribe_audio. Pode rodar no
+    processo que decodificou o arquivo: o resultado é pequeno e serializável.
+
+    ruido é o RMS dos silêncios entre os segmentos, estimado uma vez em vez de
+    calibrar cada chunk; None na divisão por tempo (o que fica fora dos
+    segmentos é fala, não silêncio) ou com config['calibrar_ruido_por_chunk'].
+    """
+    with etapa(perfil, 'segmentacao'):
+        energia = energia_acumulada(sound)
+        segmentos, por_silencio = indexar_chunks(sound, config, energia=energia)
+    ruido = None
+    if por_silencio and not config.get('calibrar_ruido_por_chunk', False):
+        with etapa(perfil, 'estimativa_ruido'):
+            ruido = nivel_ruido(sound, segmentos, energia)
+    return segmentos, por_silencio, ruido
+
+def indexar_chunks(sound, config, callback_progress=None, energia=None):
+    """
+    Divide o áudio por silêncio (ou por tempo, se não houver pausas). Retorna
+    (segmentos, por_silencio): a lista de (início_ms, fim_ms) e se ela veio
+    da detecção de silêncio, caso em que os intervalos entre os segmentos são
+    silêncio de verdade.
+    """
+    # Usar configurações personalizadas para divisão (detecção de silêncio vetorizada)
+    segmentos = detectar_segmentos(sound,
+        config['min_silence_len'],
+        config['silence_thresh_offset'],
+        config['keep_silence'],
+        energia)
     
-    # Criar pasta temporária
-    temp_dir = tempfile.mkdtemp(prefix="transcricao_")
+    # Se não conseguir dividir bem, forçar divisão por tempo
+    if not segmentos_por_silencio(segmentos, sound, config):
+        if callback_progress:
+            callback_progress("Áudio sem pausas detectadas, dividindo por tempo...")
+        # Usar tamanho configurável para chunks
+        chunk_length = config['chunk_length']
+        segmentos = []
+        for inicio in range(0, len(sound), chunk_length):
+            fim = min(inicio + chunk_length, len(sound))
+            if fim - inicio > 1000:  # Só adicionar se tiver pelo menos 1 segundo
+                segmentos.append((inicio, fim))
+        return segmentos, False
     
-    try:
-        # Carregar áudio e dividir com parâmetros configuráveis
-        sound = AudioSegment.from_wav(input_file)
-        
-        # Normalizar o áudio para melhor reconhecimento
-        sound = sound.normalize()
-        
-        # Usar configurações personalizadas para divisão
-        chunks = split_on_silence(sound,
-            min_silence_len=config['min_silence_len'],
-            silence_thresh=sound.dBFS + config['silence_thresh_offset'],
-            keep_silence=config['keep_silence'])
-        
-        # Calcular posições dos chunks para timestamps
-        chunk_positions = []
-        if config.get('incluir_timestamp', False):
-            current_pos = 0
-            if len(chunks) > 0:
-                # Recalcular posições baseado nos chunks reais
-                temp_sound = AudioSegment.empty()
-                for i, chunk in enumerate(chunks):
-                    chunk_positions.append(len(temp_sound))
-                    temp_sound += chunk
-                    if i < len(chunks) - 1:  # Adicionar silêncio entre chunks (exceto no último)
-                        temp_sound += AudioSegment.silent(duration=config['keep_silence'])
+    return segmentos, True
+
+def segmentos_por_silencio(segmentos, sound, config):
+    """Indica se a divisão por silêncio é aproveitável (senão, transcribe_audio divide por tempo)"""
+    if len(segmentos) == 0:
+        return False
+    if len(segmentos) == 1 and segmentos[0][1] - segmentos[0][0] > config['chunk_length'] * 3:
+        return False
+    return True
+
+def gerar_tarefas(segmentos, config, callback_progress=None, total_segmentos=None):
+    """
+    Gera (chunk_id, início_ms, fim_ms, fonte, deslocamento, chunk_num, extra_info, timestamp)
+    para cada trecho a reconhecer, subdividindo chunks grandes.
+
+    segmentos é um iterável de (início_ms, fim_ms, fonte, deslocamento): o chunk é
+    fonte[início - deslocamento:fim - deslocamento], recortado só no reconhecimento.
+    """
+    total = total_segmentos or "?"
+    incluir_timestamp = config.get('incluir_timestamp', False)
+    timestamp_completo = config.get('timestamp_completo', False)
+    
+    for i, (inicio, fim, fonte, deslocamento) in enumerate(segmentos):
+        duracao = fim - inicio
         
-        # Se não conseguir dividir bem, forçar divisão por tempo
-        if len(chunks) == 0 or (len(chunks) == 1 and len(chunks[0]) > config['chunk_length'] * 3):
+        # Pular chunks muito pequenos (menos de 1 segundo)
+        if duracao < 1000:
             if callback_progress:
-                callback_progress("Áudio sem pausas detectadas, dividindo por tempo...")
-            # Usar tamanho configurável para chunks
-            chunk_length = config['chunk_length']
-            chunks = []
-            chunk_positions = []
-            for i in range(0, len(sound), chunk_length):
-                chunk = sound[i:i + chunk_length]
-                if len(chunk) > 1000:  # Só adicionar se tiver pelo menos 1 segundo
-                    chunks.append(chunk)
-                    if config.get('incluir_timestamp', False):
-                        chunk_positions.append(i)
-        
-        if callback_progress:
-            callback_progress(f"Áudio dividido em {len(chunks)} segmentos")
+                callback_progress(f"Chunk {i+1}/{total} muito pequeno ({duracao}ms), pulando...")
+            continue
         
-        # Contador de sucessos para relatório
-        chunks_processados = 0
-        chunks_com_sucesso = 0
+        # Timestamp do chunk atual a partir da sua posição real no áudio original
+        timestamp = format_timestamp(inicio, timestamp_completo) if incluir_timestamp else None
         
-        # Processar cada chunk com gerador
-        for i, chunk in enumerate(chunks):
-            # Pular chunks muito pequenos (menos de 1 segundo)
-            if len(chunk) < 1000:
-                if callback_progress:
-                    callback_progress(f"Chunk {i+1}/{len(chunks)} muito pequeno ({len(chunk)}ms), pulando...")
-                continue
+        # Se chunk for muito grande, dividir novamente
+        if duracao > config['max_chunk_size']:
+            if callback_progress:
+                callback_progress(f"Chunk {i+1} muito grande ({duracao}ms), subdividindo...")
             
-            # Calcular timestamp do chunk atual
-            timestamp = None
-            if config.get('incluir_timestamp', False) and i < len(chunk_positions):
-                timestamp = format_timestamp(chunk_positions[i])
+            # Subdividir usando tamanho configurável, apenas calculando os intervalos
+            sub_chunk_length = config['sub_chunk_length']
+            sub_segmentos = []
+            for j in range(inicio, fim, sub_chunk_length):
+                sub_fim = min(j + sub_chunk_length, fim)
+                if sub_fim - j > 1000:
+                    sub_segmentos.append((j, sub_fim))
             
-            # Se chunk for muito grande, dividir novamente
-            if len(chunk) > config['max_chunk_size']:
-                if callback_progress:
-                    callback_progress(f"Chunk {i+1} muito grande ({len(chunk)}ms), subdividindo...")
-                
-                # Subdividir usando tamanho configurável
-                sub_chunk_length = config['sub_chunk_length']
-                sub_chunks = []
-                for j in range(0, len(chunk), sub_chunk_length):
-                    sub_chunk = chunk[j:j + sub_chunk_length]
-                    if len(sub_chunk) > 1000:
-                        sub_chunks.append(sub_chunk)
-                
-                # Processar sub-chunks
-                for k, sub_chunk in enumerate(sub_chunks):
-                    # Calcular timestamp do sub-chunk
-                    sub_timestamp = None
-                    if timestamp and config.get('incluir_timestamp', False):
-                        sub_offset = k * sub_chunk_length
-                        sub_timestamp = format_timestamp(chunk_positions[i] + sub_offset)
-                    
-                    result = process_single_chunk(sub_chunk, f"{i}_{k}", temp_dir, r, 
-                                                 callback_progress, i+1, len(chunks), 
-                                                 f"sub-chunk {k+1}/{len(sub_chunks)}", config, sub_timestamp)
-                    if result:
-                        chunks_processados += 1
-                        texto = result.get('texto', str(result)) if isinstance(result, dict) else str(result)
-                        if not texto.startswith("["):
-                            chunks_com_sucesso += 1
-                        yield result
-            else:
-                # Processar chunk normal
-                result = process_single_chunk(chunk, str(i), temp_dir, r, 
-                                             callback_progress, i+1, len(chunks), "", config, timestamp)
-                if result:
-                    chunks_processados += 1
-                    texto = result.get('texto', str(result)) if isinstance(result, dict) else str(result)
-                    if not texto.startswith("["):
-                        chunks_com_sucesso += 1
-                    yield result
-        
-        # Relatório final
-        if callback_progress:
-            callback_progress(f"\n=== RELATÓRIO DE TRANSCRIÇÃO ===")
-            callback_progress(f"Chunks processados: {chunks_processados}")
-            callback_progress(f"Chunks com sucesso: {chunks_com_sucesso}")
-            callback_progress(f"Taxa de sucesso: {(chunks_com_sucesso/max(chunks_processados,1)*100):.1f}%")
+            for k, (sub_inicio, sub_fim) in enumerate(sub_segmentos):
+                sub_timestamp = format_timestamp(sub_inicio, timestamp_completo) if incluir_timestamp else None
+                yield (f"{i}_{k}", sub_inicio, sub_fim, fonte, deslocamento, i+1,
+                       f"sub-chunk {k+1}/{len(sub_segmentos)}", sub_timestamp)
+        else:
+            yield (str(i), inicio, fim, fonte, deslocamento, i+1, "", timestamp)
+
+def executar_em_ordem(funcao, tarefas, max_workers=1):
+    """Aplica funcao a cada tarefa com até max_workers threads, devolvendo os resultados na ordem das tarefas"""
+    if max_workers <= 1:
+        for tarefa in tarefas:
+            yield funcao(tarefa)
+        return
     
+    # Limitar tarefas em andamento para não materializar todos os chunks de uma vez
+    limite_pendentes = max_workers * 2
+    pendentes = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reconhecimento")
+    try:
+        for tarefa in tarefas:
+            pendentes.append(executor.submit(funcao, tarefa))
+            if len(pendentes) >= limite_pendentes:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
     finally:
-        # Limpar pasta temporária
-        try:
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-                if callback_progress:
-                    callback_progress(f"Pasta temporária removida: {temp_dir}")
-        except Exception as e:
-            if callback_progress:
-                callback_progress(f"Aviso: Não foi possível remover pasta temporária: {str(e)}")
+        # Se o consumidor parar antes do fim, descartar o que ainda não começou
+        for futuro in pendentes:
+            futuro.cancel()
+        executor.shutdown(wait=True)
+
+def montar_resultado(texto, timestamp, config, metadados=None):
+    """
+    Resultado de um chunk: dicionário com timestamp quando habilitado, senão apenas o texto.
 
-def process_single_chunk(chunk, chunk_id, temp_dir, recognizer, callback_progress, chunk_num, total_chunks, extra_info="", config=None, timestamp=None):
-    """Processa um único chunk de áudio e retorna o texto transcrito com timestamp opcional"""
+    Com config['metadados_chunk'] é sempre um dicionário com 'texto',
+    'timestamp' (None se desabilitado) e os metadados: 'inicio_ms', 'fim_ms',
+    'backend' (o que gerou o texto; None para chunks só com ruído de fundo),
+    'tentativas' (0 para o cache) e 'latencia' (segundos no reconhecimento).
+    """
+    if config.get('metadados_chunk', False):
+        return dict(metadados or {}, texto=texto, timestamp=timestamp)
+    if config.get('incluir_timestamp', False) and timestamp:
+        return {
+            'texto': texto,
+            'timestamp': timestamp
+        }
+    return texto
+
+def ajustar_ruido_ambiente(recognizer, chunk, duracao=0.3):
+    """
+    Equivalente em memória de recognizer.adjust_for_ambient_noise seguido de
+    recognizer.record sobre um sr.AudioFile do chunk: calibra energy_threshold
+    com os primeiros blocos e devolve o restante como sr.AudioData.
+    """
+    dados = chunk.raw_data
+    largura = chunk.sample_width
+    tipo = TIPOS_AMOSTRA.get(largura)
+    if tipo is None:
+        # Largura sem tipo numpy (24 bits): reconhecer o chunk inteiro, sem ajuste
+        return sr.AudioData(dados, chunk.frame_rate, largura)
+    bytes_por_bloco = FRAMES_POR_LEITURA * largura * chunk.channels
+    segundos_por_bloco = FRAMES_POR_LEITURA / chunk.frame_rate
+    
+    # Mesma contagem de blocos do adjust_for_ambient_noise, que lê enquanto não passar da duração
+    posicao = 0
+    decorrido = segundos_por_bloco
+    while decorrido <= duracao:
+        bloco = np.frombuffer(dados[posicao:posicao + bytes_por_bloco], dtype=tipo).astype(np.float64)
+        energia = int(np.sqrt(np.mean(bloco * bloco))) if len(bloco) else 0
+        amortecimento = recognizer.dynamic_energy_adjustment_damping ** segundos_por_bloco
+        alvo = energia * recognizer.dynamic_energy_ratio
+        recognizer.energy_threshold = recognizer.energy_threshold * amortecimento + alvo * (1 - amortecimento)
+        posicao += bytes_por_bloco
+        decorrido += segundos_por_bloco
+    
+    return sr.AudioData(dados[posicao:], chunk.frame_rate, largura)
+
+def process_single_chunk(chunk, chunk_id, recognizer, callback_progress, chunk_num, total_chunks, extra_info="", config=None, timestamp=None, metadados=None, perfil=None):
+    """
+    Processa um único chunk de áudio e retorna o texto transcrito com timestamp opcional.
+
+    Se metadados (dicionário) for passado, recebe 'backend', 'tentativas' e
+    'latencia' para montar_resultado. Com perfil, registra o preparo do chunk,
+    a espera no limitador, cada tentativa de reconhecimento e as pausas.
+    """
     if config is None:
         config = {'sample_rate': 16000, 'filtro_freq_baixa': 80, 'filtro_freq_alta': 8000, 
                  'max_tentativas': 2, 'timeout_tentativa': 15, 'pausa_entre_tentativas': 0.8,
                  'incluir_timestamp': False}
-    
-    chunk_file = os.path.join(temp_dir, f"temp_chunk_{chunk_id}.wav")
+    if metadados is None:
+        metadados = {}
+    metadados.update(backend=config.get('backend', 'google'), tentativas=0, latencia=0.0)
+    inicio_reconhecimento = time.perf_counter()
     
     try:
-        # Melhorar qualidade do chunk antes da transcrição
-        chunk = chunk.set_frame_rate(config['sample_rate'])
-        chunk = chunk.set_channels(1)  # Mono para melhor performance
+        with etapa(perfil, 'preparo_chunk'):
+            # Garantir o formato do reconhecedor (sem custo se o chunk já veio de preprocessar_audio)
+            chunk = chunk.set_frame_rate(config['sample_rate'])
+            chunk = chunk.set_channels(1)  # Mono para melhor performance
+            
+            # Filtros e normalização já foram aplicados uma vez no arquivo inteiro
+            if config.get('normalizar_por_chunk', False):
+                chunk = chunk.normalize()
+            
+            # Entregar as amostras ao reconhecedor direto da memória, sem WAV temporário
+            if config.get('calibrar_ruido_por_chunk', False):
+                # Comportamento antigo: calibra com o início do chunk, que deixa de ser reconhecido
+                audio_data = ajustar_ruido_ambiente(recognizer, chunk, duracao=0.3)
+            else:
+                audio_data = sr.AudioData(chunk.raw_data, chunk.frame_rate, chunk.sample_width)
         
-        # Aplicar filtros para melhorar qualidade
-        chunk = chunk.normalize()
+        # Backend principal com tentativas e timeouts progressivos, e o fallback configurado
+        text = None
+        backend = obter_backend(config.get('backend', 'google'), config)
+        fallback = obter_fallback(config)
+        # Só serviços com cota passam pelo limitador compartilhado
+        limitador = obter_limitador(config, backend.nome) if backend.remoto else None
         
-        # Aplicar filtros de frequência se o chunk for longo o suficiente
-        if len(chunk) > 2000:
+        def tentar_fallback(mensagem):
+            if fallback is None:
+                return None
+            if callback_progress:
+                callback_progress(mensagem)
             try:
-                chunk = chunk.high_pass_filter(config['filtro_freq_baixa'])
-                chunk = chunk.low_pass_filter(config['filtro_freq_alta'])
-            except:
-                pass  # Se filtros falharem, continuar sem eles
+                with etapa(perfil, 'fallback', backend=fallback.nome):
+                    texto_fallback = fallback.transcrever(audio_data, recognizer)
+            except Exception:
+                return None
+            metadados['backend'] = fallback.nome
+            return texto_fallback
         
-        chunk.export(chunk_file, format="wav")
-        
-        with sr.AudioFile(chunk_file) as source:
-            # Ajustar para ruído ambiente com timeout menor
+        # Usar número configurável de tentativas
+        for tentativa in range(config['max_tentativas']):
+            metadados['tentativas'] = tentativa + 1
             try:
-                recognizer.adjust_for_ambient_noise(source, duration=0.3)
-            except:
-                pass  # Se falhar, continuar sem ajuste
-            
-            audio_data = recognizer.record(source)
-            
-            # Tentar múltiplos serviços com timeouts progressivos
-            text = None
-            
-            # Usar número configurável de tentativas
-            for tentativa in range(config['max_tentativas']):
-                try:
-                    if callback_progress and tentativa > 0:
-                        info_extra = f" {extra_info}" if extra_info else ""
-                        callback_progress(f"  → Tentativa {tentativa + 1} para chunk {chunk_num}/{total_chunks}{info_extra}")
-                    
-                    # Usar timeout configurável
-                    old_timeout = recognizer.operation_timeout
-                    recognizer.operation_timeout = config['timeout_tentativa']
-                    
-                    text = recognizer.recognize_google(audio_data, language="pt-BR")
-                    
-                    recognizer.operation_timeout = old_timeout
-                    break  # Sucesso, sair do loop
-                    
-                except sr.UnknownValueError:
-                    text = "[Áudio inaudível]"
+                if callback_progress and tentativa > 0:
+                    info_extra = f" {extra_info}" if extra_info else ""
+                    callback_progress(f"  → Tentativa {tentativa + 1} para chunk {chunk_num}/{total_chunks}{info_extra}")
+                
+                # Usar timeout configurável
+                old_timeout = recognizer.operation_timeout
+                recognizer.operation_timeout = config['timeout_tentativa']
+                
+                # Esperar a vez no limitador compartilhado antes de chamar o serviço
+                if limitador:
+                    with etapa(perfil, 'limitador'):
+                        limitador.adquirir()
+                with etapa(perfil, 'reconhecimento', backend=backend.nome, tentativa=tentativa + 1):
+                    text = backend.transcrever(audio_data, recognizer)
+                if limitador:
+                    limitador.registrar_sucesso()
+                
+                recognizer.operation_timeout = old_timeout
+                break  # Sucesso, sair do loop
+                
+            except sr.UnknownValueError:
+                if limitador:
+                    limitador.registrar_sucesso()
+                text = TEXTO_INAUDIVEL
+                break
+                
+            except sr.RequestError as e:
+                recognizer.operation_timeout = old_timeout
+                if limitador and ("Bad Request" in str(e) or "quota" in str(e).lower()):
+                    # Todas as threads recuam juntas; a próxima tentativa espera no limitador
+                    pausa = limitador.registrar_limite()
+                    if callback_progress:
+                        callback_progress(f"  → Rate limit atingido, aguardando {pausa:.1f}s (taxa reduzida para {limitador.taxa:.2f}/s)...")
+                    continue
+                else:
+                    # Erro diferente, tentar o fallback imediatamente
+                    text = tentar_fallback(f"  → Tentando reconhecimento com {fallback.nome if fallback else ''}...")
+                    if text is None:
+                        text = f"[Erro de conexão: {str(e)}]" if backend.remoto else f"[Erro no reconhecimento: {str(e)}]"
                     break
-                    
-                except sr.RequestError as e:
-                    recognizer.operation_timeout = old_timeout
-                    if "Bad Request" in str(e) or "quota" in str(e).lower():
-                        if callback_progress:
-                            callback_progress(f"  → Rate limit atingido, aguardando...")
-                        time.sleep(3 + tentativa * 2)
-                        continue
+                        
+            except Exception as e:
+                recognizer.operation_timeout = old_timeout
+                if "timed out" in str(e).lower():
+                    if tentativa == config['max_tentativas'] - 1:  # Última tentativa
+                        # Tentar o fallback como último recurso
+                        text = tentar_fallback(f"  → Timeout no {backend.nome}, tentando {fallback.nome if fallback else ''}...")
+                        if text is None:
+                            text = f"[Timeout após múltiplas tentativas]"
                     else:
-                        # Erro diferente, tentar Sphinx imediatamente
-                        try:
-                            if callback_progress:
-                                callback_progress(f"  → Tentando reconhecimento offline...")
-                            text = recognizer.recognize_sphinx(audio_data, language="pt-BR")
-                            break
-                        except Exception as sphinx_error:
-                            text = f"[Erro de conexão: {str(e)}]"
-                            break
-                            
-                except Exception as e:
-                    recognizer.operation_timeout = old_timeout
-                    if "timed out" in str(e).lower():
-                        if tentativa == config['max_tentativas'] - 1:  # Última tentativa
-                            # Tentar Sphinx como último recurso
-                            try:
-                                if callback_progress:
-                                    callback_progress(f"  → Timeout no Google, tentando Sphinx...")
-                                text = recognizer.recognize_sphinx(audio_data, language="pt-BR")
-                                break
-                            except:
-                                text = f"[Timeout após múltiplas tentativas]"
-                        else:
-                            time.sleep(1)
+                        with etapa(perfil, 'pausa'):
+                            time.sleep(pausa_com_jitter(config['pausa_entre_tentativas'], tentativa))
+                else:
+                    if tentativa == config['max_tentativas'] - 1:
+                        text = f"[Erro no reconhecimento: {str(e)}]"
                     else:
-                        if tentativa == config['max_tentativas'] - 1:
-                            text = f"[Erro no reconhecimento: {str(e)}]"
-                        else:
-                            time.sleep(1)
-            
-            # Se ainda não temos texto após todas as tentativas
-            if text is None:
-                text = "[Falha na transcrição após múltiplas tentativas]"
+                        with etapa(perfil, 'pausa'):
+                            time.sleep(pausa_com_jitter(config['pausa_entre_tentativas'], tentativa))
+        
+        # Se ainda não temos texto após todas as tentativas
+        if text is None:
+            text = "[Falha na transcrição após múltiplas tentativas]"
         
         if callback_progress:
             preview = text[:50] + "..." if len(text) > 50 else text
@@ -278,73 +535,129 @@ def process_single_chunk(chunk, chunk_id, temp_dir, recognizer, callback_progres
             timestamp_info = f" [{timestamp}]" if timestamp else ""
             callback_progress(f"Chunk {chunk_num}/{total_chunks}{info_extra}{timestamp_info} transcrito: {preview}")
         
-        # Usar pausa configurável
-        time.sleep(config['pausa_entre_tentativas'])
-        
         # Retornar resultado com ou sem timestamp
-        if config.get('incluir_timestamp', False) and timestamp:
-            return {
-                'texto': text,
-                'timestamp': timestamp
-            }
-        else:
-            return text
+        metadados['latencia'] = round(time.perf_counter() - inicio_reconhecimento, 3)
+        return montar_resultado(text, timestamp, config, metadados)
         
     except Exception as e:
         error_msg = f"[ERRO NO CHUNK {chunk_id}: {str(e)}]"
         if callback_progress:
             callback_progress(f"Erro no chunk {chunk_num}: {str(e)}")
         
-        if config.get('incluir_timestamp', False) and timestamp:
-            return {
-                'texto': error_msg,
-                'timestamp': timestamp
-            }
-        else:
-            return error_msg
+        metadados['latencia'] = round(time.perf_counter() - inicio_reconhecimento, 3)
+        return montar_resultado(error_msg, timestamp, config, metadados)
+
+def carregar_audio(arquivo_entrada, config=None, perfil=None):
+    """Decodifica e pré-processa o arquivo em memória, pronto para transcribe_audio (sem gravar WAV em disco)"""
+    if config is None:
+        config = {'sample_rate': 16000, 'filtro_freq_baixa': 80, 'filtro_freq_alta': 8000}
     
-    finally:
-        # Limpar arquivo temporário do chunk
-        try:
-            if os.path.exists(chunk_file):
-                os.remove(chunk_file)
-        except:
-            pass
+    try:
+        # Detectar formato e carregar
+        with etapa(perfil, 'decodificacao'):
+            if arquivo_entrada.lower().endswith('.mp4'):
+                audio = AudioSegment.from_file(arquivo_entrada, "mp4")
+            elif arquivo_entrada.lower().endswith('.mp3'):
+                audio = AudioSegment.from_mp3(arquivo_entrada)
+            elif arquivo_entrada.lower().endswith('.wav'):
+                # Mesmo para WAV, vamos normalizar
+                audio = AudioSegment.from_wav(arquivo_entrada)
+            else:
+                # Demais formatos (m4a, ogg, flac, mkv, webm...): o ffmpeg identifica pelo conteúdo
+                audio = AudioSegment.from_file(arquivo_entrada)
+        
+        # Taxa, mono, filtros e normalização em uma única passada vetorizada
+        return preprocessar_audio(audio, config, perfil)
+        
+    except Exception as e:
+        raise Exception(f"Erro na conversão: {str(e)}")
+
+def ler_blocos_ffmpeg(arquivo_entrada, config=None):
+    """
+    Decodifica o arquivo com o ffmpeg e gera blocos de PCM 16-bit mono na taxa
+    configurada, já com os filtros de frequência, sem carregar o arquivo inteiro.
 
-def converter_para_wav(arquivo_entrada, config=None):
+    Uma thread lê o pipe para uma fila limitada a config['janela_streaming_ms'],
+    então a decodificação continua enquanto os blocos anteriores são reconhecidos.
+    """
     if config is None:
         config = {'sample_rate': 16000, 'filtro_freq_baixa': 80, 'filtro_freq_alta': 8000}
     
+    taxa = config['sample_rate']
+    bloco_ms = config.get('bloco_streaming_ms', 1000)
+    bytes_por_bloco = int(taxa * bloco_ms / 1000) * 2
+    max_blocos = max(1, config.get('janela_streaming_ms', 60000) // bloco_ms)
+    
+    # Mesmos filtros de carregar_audio; o passa-baixa só faz sentido abaixo de Nyquist
+    filtros = [f"highpass=f={config['filtro_freq_baixa']}"]
+    if config['filtro_freq_alta'] < taxa / 2:
+        filtros.append(f"lowpass=f={config['filtro_freq_alta']}")
+    
+    comando = [AudioSegment.converter, "-nostdin", "-v", "error", "-i", arquivo_entrada,
+               "-vn", "-ac", "1", "-ar", str(taxa), "-af", ",".join(filtros),
+               "-f", "s16le", "-acodec", "pcm_s16le", "-"]
+    # O stderr vai para um arquivo: um pipe só lido no fim travaria o ffmpeg com mais de 64 KB de erros
+    erros = tempfile.TemporaryFile()
+    try:
+        processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=erros)
+    except Exception as e:
+        erros.close()
+        raise Exception(f"Erro na conversão: {str(e)}")
+    
+    fila = queue.Queue(maxsize=max_blocos)
+    fim_do_stream = object()
+    
+    def ler_pipe():
+        try:
+            while True:
+                dados = processo.stdout.read(bytes_por_bloco)
+                if not dados:
+                    break
+                fila.put(dados)
+        finally:
+            fila.put(fim_do_stream)
+    
+    leitor = threading.Thread(target=ler_pipe, name="leitor_ffmpeg", daemon=True)
+    leitor.start()
+    
+    try:
+        while True:
+            dados = fila.get()
+            if dados is fim_do_stream:
+                break
+            yield dados
+        
+        if processo.wait() != 0:
+            # Só o fim do log: as últimas mensagens do ffmpeg explicam a falha
+            erros.seek(0, os.SEEK_END)
+            erros.seek(max(0, erros.tell() - BYTES_ERRO_FFMPEG))
+            mensagem = erros.read().decode("utf-8", errors="replace").strip()
+            raise Exception(f"Erro na conversão: {mensagem or 'ffmpeg retornou ' + str(processo.returncode)}")
+    finally:
+        # Interrompido antes do fim: encerrar o ffmpeg e liberar a thread leitora
+        if processo.poll() is None:
+            processo.kill()
+            processo.wait()
+        while leitor.is_alive():
+            try:
+                fila.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        processo.stdout.close()
+        erros.close()
+
+def converter_para_wav(arquivo_entrada, config=None, perfil=None):
+    """Gera um WAV pré-processado em pasta temporária; use só quando o arquivo em disco for necessário"""
+    audio = carregar_audio(arquivo_entrada, config, perfil)
+    
     # Criar pasta temporária para conversão
     temp_dir = tempfile.mkdtemp(prefix="conversao_")
     nome_base = os.path.splitext(os.path.basename(arquivo_entrada))[0]
     saida_wav = os.path.join(temp_dir, nome_base + "_converted.wav")
     
     try:
-        # Detectar formato e carregar
-        if arquivo_entrada.lower().endswith('.mp4'):
-            audio = AudioSegment.from_file(arquivo_entrada, "mp4")
-        elif arquivo_entrada.lower().endswith('.mp3'):
-            audio = AudioSegment.from_mp3(arquivo_entrada)
-        elif arquivo_entrada.lower().endswith('.wav'):
-            # Mesmo para WAV, vamos normalizar
-            audio = AudioSegment.from_wav(arquivo_entrada)
-        else:
-            raise ValueError(f"Formato não suportado: {arquivo_entrada}")
-        
-        # Usar configurações personalizadas
-        audio = audio.set_frame_rate(config['sample_rate'])
-        audio = audio.set_channels(1)
-        audio = audio.normalize()
-        
-        # Aplicar filtros configuráveis
-        try:
-            audio = audio.high_pass_filter(config['filtro_freq_baixa'])
-            audio = audio.low_pass_filter(config['filtro_freq_alta'])
-        except:
-            pass  # Se filtros falharem, continuar sem eles
-        
-        audio.export(saida_wav, format="wav")
+        with etapa(perfil, 'exportacao'):
+            audio.export(saida_wav, format="wav")
         return saida_wav
         
     except Exception as e:
@@ -367,24 +680,6 @@ def limpar_arquivo_temp(arquivo_temp):
         pass
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python transcriber.py <caminho_do_arquivo>")
-        sys.exit(1)
-    
-    entrada = sys.argv[1]
-    wav_file = converter_para_wav(entrada)
-    
-    try:
-        resultado = ""
-        for chunk in transcribe_audio(wav_file, "."):
-            resultado += chunk + " "
-        
-        nome_saida = os.path.splitext(entrada)[0] + "_transcrito.txt"
-        with open(nome_saida, "w", encoding="utf-8") as f:
-            f.write(resultado)
-        
-        print(f"Transcrição concluída! Arquivo salvo em: {nome_saida}")
-    
-    finally:
-        # Limpar arquivo temporário
-        limpar_arquivo_temp(wav_file)
\ No newline at end of file
+    # Mesmo comportamento de "python cli.py"
+    from cli import main
+    sys.exit(main())
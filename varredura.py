@@ -0,0 +1,71 @@
+import os
+
+# Extensões procuradas quando config['extensoes_audio'] não está definido
+EXTENSOES_PADRAO = "mp3,mp4,wav,m4a,ogg,flac,mkv,webm"
+
+# WAVs pré-processados gravados pelo lote (config['salvar_wav']) não são entradas
+SUFIXO_CONVERTIDO = "_convertido.wav"
+
+# Arquivos entregues por vez no modo gerador
+ARQUIVOS_POR_LOTE = 200
+
+def extensoes_configuradas(config):
+    """Tupla de extensões em minúsculas (".mp3", ...) de config['extensoes_audio'] (lista ou texto separado por vírgulas)"""
+    valor = config.get('extensoes_audio') or EXTENSOES_PADRAO
+    if isinstance(valor, str):
+        valor = valor.split(",")
+    extensoes = []
+    for extensao in valor:
+        extensao = extensao.strip().lower().lstrip("*").lstrip(".")
+        if extensao and "." + extensao not in extensoes:
+            extensoes.append("." + extensao)
+    return tuple(extensoes)
+
+def arquivo_de_audio(nome, extensoes):
+    """Nome com uma das extensões (sem diferenciar maiúsculas), exceto os WAVs convertidos"""
+    nome = nome.lower()
+    return nome.endswith(extensoes) and not nome.endswith(SUFIXO_CONVERTIDO)
+
+def varrer_pasta(pasta, extensoes, recursivo=True):
+    """
+    Gera os caminhos dos arquivos de áudio/vídeo da pasta em uma única
+    passada com os.scandir, à medida que cada subpasta é lida (pastas de rede
+    enormes começam a aparecer sem esperar o fim). A ordem é a dos nomes em
+    cada pasta, com os arquivos antes das subpastas. Links para pastas não são
+    seguidos e subpastas sem permissão são ignoradas.
+    """
+    pilha = [pasta]
+    while pilha:
+        atual = pilha.pop()
+        try:
+            with os.scandir(atual) as entradas:
+                entradas = sorted(entradas, key=lambda entrada: entrada.name)
+        except OSError:
+            continue
+        subpastas = []
+        for entrada in entradas:
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    subpastas.append(entrada.path)
+                elif arquivo_de_audio(entrada.name, extensoes) and entrada.is_file():
+                    yield entrada.path
+            except OSError:
+                continue
+        if recursivo:
+            # Invertidas para a pilha devolver a primeira subpasta primeiro
+            pilha.extend(reversed(subpastas))
+
+def varrer_em_lotes(pasta, extensoes, recursivo=True, tamanho_lote=ARQUIVOS_POR_LOTE):
+    """varrer_pasta agrupado em listas, para a interface inserir vários arquivos de uma vez"""
+    lote = []
+    for caminho in varrer_pasta(pasta, extensoes, recursivo):
+        lote.append(caminho)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def listar_arquivos_audio(pasta, extensoes, recursivo=True):
+    """Lista completa de varrer_pasta"""
+    return list(varrer_pasta(pasta, extensoes, recursivo))
@@ -0,0 +1,206 @@
+import os
+import re
+import json
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from saida import EscritorIncremental, nome_arquivo_saida
+
+# Caracteres lidos por vez de cada transcrição
+CARACTERES_POR_BLOCO = 1 << 20
+
+# Arquivos verificados ao mesmo tempo (a leitura libera o GIL)
+WORKERS_VERIFICACAO = 8
+
+# Letras acentuadas do português, que não contam como caracteres estranhos
+CARACTERES_ACENTUADOS = 'áéíóúàèìòùâêîôûãõçÁÉÍÓÚÀÈÌÒÙÂÊÎÔÛÃÕÇ'
+PADRAO_ESTRANHO = re.compile(f"[^\\x00-\\x7f{CARACTERES_ACENTUADOS}]")
+
+# Chunks com erro gravados na transcrição
+PADRAO_ERRO = re.compile(r"\[ERRO|\[Erro")
+TAMANHO_MARCADOR = len("[ERRO")
+
+# Limites das verificações
+PERCENTUAL_ERRO_MAXIMO = 50
+TAMANHO_MINIMO = 50
+FRACAO_ESTRANHOS_MAXIMA = 0.1
+LINHAS_COM_TIMESTAMP = 10
+
+def localizar_transcricao(arquivo_original, config):
+    """Transcrição do arquivo (a com timestamp tem preferência) e seu tipo, ou (None, None)"""
+    for incluir_timestamp, tipo in ((True, "com timestamp"), (False, "normal")):
+        caminho = nome_arquivo_saida(arquivo_original, dict(config, incluir_timestamp=incluir_timestamp))
+        if os.path.exists(caminho):
+            return caminho, tipo
+    return None, None
+
+def analisar_transcricao(caminho):
+    """
+    Lê a transcrição em blocos e conta, sem guardar o conteúdo: caracteres,
+    caracteres estranhos, linhas não vazias, linhas com erro e se alguma das
+    primeiras LINHAS_COM_TIMESTAMP linhas tem colchetes.
+
+    Um texto sem timestamps é uma única linha, então o estado da linha atual
+    (não vazia, com erro, colchetes) é mantido entre blocos, com o final do
+    bloco anterior para achar um marcador de erro dividido entre dois blocos.
+    """
+    caracteres = estranhos = linhas = linhas_com_erro = 0
+    numero_linha = 0
+    timestamp_encontrado = False
+    nao_vazia = com_erro = abre = fecha = False
+    cauda = ""
+
+    with open(caminho, 'r', encoding='utf-8') as f:
+        while True:
+            bloco = f.read(CARACTERES_POR_BLOCO)
+            if not bloco:
+                break
+            caracteres += len(bloco)
+            estranhos += len(PADRAO_ESTRANHO.findall(bloco))
+
+            partes = bloco.split("\n")
+            for i, parte in enumerate(partes):
+                if i > 0:
+                    # Fim de linha: contabilizar a linha que terminou
+                    linhas += nao_vazia
+                    linhas_com_erro += com_erro
+                    if numero_linha < LINHAS_COM_TIMESTAMP and abre and fecha:
+                        timestamp_encontrado = True
+                    numero_linha += 1
+                    nao_vazia = com_erro = abre = fecha = False
+                    cauda = ""
+                if not parte:
+                    continue
+                nao_vazia = nao_vazia or not parte.isspace()
+                com_erro = com_erro or PADRAO_ERRO.search(cauda + parte) is not None
+                if numero_linha < LINHAS_COM_TIMESTAMP:
+                    abre = abre or "[" in parte
+                    fecha = fecha or "]" in parte
+                cauda = (cauda + parte)[-(TAMANHO_MARCADOR - 1):]
+
+    # Última linha (sem quebra no final)
+    linhas += nao_vazia
+    linhas_com_erro += com_erro
+    if numero_linha < LINHAS_COM_TIMESTAMP and abre and fecha:
+        timestamp_encontrado = True
+
+    return {
+        'caracteres': caracteres,
+        'estranhos': estranhos,
+        'linhas': linhas,
+        'linhas_com_erro': linhas_com_erro,
+        'timestamp_encontrado': timestamp_encontrado,
+    }
+
+def verificar_arquivo(arquivo_original, config):
+    """
+    Verifica a transcrição de um arquivo. Retorna um dicionário com 'arquivo',
+    'transcricao', 'tipo_arquivo', 'status' ('ok', 'problemas', 'faltando' ou
+    'erro_leitura'), 'problemas' (lista de descrições), 'linhas',
+    'linhas_com_erro' e 'tamanho'.
+    """
+    transcricao, tipo_arquivo = localizar_transcricao(arquivo_original, config)
+    resultado = {'arquivo': arquivo_original, 'transcricao': transcricao, 'tipo_arquivo': tipo_arquivo,
+                 'status': 'ok', 'problemas': [], 'linhas': 0, 'linhas_com_erro': 0, 'tamanho': 0}
+    if transcricao is None:
+        resultado['status'] = 'faltando'
+        resultado['problemas'].append('Arquivo de transcrição não encontrado')
+        return resultado
+
+    try:
+        tamanho = os.path.getsize(transcricao)
+        analise = analisar_transcricao(transcricao)
+    except (OSError, ValueError) as e:
+        resultado['status'] = 'erro_leitura'
+        resultado['problemas'].append(f'Erro de leitura: {str(e)}')
+        return resultado
+
+    resultado.update(tamanho=tamanho, linhas=analise['linhas'], linhas_com_erro=analise['linhas_com_erro'])
+    problemas = resultado['problemas']
+
+    # 1. Arquivo vazio (só espaços e quebras de linha)
+    if analise['linhas'] == 0:
+        problemas.append("Arquivo vazio")
+
+    # 2. Muitos chunks com erro de transcrição
+    if analise['linhas'] > 0:
+        percentual_erro = analise['linhas_com_erro'] / analise['linhas'] * 100
+        if percentual_erro > PERCENTUAL_ERRO_MAXIMO:
+            problemas.append(f"Alto percentual de erros: {percentual_erro:.1f}%")
+
+    # 3. Tamanho mínimo esperado
+    if tamanho < TAMANHO_MINIMO:
+        problemas.append(f"Arquivo muito pequeno: {tamanho} bytes")
+
+    # 4. Timestamps quando esperados
+    if "timestamp" in transcricao and not analise['timestamp_encontrado']:
+        problemas.append("Timestamps esperados mas não encontrados")
+
+    # 5. Encoding e caracteres estranhos
+    if analise['estranhos'] > analise['caracteres'] * FRACAO_ESTRANHOS_MAXIMA:
+        problemas.append(f"Muitos caracteres não reconhecidos: {analise['estranhos']}")
+
+    if problemas:
+        resultado['status'] = 'problemas'
+    return resultado
+
+def verificar_arquivos(arquivos, config, max_workers=WORKERS_VERIFICACAO, cancelado=None):
+    """
+    Verifica os arquivos em um pool de threads e gera os resultados de
+    verificar_arquivo na ordem da lista. cancelado (threading.Event) interrompe
+    a verificação dos arquivos que ainda não começaram.
+    """
+    def verificar(arquivo):
+        if cancelado is not None and cancelado.is_set():
+            return None
+        return verificar_arquivo(arquivo, config)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="verificacao") as executor:
+        for resultado in executor.map(verificar, arquivos):
+            if resultado is None:
+                break
+            yield resultado
+
+class RelatorioConsistencia(EscritorIncremental):
+    """
+    Relatório JSON gravado à medida que os arquivos são verificados: os
+    problemas entram na lista 'problemas_detalhados' assim que aparecem e os
+    totais são gravados no fim (concluir), quando o arquivo é renomeado para
+    o nome final.
+    """
+
+    def abrir(self):
+        super().abrir()
+        self.total_arquivos = 0
+        self.contagem = {'ok': 0, 'problemas': 0, 'faltando': 0}
+        self._problemas = 0
+        self._gravar('{\n  "timestamp": ' + json.dumps(datetime.now().isoformat()) +
+                     ',\n  "problemas_detalhados": [')
+        return self
+
+    def adicionar(self, resultado):
+        self.total_arquivos += 1
+        status = resultado['status']
+        # Erros de leitura contam como arquivos com problemas
+        self.contagem['problemas' if status == 'erro_leitura' else status] += 1
+        if status == 'ok':
+            return
+        problema = {'arquivo': resultado['arquivo']}
+        if status != 'faltando':
+            problema['transcricao'] = resultado['transcricao']
+        problema.update(problema=', '.join(resultado['problemas']), tipo=status)
+        separador = ",\n    " if self._problemas else "\n    "
+        self._problemas += 1
+        self._gravar(separador + json.dumps(problema, ensure_ascii=False))
+
+    def concluir(self):
+        taxa_sucesso = self.contagem['ok'] / self.total_arquivos * 100 if self.total_arquivos else 0
+        totais = {
+            'total_arquivos': self.total_arquivos,
+            'arquivos_ok': self.contagem['ok'],
+            'arquivos_problemas': self.contagem['problemas'],
+            'arquivos_faltando': self.contagem['faltando'],
+            'taxa_sucesso': taxa_sucesso,
+        }
+        fim_lista = "\n  ]" if self._problemas else "]"
+        self._gravar(fim_lista + "".join(f",\n  {json.dumps(chave)}: {json.dumps(valor)}" for chave, valor in totais.items()) + "\n}\n")
+        super().concluir()